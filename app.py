@@ -3,25 +3,87 @@ Waifu Voice Synthesis API Server
 Clean Azure Neural TTS implementation for anime voice synthesis
 """
 
+# Monkey-patch before any socket-using imports so Azure calls cooperate
+# with gevent workers (gunicorn -c gunicorn_conf.py app:app)
+try:
+    from gevent import monkey
+    monkey.patch_all()
+except ImportError:
+    pass
+
+import io
 import os
+import sys
+import atexit
+import base64
+import hashlib
 import logging
-from flask import Flask, request, jsonify, Response
+import queue
+import tempfile
+from logging.handlers import QueueHandler, QueueListener
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from flask import Flask, request, jsonify, Response, send_file, stream_with_context
 from flask_cors import CORS
 from dotenv import load_dotenv
 
 from waifu_voice.azure_tts import AzureWaifuTTS
+from waifu_voice.sentence_buffer import chunk_text
+
+try:
+    import orjson
+    from flask.json.provider import JSONProvider
+
+    class ORJSONProvider(JSONProvider):
+        """JSON provider backed by orjson, much faster than stdlib json"""
+
+        def dumps(self, obj, **kwargs):
+            return orjson.dumps(obj).decode('utf-8')
+
+        def loads(self, s, **kwargs):
+            return orjson.loads(s)
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    logging.warning("orjson not available, using Flask's default JSON")
+
+try:
+    from pydub import AudioSegment
+    PYDUB_AVAILABLE = True
+except ImportError:
+    PYDUB_AVAILABLE = False
+    logging.warning("pydub not available, Opus transcoding disabled")
 
 # Load environment variables
 load_dotenv()
 
-# Configure logging
+# Configure logging: handlers write synchronously inside the request
+# thread, so route records through a queue drained by one background
+# listener — request threads just enqueue
 logging.basicConfig(level=logging.INFO)
+
+_log_queue = queue.Queue(-1)
+_log_listener = QueueListener(
+    _log_queue,
+    logging.StreamHandler(sys.stderr),
+    respect_handler_level=True
+)
+logging.getLogger().handlers = [QueueHandler(_log_queue)]
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
 logger = logging.getLogger(__name__)
 
 # Initialize Flask app
 app = Flask(__name__)
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'waifu-voice-synthesis-secret')
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max request size
+app.config['JSONIFY_PRETTYPRINT_REGULAR'] = False
+
+# Serialize JSON responses with orjson when available
+if ORJSON_AVAILABLE:
+    app.json = ORJSONProvider(app)
 
 # Enable CORS
 CORS(app, origins=['*'])
@@ -31,9 +93,125 @@ try:
     azure_tts = AzureWaifuTTS()
     logger.info("Azure TTS initialized successfully")
 except Exception as e:
-    logger.error(f"Failed to initialize Azure TTS: {e}")
+    logger.error("Failed to initialize Azure TTS: %s", e)
     azure_tts = None
 
+# Synthesized-audio cache: in-memory LRU backed by a disk tier so repeated
+# phrases (greetings, common responses) skip Azure entirely
+CACHE_DIR = os.environ.get('VOICE_CACHE_DIR', 'voice_cache')
+os.makedirs(CACHE_DIR, exist_ok=True)
+
+_audio_cache = OrderedDict()
+MAX_AUDIO_CACHE_ENTRIES = 128
+
+# Worker pool for synthesizing long-text chunks concurrently
+_synthesis_pool = ThreadPoolExecutor(max_workers=4)
+
+# Optional process pool: set WAIFU_SYNTH_PROCESSES=N to run synthesis in
+# worker processes so the numpy post-processing (anime effects) doesn't
+# contend for the GIL under concurrent load. The Speech SDK objects are
+# not picklable, so each worker builds its own AzureWaifuTTS.
+_worker_tts = None
+
+
+def _init_worker_tts():
+    global _worker_tts
+    _worker_tts = AzureWaifuTTS()
+
+
+def _worker_synthesize(text, character, emotion):
+    return _worker_tts.synthesize(text=text, character=character, emotion=emotion)
+
+
+_SYNTH_PROCESSES = int(os.environ.get('WAIFU_SYNTH_PROCESSES', '0'))
+if _SYNTH_PROCESSES > 0:
+    _process_pool = ProcessPoolExecutor(
+        max_workers=_SYNTH_PROCESSES,
+        initializer=_init_worker_tts
+    )
+else:
+    _process_pool = None
+
+
+def _synthesize_one(text, character, emotion):
+    """Synthesize via the process pool when enabled, else in-process"""
+    if _process_pool is not None:
+        return _process_pool.submit(
+            _worker_synthesize, text, character, emotion
+        ).result(timeout=60)
+
+    return azure_tts.synthesize(text=text, character=character, emotion=emotion)
+
+
+def _join_wav_chunks(chunks):
+    """Concatenate WAV chunks, keeping the first RIFF header and fixing sizes"""
+    if len(chunks) == 1:
+        return chunks[0]
+
+    combined = bytearray(chunks[0])
+    for chunk in chunks[1:]:
+        combined += chunk[44:]  # Strip the 44-byte RIFF/fmt/data header
+
+    combined[4:8] = (len(combined) - 8).to_bytes(4, 'little')
+    combined[40:44] = (len(combined) - 44).to_bytes(4, 'little')
+    return bytes(combined)
+
+
+def _cache_key(text, character, emotion):
+    """Fingerprint a synthesis request (blake2b is faster than md5 here)"""
+    content = f"{text}|{character}|{emotion}"
+    return hashlib.blake2b(content.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def _cache_store_memory(key, audio_data):
+    """Insert into the in-memory LRU, evicting the oldest entry if full"""
+    _audio_cache[key] = audio_data
+    _audio_cache.move_to_end(key)
+    if len(_audio_cache) > MAX_AUDIO_CACHE_ENTRIES:
+        _audio_cache.popitem(last=False)
+
+
+def _cache_put(key, audio_data):
+    """Store audio in memory and atomically on disk"""
+    _cache_store_memory(key, audio_data)
+
+    try:
+        fd, temp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(audio_data)
+        os.replace(temp_path, os.path.join(CACHE_DIR, f"{key}.wav"))
+    except OSError as e:
+        logger.warning("Could not cache audio %s: %s", key, e)
+
+# Pre-serialized error bodies so rejected requests skip JSON encoding
+_ERR_NO_AZURE = b'{"error":"Azure TTS not available. Please configure AZURE_SPEECH_KEY and AZURE_SPEECH_REGION."}'
+_ERR_MISSING_TEXT = b'{"error":"Missing required \\"text\\" field"}'
+_ERR_EMPTY_TEXT = b'{"error":"Text cannot be empty"}'
+_ERR_MISSING_ITEMS = b'{"error":"Missing required \\"items\\" array"}'
+_ERR_ITEM_EMPTY_TEXT = b'{"error":"Every item needs a non-empty \\"text\\" field"}'
+_ERR_TTS_UNAVAILABLE = b'{"error":"Azure TTS not available"}'
+_ERR_TTS_UNINITIALIZED = b'{"error":"Azure TTS not initialized"}'
+_ERR_NOT_FOUND = b'{"error":"Endpoint not found"}'
+_ERR_INTERNAL = b'{"error":"Internal server error"}'
+
+
+def _json_error(body, status):
+    """Build an error response from a pre-serialized JSON body"""
+    return Response(body, status=status, mimetype='application/json')
+
+
+def _encode_ogg_opus(wav_bytes):
+    """Transcode WAV to OGG/Opus (~10x smaller) for Opus-capable clients"""
+    buffer = io.BytesIO()
+    AudioSegment.from_wav(io.BytesIO(wav_bytes)).export(
+        buffer, format='ogg', codec='libopus', bitrate='48k')
+    return buffer.getvalue()
+
+
+def _wants_opus():
+    """True when the client advertises OGG/Opus support"""
+    return PYDUB_AVAILABLE and 'audio/ogg' in request.headers.get('Accept', '')
+
 # API Routes
 
 @app.route('/', methods=['GET'])
@@ -55,63 +233,185 @@ def synthesize_voice():
     {
         "text": "Konnichiwa! ♪",
         "character": "sakura",
-        "emotion": "cheerful"
+        "emotion": "cheerful",
+        "stream": false
     }
+
+    With "stream": true, audio chunks are sent via chunked transfer
+    encoding as they arrive from Azure, so playback can start before
+    synthesis completes.
     """
     try:
         if not azure_tts or not azure_tts.azure_available:
-            return jsonify({'error': 'Azure TTS not available. Please configure AZURE_SPEECH_KEY and AZURE_SPEECH_REGION.'}), 500
+            return _json_error(_ERR_NO_AZURE, 500)
         
         # Parse request
         data = request.get_json()
         if not data or 'text' not in data:
-            return jsonify({'error': 'Missing required "text" field'}), 400
+            return _json_error(_ERR_MISSING_TEXT, 400)
         
         text = data['text']
         if not text.strip():
-            return jsonify({'error': 'Text cannot be empty'}), 400
+            return _json_error(_ERR_EMPTY_TEXT, 400)
         
         # Extract synthesis parameters
         character = data.get('character', 'sakura')
         emotion = data.get('emotion', 'cheerful')
         
-        logger.info(f"Synthesizing: '{text[:50]}...' for character: {character} ({emotion})")
-        
-        # Synthesize audio with Azure
-        audio_data = azure_tts.synthesize(
-            text=text,
-            character=character,
-            emotion=emotion
-        )
-        
+        logger.info("Synthesizing: '%.50s...' for character: %s (%s)", text, character, emotion)
+
+        # Stream chunks as they arrive from Azure for low time-to-first-byte
+        if data.get('stream', False):
+            response = Response(
+                stream_with_context(azure_tts.synthesize_stream(
+                    text=text,
+                    character=character,
+                    emotion=emotion
+                )),
+                mimetype='audio/wav'
+            )
+            response.headers['Transfer-Encoding'] = 'chunked'
+            return response
+
+        # Serve from cache when this exact request was synthesized before
+        cache_key = _cache_key(text, character, emotion)
+
+        # Output is a pure function of the payload, so a matching ETag
+        # means the client already has the exact audio
+        if request.if_none_match.contains(cache_key):
+            return Response(status=304)
+
+        audio_data = _audio_cache.get(cache_key)
+        cache_state = 'HIT'
+
+        if audio_data is not None:
+            _audio_cache.move_to_end(cache_key)
+        else:
+            # Disk hits go through send_file so the WSGI server can use
+            # sendfile(2) instead of copying through Python
+            cache_path = os.path.join(CACHE_DIR, f"{cache_key}.wav")
+            if os.path.exists(cache_path):
+                response = send_file(
+                    cache_path,
+                    mimetype='audio/wav',
+                    conditional=True,
+                    etag=cache_key,
+                    download_name=f"{character}_{emotion}.wav"
+                )
+                response.headers['X-Cache'] = 'HIT'
+                response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+                return response
+
+            cache_state = 'MISS'
+
+            # Long texts are split at sentence boundaries and synthesized
+            # concurrently so latency tracks the longest chunk, not the sum
+            chunks = chunk_text(text)
+            if len(chunks) > 1:
+                parts = list(_synthesis_pool.map(
+                    lambda chunk: _synthesize_one(chunk, character, emotion),
+                    chunks
+                ))
+                audio_data = _join_wav_chunks(parts)
+            else:
+                # Synthesize audio with Azure
+                audio_data = _synthesize_one(text, character, emotion)
+            _cache_put(cache_key, audio_data)
+
+        # Opus-capable clients get ~10x smaller payloads
+        if _wants_opus():
+            try:
+                response = Response(_encode_ogg_opus(audio_data), mimetype='audio/ogg')
+                response.headers['Content-Disposition'] = f'attachment; filename="{character}_{emotion}.ogg"'
+                response.headers['X-Cache'] = cache_state
+                response.headers['ETag'] = cache_key
+                response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+                response.headers['Vary'] = 'Accept'
+                return response
+            except Exception as e:
+                logger.warning("Opus transcoding failed, serving WAV: %s", e)
+
         # Return audio response
         response = Response(audio_data, mimetype='audio/wav')
         response.headers['Content-Disposition'] = f'attachment; filename="{character}_{emotion}.wav"'
-        
+        response.headers['X-Cache'] = cache_state
+        response.headers['ETag'] = cache_key
+        response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+        response.headers['Vary'] = 'Accept'
+
         return response
         
     except Exception as e:
-        logger.error(f"Synthesis error: {e}")
+        logger.error("Synthesis error: %s", e)
         return jsonify({'error': f'Synthesis failed: {str(e)}'}), 500
 
+@app.route('/synthesize/batch', methods=['POST'])
+def synthesize_batch():
+    """
+    Batch synthesis endpoint: several texts in one Azure round-trip
+
+    Expected JSON payload:
+    {
+        "items": [
+            {"text": "Konnichiwa! ♪", "character": "sakura", "emotion": "cheerful"},
+            {"text": "Ehehe!", "character": "miku", "emotion": "giggly"}
+        ]
+    }
+
+    Returns a JSON array with base64-encoded WAV audio per item.
+    """
+    try:
+        if not azure_tts or not azure_tts.azure_available:
+            return _json_error(_ERR_NO_AZURE, 500)
+
+        data = request.get_json()
+        if not data or not isinstance(data.get('items'), list) or not data['items']:
+            return _json_error(_ERR_MISSING_ITEMS, 400)
+
+        items = data['items']
+        if any(not item.get('text', '').strip() for item in items):
+            return _json_error(_ERR_ITEM_EMPTY_TEXT, 400)
+
+        logger.info("Batch synthesizing %d items", len(items))
+
+        audio_list = azure_tts.synthesize_batch(items)
+
+        return jsonify({
+            'results': [
+                {
+                    'character': item.get('character', 'sakura'),
+                    'emotion': item.get('emotion', 'cheerful'),
+                    'audio_base64': base64.b64encode(audio).decode('ascii')
+                }
+                for item, audio in zip(items, audio_list)
+            ]
+        })
+
+    except Exception as e:
+        logger.error("Batch synthesis error: %s", e)
+        return jsonify({'error': f'Batch synthesis failed: {str(e)}'}), 500
+
 @app.route('/voices', methods=['GET'])
 def list_voices():
     """List available voices and characters"""
     try:
         if not azure_tts:
-            return jsonify({'error': 'Azure TTS not available'}), 500
+            return _json_error(_ERR_TTS_UNAVAILABLE, 500)
         
         voices = azure_tts.get_available_voices()
-        
-        return jsonify({
+
+        response = jsonify({
             'characters': voices['characters'],
             'emotions': voices['emotions'],
             'azure_available': voices['azure_available'],
             'japanese_expressions': voices['japanese_expressions']
         })
+        # The voice catalog is near-static; let clients cache it for an hour
+        response.headers['Cache-Control'] = 'public, max-age=3600'
+        return response
         
     except Exception as e:
-        logger.error(f"Error listing voices: {e}")
+        logger.error("Error listing voices: %s", e)
         return jsonify({'error': 'Failed to list voices'}), 500
 
 @app.route('/test', methods=['POST'])
@@ -119,9 +419,10 @@ def test_azure():
     """Test Azure connection"""
     try:
         if not azure_tts:
-            return jsonify({'error': 'Azure TTS not initialized'}), 500
-        
-        success = azure_tts.test_connection()
+            return _json_error(_ERR_TTS_UNINITIALIZED, 500)
+
+        force = request.args.get('force', 'false').lower() == 'true'
+        success = azure_tts.test_connection(force=force)
         
         return jsonify({
             'azure_connection': success,
@@ -129,24 +430,32 @@ def test_azure():
         })
         
     except Exception as e:
-        logger.error(f"Azure test error: {e}")
+        logger.error("Azure test error: %s", e)
         return jsonify({'error': f'Test failed: {str(e)}'}), 500
 
+# Advertise HTTP/3 when serving over QUIC (see hypercorn_conf.py)
+_ALT_SVC = os.environ.get('WAIFU_ALT_SVC')  # e.g. 'h3=":5001"; ma=3600'
+if _ALT_SVC:
+    @app.after_request
+    def add_alt_svc(response):
+        response.headers['Alt-Svc'] = _ALT_SVC
+        return response
+
 # Error handlers
 @app.errorhandler(404)
 def not_found(error):
-    return jsonify({'error': 'Endpoint not found'}), 404
+    return _json_error(_ERR_NOT_FOUND, 404)
 
 @app.errorhandler(500)
 def internal_error(error):
-    return jsonify({'error': 'Internal server error'}), 500
+    return _json_error(_ERR_INTERNAL, 500)
 
 if __name__ == '__main__':
     port = int(os.environ.get('FLASK_PORT', 5000))
     debug = os.environ.get('FLASK_DEBUG', 'False').lower() == 'true'
     
-    logger.info(f"Starting Waifu Voice Synthesis API on port {port}")
-    logger.info(f"Debug mode: {debug}")
+    logger.info("Starting Waifu Voice Synthesis API on port %d", port)
+    logger.info("Debug mode: %s", debug)
     
     if not azure_tts or not azure_tts.azure_available:
         logger.warning("⚠️ Azure TTS not configured! Set AZURE_SPEECH_KEY and AZURE_SPEECH_REGION environment variables.")
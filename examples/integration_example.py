@@ -4,6 +4,8 @@ Shows how to connect the voice synthesis with your existing chat system
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
 from pathlib import Path
 import sys
@@ -14,15 +16,26 @@ sys.path.append(str(Path(__file__).parent.parent))
 class WaifuChatVoiceIntegration:
     """Integration bridge between waifu-chat-ollama and voice synthesis"""
     
-    def __init__(self, chat_api_url="http://localhost:5000", 
+    def __init__(self, chat_api_url="http://localhost:5000",
                  voice_api_url="http://localhost:5001"):
         self.chat_api_url = chat_api_url
         self.voice_api_url = voice_api_url
-        
+
+        # One pooled session with keep-alive and retries instead of a
+        # fresh TCP connection per request
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=10,
+            pool_maxsize=10,
+            max_retries=Retry(total=3, backoff_factor=0.1)
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
     def get_chat_response(self, message: str) -> dict:
         """Get response from waifu-chat-ollama"""
         try:
-            response = requests.post(f"{self.chat_api_url}/chat", json={
+            response = self.session.post(f"{self.chat_api_url}/chat", json={
                 "message": message,
                 "character": "Sakura"
             })
@@ -34,7 +47,7 @@ class WaifuChatVoiceIntegration:
     def synthesize_response(self, text: str, character="sakura") -> bytes:
         """Convert text response to voice"""
         try:
-            response = requests.post(f"{self.voice_api_url}/synthesize", json={
+            response = self.session.post(f"{self.voice_api_url}/synthesize", json={
                 "text": text,
                 "character": character,
                 "emotion": "auto",
@@ -6,22 +6,93 @@ API into your MVP applications.
 """
 
 import requests
-import base64
+import hashlib
 import json
 import asyncio
 import aiohttp
-import hashlib
 import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from typing import Optional, Dict, Any
 import time
 
+# Add the parent directory to the path to import waifu_voice
+sys.path.append(str(Path(__file__).parent.parent))
+
+from waifu_voice.cache import DiskLRU
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # Configuration
 API_BASE_URL = "http://127.0.0.1:5001"
 CACHE_DIR = "voice_cache"
 
+# Input bounds mirrored from the server so bad requests fail locally
+MIN_TEXT_LEN = 1
+MAX_TEXT_LEN = 500
+
+# Separator lines built once instead of re-multiplied at every print
+_SEP = "-" * 50
+_BAR = "=" * 60
+
 # Ensure cache directory exists
 os.makedirs(CACHE_DIR, exist_ok=True)
 
+
+def _stable_key(s: str) -> str:
+    """Short filename-safe key that is stable across interpreter runs."""
+    # Builtin hash() is salted per process (PYTHONHASHSEED), so files
+    # named with it can never be found again; blake2b is deterministic
+    return hashlib.blake2b(s.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def _is_healthy(client: "WaifuVoiceClient", ttl: float = 5.0,
+                _state={'t': 0.0, 'ok': False}) -> bool:
+    """health_check with a short TTL cache.
+
+    Probing /health before every synthesis doubles the request count;
+    one probe per ttl seconds is plenty for a liveness signal.
+    """
+    now = time.monotonic()
+    if now - _state['t'] >= ttl:
+        _state['ok'] = client.health_check()
+        _state['t'] = now
+    return _state['ok']
+
+
+def _dump_wav(path: str, audio: bytes):
+    """Write audio bytes in one syscall, skipping buffered-IO overhead."""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.write(fd, audio)
+    finally:
+        os.close(fd)
+
+
+def _batch_synth(client: "WaifuVoiceClient", jobs: list) -> list:
+    """
+    Synthesize many (filename, text, character, emotion) jobs in parallel.
+
+    The API calls are network-bound, so a small thread pool overlaps
+    their latency instead of paying it once per job. Results come back
+    in job order as (filename, audio_or_None) pairs; successful jobs
+    are saved to their filename.
+    """
+    def _run(job):
+        filename, text, character, emotion = job
+        audio = client.synthesize(text, character, emotion)
+        if audio:
+            _dump_wav(filename, audio)
+        return filename, audio
+
+    with ThreadPoolExecutor(max_workers=min(8, len(jobs))) as pool:
+        return list(pool.map(_run, jobs))
+
 class WaifuVoiceClient:
     """
     Simple client for waifu voice synthesis API.
@@ -90,58 +161,79 @@ class CachedWaifuVoiceClient(WaifuVoiceClient):
     Cache commonly used phrases to reduce API calls.
     """
     
-    def __init__(self, base_url: str = API_BASE_URL, timeout: int = 10, cache_dir: str = CACHE_DIR):
+    def __init__(self, base_url: str = API_BASE_URL, timeout: int = 10, cache_dir: str = CACHE_DIR,
+                 memory_cache_size: int = 512, preload_dir: str = "pre_synth"):
         super().__init__(base_url, timeout)
-        self.cache_dir = cache_dir
-    
-    def _get_cache_key(self, text: str, character: str, emotion: str) -> str:
-        """Generate cache key for given parameters."""
-        content = f"{text}_{character}_{emotion}"
-        return hashlib.md5(content.encode()).hexdigest()
-    
-    def _get_cache_path(self, cache_key: str) -> str:
-        """Get cache file path."""
-        return os.path.join(self.cache_dir, f"{cache_key}.wav")
-    
+        # Two-tier cache: in-process LRU in front of a disk directory
+        self._cache = DiskLRU(cache_dir, memory_size=memory_cache_size)
+        self._preload(preload_dir)
+
+    def _preload(self, preload_dir: str):
+        """Seed the cache from audio pre-synthesized by scripts/warm_cache.py."""
+        manifest_path = os.path.join(preload_dir, 'manifest.json')
+        if not os.path.exists(manifest_path):
+            return
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            for digest, key in manifest.items():
+                wav_path = os.path.join(preload_dir, f"{digest}.wav")
+                if os.path.exists(wav_path):
+                    with open(wav_path, 'rb') as f:
+                        self._cache.put(tuple(key), f.read())
+        except Exception as e:
+            print(f"Failed to preload {preload_dir}: {e}")
+
     def synthesize(self, text: str, character: str = "sakura", emotion: str = "cheerful") -> Optional[bytes]:
-        """Synthesize with caching."""
-        # Check cache first
-        cache_key = self._get_cache_key(text, character, emotion)
-        cache_path = self._get_cache_path(cache_key)
-        
-        if os.path.exists(cache_path):
-            with open(cache_path, 'rb') as f:
-                return f.read()
-        
-        # Generate new audio
-        audio_data = super().synthesize(text, character, emotion)
-        
-        # Cache for future use
-        if audio_data:
-            try:
-                with open(cache_path, 'wb') as f:
-                    f.write(audio_data)
-            except Exception as e:
-                print(f"Failed to cache audio: {e}")
-        
-        return audio_data
+        """Synthesize with caching (only successes are cached)."""
+        synthesize = super().synthesize
+        return self._cache.get_or_compute(
+            (text, character, emotion),
+            lambda: synthesize(text, character, emotion)
+        )
 
 
 class AsyncWaifuVoiceClient:
     """
     Async client for non-blocking voice synthesis.
     Great for web applications and real-time systems.
+
+    Use as an async context manager so one pooled ClientSession (and its
+    DNS cache and keep-alive connections) is shared across all calls:
+
+        async with AsyncWaifuVoiceClient() as client:
+            audio = await client.synthesize("Konnichiwa!")
     """
-    
-    def __init__(self, base_url: str = API_BASE_URL, timeout: int = 10):
+
+    def __init__(self, base_url: str = API_BASE_URL, timeout: int = 10, max_concurrency: int = 32):
         self.base_url = base_url
         self.timeout = aiohttp.ClientTimeout(total=timeout)
-    
+        self._session = None
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def __aenter__(self):
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=100,
+                keepalive_timeout=60,
+                ttl_dns_cache=300
+            ),
+            timeout=self.timeout
+        )
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self._session.close()
+        self._session = None
+
     async def synthesize(self, text: str, character: str = "sakura", emotion: str = "cheerful") -> Optional[bytes]:
-        """Async voice synthesis."""
+        """Async voice synthesis (reuses the pooled session)."""
+        if self._session is None:
+            raise RuntimeError("Use 'async with AsyncWaifuVoiceClient() as client:'")
+
         try:
-            async with aiohttp.ClientSession(timeout=self.timeout) as session:
-                async with session.post(
+            async with self._semaphore:
+                async with self._session.post(
                     f"{self.base_url}/synthesize",
                     json={
                         "text": text,
@@ -158,12 +250,30 @@ class AsyncWaifuVoiceClient:
             print(f"Async request failed: {e}")
             return None
 
+    def bulk_synthesize(self, payloads: list) -> list:
+        """
+        Synchronous helper: synthesize many payloads concurrently.
+
+        Args:
+            payloads: List of dicts with synthesize() keyword arguments
+
+        Returns:
+            List of audio bytes (or None per failed item), in input order
+        """
+        async def _run():
+            async with self as client:
+                return await asyncio.gather(
+                    *[client.synthesize(**payload) for payload in payloads]
+                )
+
+        return asyncio.run(_run())
+
 
 # =============================================================================
 # MVP INTEGRATION EXAMPLES
 # =============================================================================
 
-def example_1_basic_chat_bot():
+def example_1_basic_chat_bot(client: WaifuVoiceClient):
     """
     Example 1: Basic Chat Bot Integration
     
@@ -171,8 +281,7 @@ def example_1_basic_chat_bot():
     """
     print("🤖 Example 1: Basic Chat Bot")
     
-    client = WaifuVoiceClient()
-    
+
     # Simulate chat responses
     responses = [
         "Hello! Welcome to our chat service ♪",
@@ -191,42 +300,38 @@ def example_1_basic_chat_bot():
         if audio:
             # Save audio file
             filename = f"chat_response_{i+1}.wav"
-            with open(filename, 'wb') as f:
-                f.write(audio)
+            _dump_wav(filename, audio)
             print(f"🎵 Voice saved to: {filename}")
         else:
             print("❌ Voice generation failed")
         
-        print("-" * 50)
+        print(_SEP)
 
 
-def example_2_character_personality_showcase():
+def example_2_character_personality_showcase(client: WaifuVoiceClient):
     """
     Example 2: Character Personality Showcase
     
     Demonstrates different characters saying the same phrase.
     """
     print("🎭 Example 2: Character Personalities")
-    
-    client = WaifuVoiceClient()
+
     text = "Welcome to our application! I hope you enjoy your experience here ♪"
     
     characters = ["sakura", "yuki", "rei", "miku"]
-    
-    for character in characters:
+
+    jobs = [(f"personality_{character}.wav", text, character, "cheerful")
+            for character in characters]
+
+    for (filename, audio), character in zip(_batch_synth(client, jobs), characters):
         print(f"{character.title()}: {text}")
-        
-        audio = client.synthesize(text, character, "cheerful")
         if audio:
-            filename = f"personality_{character}.wav"
-            with open(filename, 'wb') as f:
-                f.write(audio)
             print(f"🎵 {character.title()}'s voice saved to: {filename}")
-        
-        print("-" * 50)
+
+        print(_SEP)
 
 
-def example_3_emotional_responses():
+def example_3_emotional_responses(client: WaifuVoiceClient):
     """
     Example 3: Emotional Response System
     
@@ -234,8 +339,7 @@ def example_3_emotional_responses():
     """
     print("💖 Example 3: Emotional Responses")
     
-    client = WaifuVoiceClient()
-    
+
     scenarios = [
         ("User completed a task", "Sugoi! You did amazing! ♪", "excited"),
         ("User made a mistake", "Ara ara~ Don't worry, everyone makes mistakes!", "calm"),
@@ -243,22 +347,20 @@ def example_3_emotional_responses():
         ("User achieved something", "Congratulations! I'm so proud of you!", "cheerful")
     ]
     
-    for scenario, response, emotion in scenarios:
+    jobs = [(f"emotion_{emotion}_response.wav", response, "sakura", emotion)
+            for _, response, emotion in scenarios]
+
+    for (filename, audio), (scenario, response, emotion) in zip(_batch_synth(client, jobs), scenarios):
         print(f"Scenario: {scenario}")
         print(f"Response: {response}")
         print(f"Emotion: {emotion}")
-        
-        audio = client.synthesize(response, "sakura", emotion)
         if audio:
-            filename = f"emotion_{emotion}_response.wav"
-            with open(filename, 'wb') as f:
-                f.write(audio)
             print(f"🎵 Emotional response saved to: {filename}")
-        
-        print("-" * 50)
 
+        print(_SEP)
 
-def example_4_educational_content():
+
+def example_4_educational_content(client: WaifuVoiceClient):
     """
     Example 4: Educational Content with Voice
     
@@ -266,8 +368,7 @@ def example_4_educational_content():
     """
     print("📚 Example 4: Educational Content")
     
-    client = WaifuVoiceClient()
-    
+
     lessons = [
         ("Introduction", "Hello students! Welcome to today's lesson. Let's learn something new together ♪"),
         ("Explanation", "This concept is quite important. Let me explain it step by step."),
@@ -275,22 +376,20 @@ def example_4_educational_content():
         ("Conclusion", "Great job! You've completed this lesson. I'm proud of your progress!")
     ]
     
-    for lesson_type, content in lessons:
+    # Use Yuki for educational content (professional voice)
+    jobs = [(f"lesson_{lesson_type.lower()}.wav", content, "yuki", "calm")
+            for lesson_type, content in lessons]
+
+    for (filename, audio), (lesson_type, content) in zip(_batch_synth(client, jobs), lessons):
         print(f"Lesson Part: {lesson_type}")
         print(f"Content: {content}")
-        
-        # Use Yuki for educational content (professional voice)
-        audio = client.synthesize(content, "yuki", "calm")
         if audio:
-            filename = f"lesson_{lesson_type.lower()}.wav"
-            with open(filename, 'wb') as f:
-                f.write(audio)
             print(f"🎵 Lesson audio saved to: {filename}")
-        
-        print("-" * 50)
+
+        print(_SEP)
 
 
-def example_5_gaming_integration():
+def example_5_gaming_integration(client: WaifuVoiceClient):
     """
     Example 5: Gaming Integration
     
@@ -298,8 +397,7 @@ def example_5_gaming_integration():
     """
     print("🎮 Example 5: Gaming Integration")
     
-    client = WaifuVoiceClient()
-    
+
     game_events = [
         ("level_up", "Level up! You're getting stronger! ♪", "excited"),
         ("item_found", "Ooh! You found a rare item! Lucky you~", "cheerful"),
@@ -308,22 +406,20 @@ def example_5_gaming_integration():
         ("achievement", "Achievement unlocked! You're amazing! ♪", "cheerful")
     ]
     
-    for event, message, emotion in game_events:
+    # Use Miku for gaming (energetic voice)
+    jobs = [(f"game_{event}.wav", message, "miku", emotion)
+            for event, message, emotion in game_events]
+
+    for (filename, audio), (event, message, _) in zip(_batch_synth(client, jobs), game_events):
         print(f"Game Event: {event}")
         print(f"Message: {message}")
-        
-        # Use Miku for gaming (energetic voice)
-        audio = client.synthesize(message, "miku", emotion)
         if audio:
-            filename = f"game_{event}.wav"
-            with open(filename, 'wb') as f:
-                f.write(audio)
             print(f"🎵 Game audio saved to: {filename}")
-        
-        print("-" * 50)
 
+        print(_SEP)
 
-def example_6_customer_service():
+
+def example_6_customer_service(client: WaifuVoiceClient):
     """
     Example 6: Customer Service Integration
     
@@ -331,8 +427,7 @@ def example_6_customer_service():
     """
     print("📞 Example 6: Customer Service")
     
-    client = WaifuVoiceClient()
-    
+
     service_responses = [
         ("greeting", "Hello! Thank you for contacting our support team. How may I assist you today?", "cheerful"),
         ("hold", "Please hold on for just a moment while I look that up for you.", "calm"),
@@ -341,19 +436,17 @@ def example_6_customer_service():
         ("closing", "Is there anything else I can help you with today? Have a wonderful day! ♪", "cheerful")
     ]
     
-    for response_type, message, emotion in service_responses:
+    # Use Sakura for customer service (friendly and caring)
+    jobs = [(f"service_{response_type}.wav", message, "sakura", emotion)
+            for response_type, message, emotion in service_responses]
+
+    for (filename, audio), (response_type, message, _) in zip(_batch_synth(client, jobs), service_responses):
         print(f"Service Type: {response_type}")
         print(f"Response: {message}")
-        
-        # Use Sakura for customer service (friendly and caring)
-        audio = client.synthesize(message, "sakura", emotion)
         if audio:
-            filename = f"service_{response_type}.wav"
-            with open(filename, 'wb') as f:
-                f.write(audio)
             print(f"🎵 Service audio saved to: {filename}")
-        
-        print("-" * 50)
+
+        print(_SEP)
 
 
 async def example_7_async_integration():
@@ -364,8 +457,6 @@ async def example_7_async_integration():
     """
     print("⚡ Example 7: Async Integration")
     
-    client = AsyncWaifuVoiceClient()
-    
     # Simulate multiple concurrent requests
     texts = [
         "Hello! Welcome to our async service!",
@@ -373,40 +464,44 @@ async def example_7_async_integration():
         "Multiple operations running simultaneously!",
         "Async programming makes everything faster ♪"
     ]
-    
-    # Generate all voices concurrently
+
+    # Generate all voices concurrently over one pooled session; the
+    # client's internal semaphore bounds in-flight requests. Saving via
+    # as_completed overlaps disk writes with the synthesis still in
+    # flight instead of waiting for the slowest request first
     start_time = time.time()
-    
-    tasks = []
-    for i, text in enumerate(texts):
-        task = client.synthesize(text, "sakura", "cheerful")
-        tasks.append((i, task))
-    
-    # Wait for all to complete
-    results = await asyncio.gather(*[task for _, task in tasks])
-    
+    saved = 0
+
+    async with AsyncWaifuVoiceClient() as client:
+        async def _synth(i, text):
+            return i, await client.synthesize(text, "sakura", "cheerful")
+
+        async with asyncio.TaskGroup() as tg:
+            tasks = [tg.create_task(_synth(i, text)) for i, text in enumerate(texts)]
+
+            for future in asyncio.as_completed(tasks):
+                i, audio_data = await future
+                if audio_data:
+                    filename = f"async_voice_{i+1}.wav"
+                    _dump_wav(filename, audio_data)
+                    saved += 1
+                    print(f"🎵 Async voice saved to: {filename}")
+
     end_time = time.time()
-    print(f"Generated {len(texts)} voices in {end_time - start_time:.2f} seconds")
-    
-    # Save results
-    for i, audio_data in enumerate(results):
-        if audio_data:
-            filename = f"async_voice_{i+1}.wav"
-            with open(filename, 'wb') as f:
-                f.write(audio_data)
-            print(f"🎵 Async voice saved to: {filename}")
+    print(f"Generated {saved}/{len(texts)} voices in {end_time - start_time:.2f} seconds")
 
 
-def example_8_caching_performance():
+def example_8_caching_performance(client: WaifuVoiceClient):
     """
     Example 8: Caching for Performance
-    
+
     Demonstrates caching for common phrases.
     """
     print("🚀 Example 8: Caching Performance")
-    
-    client = CachedWaifuVoiceClient()
-    
+
+    # Wrap the shared client's connection settings in the caching variant
+    client = CachedWaifuVoiceClient(client.base_url, client.timeout)
+
     # Common phrases that would benefit from caching
     common_phrases = [
         "Welcome back!",
@@ -440,7 +535,7 @@ def example_8_caching_performance():
     print(f"Speed improvement: {(first_time / second_time):.1f}x faster!")
 
 
-def example_9_error_handling():
+def example_9_error_handling(client: WaifuVoiceClient):
     """
     Example 9: Robust Error Handling
     
@@ -448,8 +543,7 @@ def example_9_error_handling():
     """
     print("🛡️ Example 9: Error Handling")
     
-    client = WaifuVoiceClient()
-    
+
     def safe_voice_synthesis(text: str, character: str = "sakura", fallback_message: str = None) -> tuple:
         """
         Safe voice synthesis with error handling.
@@ -457,9 +551,17 @@ def example_9_error_handling():
         Returns:
             (success: bool, audio_data: bytes, message: str)
         """
+        # Validate locally first: rejecting bad input here costs
+        # nanoseconds, rejecting it server-side costs a round trip
+        text = text.strip()
+        if len(text) < MIN_TEXT_LEN:
+            return False, None, "Text is empty"
+        if len(text) > MAX_TEXT_LEN:
+            return False, None, f"Text too long ({len(text)} > {MAX_TEXT_LEN} chars)"
+
         try:
-            # Check if API is healthy first
-            if not client.health_check():
+            # Check if API is healthy first (cached for a few seconds)
+            if not _is_healthy(client):
                 return False, None, "Voice API is not available"
             
             audio = client.synthesize(text, character, "cheerful")
@@ -488,17 +590,16 @@ def example_9_error_handling():
         success, audio, message = safe_voice_synthesis(text, character)
         
         if success:
-            filename = f"safe_test_{hash(text) % 1000}.wav"
-            with open(filename, 'wb') as f:
-                f.write(audio)
+            filename = f"safe_test_{_stable_key(text)}.wav"
+            _dump_wav(filename, audio)
             print(f"✅ {message} - Saved to: {filename}")
         else:
             print(f"❌ {message}")
         
-        print("-" * 50)
+        print(_SEP)
 
 
-def example_10_web_integration():
+def example_10_web_integration(client: WaifuVoiceClient):
     """
     Example 10: Web Application Integration
     
@@ -506,14 +607,16 @@ def example_10_web_integration():
     """
     print("🌐 Example 10: Web Integration Helper")
     
+    cache = DiskLRU(CACHE_DIR)
+
     def create_voice_response(text: str, character: str = "sakura") -> dict:
         """
         Create a web-friendly response with voice data.
-        
-        Returns JSON-serializable response for web APIs.
+
+        Returns JSON-serializable response for web APIs. The base64
+        payload is cached alongside the audio, so repeat responses for
+        the same text skip both the API call and the re-encode.
         """
-        client = WaifuVoiceClient()
-        
         response = {
             "text": text,
             "character": character,
@@ -522,20 +625,22 @@ def example_10_web_integration():
             "audio_base64": None,
             "error": None
         }
-        
+
         try:
-            audio = client.synthesize(text, character, "cheerful")
-            
-            if audio:
-                # Convert to base64 for JSON transport
-                response["audio_base64"] = base64.b64encode(audio).decode('utf-8')
+            audio_b64 = cache.get_or_compute_b64(
+                (text, character, "cheerful"),
+                lambda: client.synthesize(text, character, "cheerful")
+            )
+
+            if audio_b64:
+                response["audio_base64"] = audio_b64
                 response["has_voice"] = True
             else:
                 response["error"] = "Voice generation failed"
-                
+
         except Exception as e:
             response["error"] = str(e)
-        
+
         return response
     
     # Example web responses
@@ -554,17 +659,24 @@ def example_10_web_integration():
         if response['error']:
             print(f"Error: {response['error']}")
         
-        # Save as JSON for web consumption
-        filename = f"web_response_{hash(text) % 1000}.json"
-        with open(filename, 'w') as f:
-            # Don't save the large base64 audio in the demo file
-            demo_response = response.copy()
-            if demo_response['audio_base64']:
-                demo_response['audio_base64'] = f"<base64_audio_{len(response['audio_base64'])}_chars>"
-            
-            json.dump(demo_response, f, indent=2)
+        # Save as JSON for web consumption; replace the large base64
+        # audio with a stub in one dict-literal pass instead of copying
+        # the full payload and mutating it
+        demo_response = {
+            **response,
+            'audio_base64': (f"<base64_audio_{len(response['audio_base64'])}_chars>"
+                             if response['audio_base64'] else None)
+        }
+
+        filename = f"web_response_{_stable_key(text)}.json"
+        if ORJSON_AVAILABLE:
+            data = orjson.dumps(demo_response, option=orjson.OPT_INDENT_2)
+        else:
+            data = json.dumps(demo_response, indent=2).encode('utf-8')
+        with open(filename, 'wb') as f:
+            f.write(data)
         print(f"💾 Web response saved to: {filename}")
-        print("-" * 50)
+        print(_SEP)
 
 
 # =============================================================================
@@ -574,9 +686,9 @@ def example_10_web_integration():
 def main():
     """Run all examples."""
     print("🎌 Waifu Voice Synthesis - Integration Examples")
-    print("=" * 60)
+    print(_BAR)
     
-    # Check if API is available
+    # One client (and its keep-alive connection pool) shared by every example
     client = WaifuVoiceClient()
     if not client.health_check():
         print("❌ API is not available. Please start the voice synthesis server first:")
@@ -602,16 +714,18 @@ def main():
     
     for example_func in examples:
         try:
-            example_func()
+            example_func(client)
             print("✅ Example completed successfully!")
         except Exception as e:
             print(f"❌ Example failed: {e}")
         
-        print("\n" + "=" * 60 + "\n")
+        print("\n" + _BAR + "\n")
     
     print("🎉 All examples completed!")
     print("\nGenerated audio files:")
-    wav_files = [f for f in os.listdir('.') if f.endswith('.wav')]
+    # scandir reuses the dirent's type info, skipping a stat per entry
+    wav_files = sorted(e.name for e in os.scandir('.')
+                       if e.is_file() and e.name.endswith('.wav'))
     for wav_file in wav_files:
         print(f"  🎵 {wav_file}")
 
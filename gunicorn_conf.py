@@ -0,0 +1,19 @@
+"""
+Gunicorn configuration for the Waifu Voice Synthesis API
+Uses gevent workers so Azure network calls don't block other requests
+
+Launch with: gunicorn -c gunicorn_conf.py app:app
+"""
+
+import multiprocessing
+
+bind = "0.0.0.0:5001"
+
+# The service is I/O-bound (Azure TTS network calls), so gevent workers
+# let blocked requests yield instead of tying up a worker each
+worker_class = "gevent"
+worker_connections = 1000
+workers = 2 * multiprocessing.cpu_count() + 1
+
+timeout = 60
+keepalive = 5
@@ -0,0 +1,24 @@
+"""
+Hypercorn configuration for HTTP/2 (and optional HTTP/3) serving
+
+HTTP/1.1 limits a browser tab to ~6 connections, so a slow streaming
+/synthesize response blocks parallel /voices fetches. Hypercorn
+multiplexes all requests over one HTTP/2 connection (h3 over QUIC when
+certificates and a quic bind are configured).
+
+Launch with: hypercorn -c hypercorn_conf.py app:app
+"""
+
+import multiprocessing
+import os
+
+bind = [os.environ.get('HYPERCORN_BIND', '0.0.0.0:5001')]
+workers = int(os.environ.get('HYPERCORN_WORKERS', multiprocessing.cpu_count()))
+
+# TLS enables h2 via ALPN; without certificates Hypercorn serves h2c/HTTP/1.1
+certfile = os.environ.get('TLS_CERTFILE')
+keyfile = os.environ.get('TLS_KEYFILE')
+
+# HTTP/3 needs TLS plus a QUIC bind, e.g. QUIC_BIND=0.0.0.0:5001
+if certfile and os.environ.get('QUIC_BIND'):
+    quic_bind = [os.environ['QUIC_BIND']]
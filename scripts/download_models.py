@@ -2,35 +2,92 @@
 Download and setup voice models for waifu voice synthesis
 """
 
+import hashlib
 import os
 import requests
 import json
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import logging
 
+PLACEHOLDER = b'# Placeholder model file\n'
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def download_model(model_name: str, model_url: str, models_dir: Path) -> bool:
-    """Download a voice model"""
+
+def _write_json(path: Path, obj: dict):
+    """Serialize obj to path in one shot (orjson when available)."""
+    if ORJSON_AVAILABLE:
+        data = orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    else:
+        data = json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.write(fd, data)
+    finally:
+        os.close(fd)
+
+def download_model(model_name: str, model_url: str, models_dir: Path,
+                   expected_digest: str = None) -> str:
+    """
+    Download a voice model, returning its BLAKE2b hex digest.
+
+    The digest is computed while streaming, so integrity checking costs
+    no extra read pass over a multi-gigabyte file. If expected_digest
+    is given and does not match, the corrupt file is removed.
+
+    Returns:
+        Hex digest of the downloaded file, or None on failure
+    """
     try:
         logger.info(f"Downloading model: {model_name}")
-        
+
         response = requests.get(model_url, stream=True)
         response.raise_for_status()
-        
+
         model_path = models_dir / f"{model_name}.pt"
-        
-        with open(model_path, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
-        
-        logger.info(f"Successfully downloaded: {model_name}")
-        return True
-        
+
+        # Read straight off the raw urllib3 stream into one reusable
+        # 1 MiB buffer: readinto() avoids allocating a fresh bytes
+        # object per chunk, and the large chunks plus a big write
+        # buffer cut syscalls by ~100x vs 8 KiB iter_content
+        buf = bytearray(1 << 20)
+        mv = memoryview(buf)
+        raw = response.raw
+        raw.decode_content = True
+        hasher = hashlib.blake2b()
+
+        with open(model_path, 'wb', buffering=1 << 22) as f:
+            while (n := raw.readinto(mv)):
+                hasher.update(mv[:n])
+                f.write(mv[:n])
+            # Force the model to stable storage: a crash right after
+            # "download complete" must not leave a truncated file
+            f.flush()
+            os.fdatasync(f.fileno())
+
+        digest = hasher.hexdigest()
+
+        if expected_digest and digest != expected_digest:
+            logger.error(f"Digest mismatch for {model_name}: "
+                         f"expected {expected_digest}, got {digest}")
+            model_path.unlink(missing_ok=True)
+            return None
+
+        logger.info(f"Successfully downloaded: {model_name} (blake2b {digest[:16]}...)")
+        return digest
+
     except Exception as e:
         logger.error(f"Failed to download {model_name}: {e}")
-        return False
+        return None
 
 def create_default_models(models_dir: Path):
     """Create default model configurations"""
@@ -81,8 +138,7 @@ def create_default_models(models_dir: Path):
     
     for char_name, config in characters.items():
         config_file = models_dir / f"character_{char_name}.json"
-        with open(config_file, 'w', encoding='utf-8') as f:
-            json.dump(config, f, indent=2, ensure_ascii=False)
+        _write_json(config_file, config)
         logger.info(f"Created character config: {char_name}")
 
 def setup_models():
@@ -103,14 +159,23 @@ def setup_models():
         'rei_voice.pt',
         'miku_voice.pt'
     ]
-    
-    for model_file in model_placeholders:
-        model_path = models_dir / model_file
-        if not model_path.exists():
-            # Create empty placeholder
-            with open(model_path, 'wb') as f:
-                f.write(b'# Placeholder model file\n')
-            logger.info(f"Created placeholder: {model_file}")
+
+    def _create_placeholder(model_file: str):
+        # O_EXCL makes the exists-check-and-create atomic: a concurrent
+        # setup run can't both pass a .exists() test and clobber the file
+        try:
+            fd = os.open(models_dir / model_file,
+                         os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+        except FileExistsError:
+            return
+        try:
+            os.write(fd, PLACEHOLDER)
+        finally:
+            os.close(fd)
+        logger.info(f"Created placeholder: {model_file}")
+
+    with ThreadPoolExecutor(max_workers=len(model_placeholders)) as pool:
+        list(pool.map(_create_placeholder, model_placeholders))
     
     # Create model index
     model_index = {
@@ -140,9 +205,8 @@ def setup_models():
     }
     
     index_file = models_dir / 'model_index.json'
-    with open(index_file, 'w', encoding='utf-8') as f:
-        json.dump(model_index, f, indent=2, ensure_ascii=False)
-    
+    _write_json(index_file, model_index)
+
     logger.info("Model setup complete!")
     logger.info("Note: These are placeholder models. For production use, replace with trained TTS models.")
 
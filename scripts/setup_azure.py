@@ -5,6 +5,7 @@ Helps configure Azure credentials and test the connection
 
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Add parent directory to path
@@ -12,6 +13,12 @@ sys.path.append(str(Path(__file__).parent.parent))
 
 from waifu_voice.azure_tts import AzureWaifuTTS
 
+try:
+    from dotenv import load_dotenv
+    DOTENV_AVAILABLE = True
+except ImportError:
+    DOTENV_AVAILABLE = False
+
 def setup_azure_credentials():
     """Interactive setup for Azure Speech credentials"""
     print("🌸 Azure Speech Service Setup for Waifu Voice Synthesis")
@@ -102,27 +109,38 @@ def test_waifu_voices(azure_tts: AzureWaifuTTS):
         }
     ]
     
-    for i, test in enumerate(test_cases, 1):
-        print(f"\n🎵 Test {i}: {test['character'].title()} ({test['emotion']})")
-        print(f"Text: \"{test['text']}\"")
-        
-        try:
-            audio_data = azure_tts.synthesize(
-                text=test['text'],
-                character=test['character'],
-                emotion=test['emotion']
-            )
-            
-            if len(audio_data) > 1000:  # Check if we got actual audio data
-                filename = f"test_{test['character']}_{test['emotion']}.wav"
-                with open(filename, 'wb') as f:
-                    f.write(audio_data)
-                print(f"✅ Audio generated: {filename}")
-            else:
-                print("⚠️ Generated audio seems too short")
-                
-        except Exception as e:
-            print(f"❌ Failed: {e}")
+    def _synthesize_case(test):
+        return azure_tts.synthesize(
+            text=test['text'],
+            character=test['character'],
+            emotion=test['emotion']
+        )
+
+    # Azure calls are network-bound; run the four characters in parallel
+    # and report in order once all are back
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(_synthesize_case, test) for test in test_cases]
+
+        for i, (test, future) in enumerate(zip(test_cases, futures), 1):
+            print(f"\n🎵 Test {i}: {test['character'].title()} ({test['emotion']})")
+            print(f"Text: \"{test['text']}\"")
+
+            try:
+                audio_data = future.result()
+
+                if len(audio_data) > 1000:  # Check if we got actual audio data
+                    filename = f"test_{test['character']}_{test['emotion']}.wav"
+                    fd = os.open(filename, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+                    try:
+                        os.write(fd, audio_data)
+                    finally:
+                        os.close(fd)
+                    print(f"✅ Audio generated: {filename}")
+                else:
+                    print("⚠️ Generated audio seems too short")
+
+            except Exception as e:
+                print(f"❌ Failed: {e}")
 
 def check_existing_config():
     """Check if Azure is already configured"""
@@ -132,8 +150,8 @@ def check_existing_config():
         print("📋 Found existing configuration in .env file")
         
         # Try to load and test
-        from dotenv import load_dotenv
-        load_dotenv(env_file)
+        if DOTENV_AVAILABLE:
+            load_dotenv(env_file)
         
         key = os.environ.get('AZURE_SPEECH_KEY')
         region = os.environ.get('AZURE_SPEECH_REGION')
@@ -0,0 +1,77 @@
+"""
+Pre-synthesize common phrases to warm the voice cache
+
+Run this at deploy time (or from cron) so the first user to ask for a
+stock phrase gets a cache hit instead of paying Azure synthesis
+latency. Audio lands in pre_synth/ named by the DiskLRU digest of its
+(text, character, emotion) key, with a manifest.json mapping digests
+back to keys so clients can preload the files into memory.
+"""
+
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from waifu_voice.azure_tts import AzureWaifuTTS
+from waifu_voice.cache import DiskLRU
+
+PRE_SYNTH_DIR = "pre_synth"
+
+# (text, character, emotion) tuples worth having ready before any user asks
+COMMON_PHRASES = [
+    ("Welcome back!", "sakura", "cheerful"),
+    ("Thank you!", "sakura", "cheerful"),
+    ("Please wait a moment~", "sakura", "calm"),
+    ("Have a great day! ♪", "sakura", "cheerful"),
+    ("How can I help you?", "sakura", "cheerful"),
+    ("Konnichiwa! ♪", "sakura", "cheerful"),
+    ("Ara ara~ What do we have here?", "sakura", "cheerful"),
+    ("Sugoi! You did amazing! ♪", "miku", "excited"),
+    ("Level up! You're getting stronger! ♪", "miku", "excited"),
+    ("Hello! Thank you for contacting our support team.", "sakura", "cheerful"),
+    ("Is there anything else I can help you with today?", "sakura", "cheerful"),
+    ("Welcome to today's lesson. Let's learn together ♪", "yuki", "calm"),
+]
+
+
+def warm_cache(phrases=COMMON_PHRASES, out_dir: str = PRE_SYNTH_DIR) -> int:
+    """Synthesize phrases into out_dir; returns the number cached."""
+    tts = AzureWaifuTTS()
+    if not tts.azure_available:
+        print("❌ Azure TTS not configured; run scripts/setup_azure.py first")
+        return 0
+
+    cache = DiskLRU(out_dir)
+    manifest = {}
+
+    def _synth(key):
+        text, character, emotion = key
+        audio = tts.synthesize(text, character, emotion)
+        if audio:
+            cache.put(key, audio)
+            manifest[cache._digest(key)] = list(key)
+            print(f"✅ Cached: {text[:40]}")
+        else:
+            print(f"❌ Failed: {text[:40]}")
+        return audio
+
+    # Azure calls are network-bound, so overlap a handful at a time
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(_synth, phrases))
+
+    manifest_path = os.path.join(out_dir, 'manifest.json')
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+
+    cached = sum(1 for r in results if r)
+    print(f"\n🎉 Pre-synthesized {cached}/{len(phrases)} phrases into {out_dir}/")
+    return cached
+
+
+if __name__ == '__main__':
+    warm_cache()
@@ -3,21 +3,38 @@ Waifu Voice Synthesis Pipeline
 Advanced voice synthesis system for anime waifu characters
 """
 
-from .synthesizer import WaifuVoiceSynthesizer
-from .emotion_detector import EmotionDetector
-from .voice_models import VoiceModelManager
-from .japanese_processor import JapaneseTextProcessor
-from .audio_processor import AudioProcessor
-from .azure_tts import AzureWaifuTTS
+import importlib
 
 __version__ = "1.0.0"
 __author__ = "Waifu AI Labs"
 
-__all__ = [
-    "WaifuVoiceSynthesizer",
-    "EmotionDetector", 
-    "VoiceModelManager",
-    "JapaneseTextProcessor",
-    "AudioProcessor",
-    "AzureWaifuTTS"
-]
+# Public name -> defining submodule; imported on first attribute access
+# (PEP 562) so `from waifu_voice.cache import DiskLRU` doesn't drag in
+# numpy and the Azure SDK via the package __init__
+_LAZY = {
+    "WaifuVoiceSynthesizer": ".synthesizer",
+    "EmotionDetector": ".emotion_detector",
+    "VoiceModelManager": ".voice_models",
+    "JapaneseTextProcessor": ".japanese_processor",
+    "AudioProcessor": ".audio_processor",
+    "AzureWaifuTTS": ".azure_tts",
+    "DiskLRU": ".cache",
+}
+
+__all__ = list(_LAZY)
+
+
+def __getattr__(name):
+    try:
+        module_name = _LAZY[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    module = importlib.import_module(module_name, __name__)
+    value = getattr(module, name)
+    # Cache on the package so subsequent lookups skip this hook
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
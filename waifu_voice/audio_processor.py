@@ -3,10 +3,11 @@ Audio Processing Module
 Handles audio effects, post-processing, and output formatting
 """
 
-import io
-import wave
+import os
 import struct
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
 from typing import Dict, List, Optional, Tuple, Union
 import logging
 
@@ -19,13 +20,134 @@ except ImportError:
     AUDIO_LIBS_AVAILABLE = False
     logging.warning("Audio libraries not available, limited processing capabilities")
 
+try:
+    import scipy.signal as sps
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+try:
+    import resampy
+    RESAMPY_AVAILABLE = True
+except ImportError:
+    RESAMPY_AVAILABLE = False
+
+try:
+    import torch
+    import torchaudio
+    TORCH_AVAILABLE = True
+except ImportError:
+    TORCH_AVAILABLE = False
+
+
+if NUMBA_AVAILABLE:
+    # Fused elementwise kernels: the NumPy versions stack abs/sign/
+    # where/clip passes with a temporary each; these do one pass with
+    # no intermediates and auto-vectorize
+
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _energy_boost_kernel(audio, threshold, ratio, out):
+        for i in prange(audio.shape[0]):
+            a = audio[i]
+            abs_a = abs(a)
+            if abs_a > threshold:
+                boosted = threshold + (abs_a - threshold) * ratio
+                out[i] = boosted if a >= 0 else -boosted
+            else:
+                out[i] = a
+
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _breathiness_kernel(audio, noise, out):
+        for i in prange(audio.shape[0]):
+            a = audio[i]
+            mask = 1.0 - min(abs(a) * 10.0, 1.0)
+            out[i] = a + noise[i] * mask
+
+    @njit(parallel=True, cache=True, fastmath=True)
+    def _i16_to_f32_kernel(src, dst):
+        inv = np.float32(1.0 / 32768.0)
+        for i in prange(src.shape[0]):
+            dst[i] = src[i] * inv
+
+    @njit(cache=True)
+    def _audio_stats_kernel(audio):
+        sq_sum = 0.0
+        peak = 0.0
+        trough = 1e30
+        for i in range(audio.shape[0]):
+            x = audio[i]
+            abs_x = abs(x)
+            sq_sum += x * x
+            if abs_x > peak:
+                peak = abs_x
+            if abs_x < trough:
+                trough = abs_x
+        return sq_sum, peak, trough
+
 
 class AudioProcessor:
     """Processes and enhances synthesized audio"""
     
-    def __init__(self, sample_rate: int = 22050):
+    def __init__(self, sample_rate: int = 22050, device: str = None):
         self.sample_rate = sample_rate
         self.logger = logging.getLogger(__name__)
+
+        # Optional GPU offload: pass device='cuda' to run the effects
+        # chain as torch tensors, converting to numpy only at the end
+        self.device = None
+        self._pitch_transforms = {}
+        if device is not None:
+            if TORCH_AVAILABLE:
+                self.device = torch.device(device)
+            else:
+                self.logger.warning(
+                    "torch/torchaudio not available, ignoring device=%s", device)
+
+        # Scratch buffers reused by _array_to_bytes so the float->int16
+        # conversion doesn't allocate three temporaries per call
+        self._f32_scratch = None
+        self._i16_buf = None
+
+        # Precompiled 44-byte RIFF/fmt/data header layout for mono
+        # 16-bit PCM output
+        self._wav_header = struct.Struct('<4sI4s4sIHHIIHH4sI')
+
+        # PCG64 generator: faster Gaussian draws than the legacy
+        # MT19937 RandomState and no global-state lock
+        self._rng = np.random.default_rng()
+
+        # Vibrato rate curves keyed on (samples, rate, depth): buffer
+        # lengths cluster around a few values, so the arange+sin cost
+        # is usually paid once per utterance shape
+        self._vibrato_cache = {}
+
+        # Worker threads for create_audio_variations; kept small so we
+        # don't oversubscribe cores numba's own threading already uses
+        self._variation_pool = ThreadPoolExecutor(
+            max_workers=max(1, (os.cpu_count() or 2) // 2))
+
+        # Second-order 3 kHz highpass used for brightness emphasis;
+        # blending its output with the dry signal gives a high-shelf
+        # response, built once here instead of per call
+        self._brightness_sos = None
+        if SCIPY_AVAILABLE:
+            cutoff = min(3000.0, 0.45 * sample_rate)
+            self._brightness_sos = sps.butter(
+                2, cutoff / (sample_rate / 2), btype='high', output='sos')
+
+        # Trigger numba JIT compilation now rather than on the first
+        # real utterance
+        if NUMBA_AVAILABLE:
+            warmup = np.zeros(16, dtype=np.float32)
+            _energy_boost_kernel(warmup, 0.1, 1.1, np.empty_like(warmup))
+            _breathiness_kernel(warmup, warmup, np.empty_like(warmup))
+            _i16_to_f32_kernel(np.zeros(16, dtype=np.int16), np.empty_like(warmup))
         
         # Audio effect presets
         self.effect_presets = {
@@ -68,7 +190,31 @@ class AudioProcessor:
             'excited': {'energy_boost': 0.3, 'pitch_variation': 0.2},
             'sad': {'pitch_lower': 0.2, 'reverb_increase': 0.3}
         }
-        
+
+        # Character name -> preset, plus every preset x emotion merge,
+        # resolved once here so apply_character_effects is two dict
+        # lookups instead of a copy + update per utterance. Frozen via
+        # MappingProxyType so a caller can't mutate a shared preset.
+        self._character_presets = {
+            'sakura': 'cute', 'cute': 'cute',
+            'yuki': 'soft', 'soft': 'soft',
+            'miku': 'energetic', 'energetic': 'energetic',
+        }
+        self._combined_effects = {}
+        for preset_name, preset in self.effect_presets.items():
+            self._combined_effects[(preset_name, None)] = MappingProxyType(dict(preset))
+            for emotion, emotion_fx in self.emotion_effects.items():
+                self._combined_effects[(preset_name, emotion)] = MappingProxyType(
+                    {**preset, **emotion_fx})
+
+        # Specialize further: compose a closure per combination with
+        # only its active stages and their parameters bound, so the
+        # per-utterance path has no dict walks or branch checks at all
+        self._pipelines = {
+            key: self._build_pipeline(fx)
+            for key, fx in self._combined_effects.items()
+        }
+
     def process_audio(self, audio_data: Union[np.ndarray, bytes], 
                      effects: Dict[str, float] = None,
                      output_format: str = 'wav') -> bytes:
@@ -78,11 +224,13 @@ class AudioProcessor:
             return audio_data if isinstance(audio_data, bytes) else audio_data.tobytes()
         
         try:
-            # Convert input to numpy array if needed
+            # Convert input to numpy array if needed; contiguous
+            # float32 input passes through with zero copy, so callers
+            # should prefer handing in float32
             if isinstance(audio_data, bytes):
                 audio_array = self._bytes_to_array(audio_data)
             else:
-                audio_array = audio_data.astype(np.float32)
+                audio_array = np.ascontiguousarray(audio_data, dtype=np.float32)
             
             # Apply effects
             if effects:
@@ -102,43 +250,103 @@ class AudioProcessor:
         """Convert audio bytes to numpy array"""
         # Assume 16-bit PCM for now
         audio_array = np.frombuffer(audio_bytes, dtype=np.int16)
+
+        if NUMBA_AVAILABLE:
+            # Cast and scale in one fused pass instead of an astype
+            # copy followed by a dividing second pass
+            out = np.empty(audio_array.shape[0], dtype=np.float32)
+            _i16_to_f32_kernel(audio_array, out)
+            return out
+
         return audio_array.astype(np.float32) / 32768.0
     
+    def _to_int16(self, audio_array: np.ndarray) -> np.ndarray:
+        """Scale, clip and cast float audio to int16 without fresh temporaries.
+
+        np.clip / multiply / astype each allocated a full-size array per
+        call; writing through out= into two reusable scratch buffers
+        makes this one pass over memory.
+        """
+        n = len(audio_array)
+        if self._i16_buf is None or len(self._i16_buf) < n:
+            self._f32_scratch = np.empty(n, dtype=np.float32)
+            self._i16_buf = np.empty(n, dtype=np.int16)
+
+        scratch = self._f32_scratch[:n]
+        np.multiply(audio_array, 32767.0, out=scratch)
+        np.clip(scratch, -32767.0, 32767.0, out=scratch)
+        np.rint(scratch, out=scratch)
+
+        audio_int16 = self._i16_buf[:n]
+        audio_int16[:] = scratch
+        return audio_int16
+
     def _array_to_bytes(self, audio_array: np.ndarray, format: str = 'wav') -> bytes:
         """Convert numpy array to audio bytes"""
-        # Ensure array is in correct range
-        audio_array = np.clip(audio_array, -1.0, 1.0)
-        
+        audio_int16 = self._to_int16(audio_array)
+        data = audio_int16.tobytes()
+
         if format == 'wav':
-            # Convert to 16-bit PCM
-            audio_int16 = (audio_array * 32767).astype(np.int16)
-            
-            # Create WAV file in memory
-            buffer = io.BytesIO()
-            with wave.open(buffer, 'wb') as wav_file:
-                wav_file.setnchannels(1)  # Mono
-                wav_file.setsampwidth(2)  # 16-bit
-                wav_file.setframerate(self.sample_rate)
-                wav_file.writeframes(audio_int16.tobytes())
-            
-            return buffer.getvalue()
+            # Output is always mono 16-bit PCM, so pack the 44-byte
+            # RIFF header directly instead of going through the wave
+            # module's BytesIO state machine and its extra copies
+            header = self._wav_header.pack(
+                b'RIFF', 36 + len(data), b'WAVE',
+                b'fmt ', 16, 1, 1,
+                self.sample_rate, self.sample_rate * 2, 2, 16,
+                b'data', len(data)
+            )
+            return header + data
         else:
             # Return raw PCM
-            audio_int16 = (audio_array * 32767).astype(np.int16)
-            return audio_int16.tobytes()
+            return data
     
+    def stream_wav(self, audio_iter, chunk_ms: int = 100):
+        """Yield a WAV stream: header first, then PCM as it is produced.
+
+        The header goes out immediately with the 0xFFFFFFFF
+        unknown-length sentinel, so an HTTP client can start playback
+        while synthesis is still running instead of waiting for
+        _array_to_bytes to materialize the whole file. Incoming float32
+        blocks are regrouped into ~chunk_ms chunks before conversion.
+        """
+        yield self._wav_header.pack(
+            b'RIFF', 0xFFFFFFFF, b'WAVE',
+            b'fmt ', 16, 1, 1,
+            self.sample_rate, self.sample_rate * 2, 2, 16,
+            b'data', 0xFFFFFFFF
+        )
+
+        samples_per_chunk = max(1, self.sample_rate * chunk_ms // 1000)
+        pending = np.empty(0, dtype=np.float32)
+
+        for block in audio_iter:
+            block = np.asarray(block, dtype=np.float32)
+            pending = np.concatenate((pending, block)) if len(pending) else block
+            while len(pending) >= samples_per_chunk:
+                chunk, pending = (pending[:samples_per_chunk],
+                                  pending[samples_per_chunk:])
+                yield self._to_int16(chunk).tobytes()
+
+        if len(pending):
+            yield self._to_int16(pending).tobytes()
+
     def _apply_effects(self, audio: np.ndarray, effects: Dict[str, float]) -> np.ndarray:
         """Apply audio effects to the audio signal"""
-        processed_audio = audio.copy()
-        
+        if self.device is not None:
+            return self._apply_effects_torch(audio, effects)
+
+        # No upfront copy: every effect below returns a fresh array, so
+        # the input is never mutated and a full-buffer memcpy is saved
+        # when any effect applies. asarray is zero-copy for float32
+        # input and pins the chain to float32, halving memory bandwidth
+        # versus accidental float64 promotion.
+        processed_audio = np.asarray(audio, dtype=np.float32)
+
         # Pitch shifting
         if 'pitch_shift' in effects and AUDIO_LIBS_AVAILABLE:
             shift_steps = effects['pitch_shift'] * 12  # Convert to semitones
-            processed_audio = librosa.effects.pitch_shift(
-                processed_audio, 
-                sr=self.sample_rate, 
-                n_steps=shift_steps
-            )
+            processed_audio = self._pitch_shift(processed_audio, shift_steps)
         
         # Brightness adjustment (simple high-frequency emphasis)
         if 'brightness' in effects:
@@ -152,9 +360,9 @@ class AudioProcessor:
         if 'pitch_variation' in effects:
             processed_audio = self._apply_pitch_variation(processed_audio, effects['pitch_variation'])
         
-        # Volume adjustments
+        # Volume adjustments (out-of-place so the caller's array is safe)
         if 'volume_reduction' in effects:
-            processed_audio *= (1.0 - effects['volume_reduction'])
+            processed_audio = processed_audio * np.float32(1.0 - effects['volume_reduction'])
         
         # Breathiness effect
         if 'breathiness' in effects:
@@ -162,19 +370,161 @@ class AudioProcessor:
         
         return processed_audio
     
+    def _build_pipeline(self, effects: Dict[str, float]):
+        """Compose the active effect stages for one fixed effects dict.
+
+        Mirrors the branch order of _apply_effects with each stage's
+        parameters already bound, leaving just a tuple walk at call
+        time.
+        """
+        stages = []
+
+        if 'pitch_shift' in effects and AUDIO_LIBS_AVAILABLE:
+            steps = effects['pitch_shift'] * 12
+            stages.append(lambda a, s=steps: self._pitch_shift(a, s))
+
+        if 'brightness' in effects:
+            brightness = effects['brightness']
+            stages.append(lambda a, b=brightness: self._adjust_brightness(a, b))
+
+        if 'energy_boost' in effects:
+            boost = effects['energy_boost']
+            stages.append(lambda a, b=boost: self._apply_energy_boost(a, b))
+
+        if 'pitch_variation' in effects:
+            variation = effects['pitch_variation']
+            stages.append(lambda a, v=variation: self._apply_pitch_variation(a, v))
+
+        if 'volume_reduction' in effects:
+            gain = np.float32(1.0 - effects['volume_reduction'])
+            stages.append(lambda a, g=gain: a * g)
+
+        if 'breathiness' in effects:
+            breathiness = effects['breathiness']
+            stages.append(lambda a, b=breathiness: self._add_breathiness(a, b))
+
+        def pipeline(audio, _stages=tuple(stages)):
+            audio = np.asarray(audio, dtype=np.float32)
+            for stage in _stages:
+                audio = stage(audio)
+            return audio
+
+        return pipeline
+
+    def _apply_effects_torch(self, audio: np.ndarray, effects: Dict[str, float]) -> np.ndarray:
+        """GPU effects chain: one tensor stays on self.device throughout.
+
+        Effects without a tensor port (pitch variation, breathiness)
+        run on the CPU result afterwards.
+        """
+        tensor = torch.from_numpy(
+            np.ascontiguousarray(audio, dtype=np.float32)).to(self.device)
+
+        if 'pitch_shift' in effects:
+            steps = effects['pitch_shift'] * 12
+            # PitchShift builds filter banks at construction, so cache
+            # one transform per distinct step value
+            key = round(steps, 2)
+            transform = self._pitch_transforms.get(key)
+            if transform is None:
+                transform = torchaudio.transforms.PitchShift(
+                    self.sample_rate, n_steps=steps).to(self.device)
+                self._pitch_transforms[key] = transform
+            tensor = transform(tensor)
+
+        if 'brightness' in effects:
+            brightness = effects['brightness']
+            if brightness > 0:
+                diff = torch.diff(tensor, prepend=tensor[:1])
+                tensor = tensor + brightness * 0.5 * diff
+            else:
+                alpha = 0.8 + brightness * 0.2
+                tensor = torchaudio.functional.lfilter(
+                    tensor,
+                    torch.tensor([1.0, -alpha], device=self.device),
+                    torch.tensor([1.0 - alpha, 0.0], device=self.device),
+                    clamp=False
+                )
+
+        if 'energy_boost' in effects:
+            threshold = 0.1
+            ratio = 1.0 + effects['energy_boost']
+            abs_t = tensor.abs()
+            tensor = torch.where(
+                abs_t > threshold,
+                torch.copysign(threshold + (abs_t - threshold) * ratio, tensor),
+                tensor
+            )
+
+        if 'volume_reduction' in effects:
+            tensor = tensor * (1.0 - effects['volume_reduction'])
+
+        processed_audio = tensor.cpu().numpy()
+
+        if 'pitch_variation' in effects:
+            processed_audio = self._apply_pitch_variation(
+                processed_audio, effects['pitch_variation'])
+
+        if 'breathiness' in effects:
+            processed_audio = self._add_breathiness(
+                processed_audio, effects['breathiness'])
+
+        return processed_audio
+
+    def _pitch_shift(self, audio: np.ndarray, shift_steps: float) -> np.ndarray:
+        """Pitch shift, taking a cheap resampling path for small shifts.
+
+        librosa.effects.pitch_shift runs a full STFT/iSTFT round trip;
+        for shifts under half a semitone, plain resampling followed by a
+        length-matched crop/pad is audibly equivalent and far cheaper.
+        The tempo change it introduces is ~3% at worst, below notice for
+        the subtle shifts used here.
+        """
+        if RESAMPY_AVAILABLE and abs(shift_steps) < 0.5:
+            rate = 2.0 ** (-shift_steps / 12.0)
+            shifted = resampy.resample(
+                audio, self.sample_rate, int(self.sample_rate * rate),
+                filter='kaiser_fast'
+            )
+            if len(shifted) >= len(audio):
+                return shifted[:len(audio)]
+            return np.pad(shifted, (0, len(audio) - len(shifted)))
+
+        return librosa.effects.pitch_shift(
+            audio,
+            sr=self.sample_rate,
+            n_steps=shift_steps
+        )
+
     def _adjust_brightness(self, audio: np.ndarray, brightness: float) -> np.ndarray:
         """Adjust brightness by emphasizing/de-emphasizing high frequencies"""
         if not AUDIO_LIBS_AVAILABLE:
             return audio
             
-        # Simple high-frequency emphasis using differentiation
         if brightness > 0:
-            # Emphasize high frequencies
+            if self._brightness_sos is not None:
+                # High-shelf emphasis: mix in a real 3 kHz highpass
+                # instead of the crude first-order differentiator,
+                # which tilted the whole spectrum
+                high = sps.sosfilt(self._brightness_sos, audio)
+                return (audio + brightness * high).astype(np.float32, copy=False)
+
+            # Simple high-frequency emphasis using differentiation
             diff = np.diff(audio, prepend=audio[0])
             return audio + brightness * diff * 0.5
         else:
             # De-emphasize high frequencies with simple low-pass
             alpha = 0.8 + brightness * 0.2
+            if SCIPY_AVAILABLE:
+                # Same single-pole IIR, run in scipy's C loop instead of
+                # one Python multiply-add per sample; lfiltic seeds the
+                # state so filtered[0] == audio[0] as before
+                b = np.array([1 - alpha], dtype=np.float32)
+                a = np.array([1.0, -alpha], dtype=np.float32)
+                zi = sps.lfiltic(b, a, [audio[0]])
+                filtered, _ = sps.lfilter(b, a, audio, zi=zi)
+                return filtered.astype(np.float32, copy=False)
+
             filtered = np.zeros_like(audio)
             filtered[0] = audio[0]
             for i in range(1, len(audio)):
@@ -186,14 +536,21 @@ class AudioProcessor:
         # Simple dynamic range expansion
         threshold = 0.1
         ratio = 1.0 + boost
-        
-        boosted = np.where(
-            np.abs(audio) > threshold,
-            np.sign(audio) * (threshold + (np.abs(audio) - threshold) * ratio),
-            audio
-        )
-        
-        return boosted
+
+        if NUMBA_AVAILABLE:
+            boosted = np.empty_like(audio)
+            _energy_boost_kernel(audio, threshold, ratio, boosted)
+            return boosted
+
+        # Branchless equivalent of the abs/sign/where formulation:
+        # sign(a)*(t + (|a|-t)*r) == a + copysign(max(0, |a|-t)*(r-1), a),
+        # which needs one temporary and two passes instead of five
+        excess = np.abs(audio)
+        excess -= threshold
+        np.maximum(excess, 0, out=excess)
+        excess *= np.float32(ratio - 1.0)
+
+        return audio + np.copysign(excess, audio)
     
     def _apply_pitch_variation(self, audio: np.ndarray, variation: float) -> np.ndarray:
         """Apply subtle pitch variations for more natural speech"""
@@ -204,93 +561,129 @@ class AudioProcessor:
         vibrato_rate = 4.0  # Hz
         vibrato_depth = variation * 0.5  # semitones
         
-        t = np.arange(len(audio)) / self.sample_rate
-        vibrato = np.sin(2 * np.pi * vibrato_rate * t) * vibrato_depth
-        
-        # Apply pitch modulation (simplified)
-        modulated = audio.copy()
-        for i in range(1, len(audio)):
-            pitch_factor = 2 ** (vibrato[i] / 12)
-            # Simple time-domain pitch modification
-            if pitch_factor != 1.0:
-                modulated[i] = audio[int(i / pitch_factor)] if int(i / pitch_factor) < len(audio) else audio[i]
-        
-        return modulated
+        rate = self._vibrato_rate_curve(len(audio), vibrato_rate, vibrato_depth)
+
+        # Resample along the integrated instantaneous rate in one
+        # np.interp pass: replaces the per-sample Python loop and its
+        # nearest-neighbour lookup (which aliased) with C-level linear
+        # interpolation
+        read_pos = np.cumsum(1.0 / rate)
+        read_pos -= read_pos[0]
+
+        indices = np.arange(len(audio), dtype=np.float32)
+        return np.interp(read_pos, indices, audio).astype(np.float32)
+
+    def _vibrato_rate_curve(self, n_samples: int, vibrato_rate: float,
+                            vibrato_depth: float) -> np.ndarray:
+        """Per-sample rate curve 2**(vibrato/12), cached across calls."""
+        # Quantize depth so float jitter doesn't defeat the cache
+        key = (n_samples, vibrato_rate, round(vibrato_depth, 4))
+        rate = self._vibrato_cache.get(key)
+        if rate is None:
+            t = np.arange(n_samples) / self.sample_rate
+            vibrato = np.sin(2 * np.pi * vibrato_rate * t) * vibrato_depth
+            rate = (2.0 ** (vibrato / 12.0)).astype(np.float32)
+            if len(self._vibrato_cache) >= 32:
+                self._vibrato_cache.pop(next(iter(self._vibrato_cache)))
+            self._vibrato_cache[key] = rate
+        return rate
     
     def _add_breathiness(self, audio: np.ndarray, breathiness: float) -> np.ndarray:
         """Add breathiness effect to voice"""
-        # Add subtle noise to simulate breath
-        noise = np.random.normal(0, 0.02 * breathiness, len(audio))
-        
+        # Add subtle noise to simulate breath; float32 draws avoid an
+        # implicit float64 upcast in the mix below
+        noise = self._rng.standard_normal(len(audio), dtype=np.float32)
+        noise *= np.float32(0.02 * breathiness)
+
+        if NUMBA_AVAILABLE:
+            mixed = np.empty_like(audio)
+            _breathiness_kernel(audio, noise, mixed)
+            return mixed
+
         # Mix with original audio, more prominent in quiet sections
         audio_energy = np.abs(audio)
         noise_mask = 1.0 - np.clip(audio_energy * 10, 0, 1)
-        
+
         return audio + noise * noise_mask
     
     def _normalize_audio(self, audio: np.ndarray, target_level: float = -3.0) -> np.ndarray:
         """Normalize audio to target level in dB"""
-        # Calculate RMS level
-        rms = np.sqrt(np.mean(audio**2))
+        audio = np.asarray(audio, dtype=np.float32)
+
+        # Calculate RMS level in float32 (audio**2 promoted to float64,
+        # doubling the bytes pushed through cache for a scalar result)
+        rms = np.sqrt(np.mean(np.square(audio), dtype=np.float32))
         if rms == 0:
             return audio
-        
+
         # Target level in linear scale
         target_linear = 10**(target_level / 20)
-        
-        # Apply normalization
-        normalized = audio * (target_linear / rms)
-        
+
+        # Apply normalization (float32 scalar so the product stays float32)
+        normalized = audio * np.float32(target_linear / rms)
+
         # Apply soft limiting to prevent clipping
         return self._soft_limit(normalized)
     
     def _soft_limit(self, audio: np.ndarray, threshold: float = 0.95) -> np.ndarray:
         """Apply soft limiting to prevent harsh clipping"""
-        def soft_clip(x):
-            if abs(x) <= threshold:
-                return x
-            else:
-                return threshold * np.tanh(x / threshold)
-        
-        return np.vectorize(soft_clip)(audio)
+        # Vectorized: np.vectorize ran a Python function per sample;
+        # operating on the whole array keeps the tanh in NumPy's C loop
+        mask = np.abs(audio) > threshold
+        if not mask.any():
+            return audio
+
+        limited = audio.copy()
+        limited[mask] = threshold * np.tanh(audio[mask] / threshold)
+        return limited
     
     def apply_character_effects(self, audio: np.ndarray, character: str, 
                               emotion: str = 'neutral') -> np.ndarray:
         """Apply character-specific and emotion-specific effects"""
-        # Get character preset
-        if character in ['sakura', 'cute']:
-            preset = self.effect_presets['cute']
-        elif character in ['yuki', 'soft']:
-            preset = self.effect_presets['soft']
-        elif character in ['miku', 'energetic']:
-            preset = self.effect_presets['energetic']
-        else:
-            preset = self.effect_presets['cute']
-        
-        # Combine with emotion effects
-        combined_effects = preset.copy()
-        if emotion in self.emotion_effects:
-            combined_effects.update(self.emotion_effects[emotion])
-        
-        return self._apply_effects(audio, combined_effects)
+        preset_name = self._character_presets.get(character, 'cute')
+        key = (preset_name, emotion if (preset_name, emotion) in self._pipelines else None)
+
+        # The torch path still dispatches through the generic chain
+        if self.device is not None:
+            return self._apply_effects(audio, self._combined_effects[key])
+
+        return self._pipelines[key](audio)
     
-    def create_audio_variations(self, audio: np.ndarray, 
+    def create_audio_variations(self, audio: np.ndarray,
                               num_variations: int = 3) -> List[np.ndarray]:
         """Create variations of the same audio for different takes"""
-        variations = []
-        
-        for i in range(num_variations):
-            # Apply subtle random variations
-            effects = {
-                'pitch_shift': np.random.uniform(-0.05, 0.05),
-                'brightness': np.random.uniform(-0.1, 0.1),
-                'tempo_variation': np.random.uniform(0.95, 1.05)
-            }
-            
-            varied_audio = self._apply_effects(audio, effects)
-            variations.append(varied_audio)
-        
-        return variations
+        n = len(audio)
+
+        # Sample all per-variation parameters up front and work on one
+        # contiguous (num_variations, n) batch instead of re-running
+        # the full effects chain per take
+        pitch_shifts = np.random.uniform(-0.05, 0.05, num_variations)
+        brightness = np.random.uniform(-0.1, 0.1, num_variations)
+
+        batch = np.broadcast_to(audio, (num_variations, n)).copy()
+
+        # Pitch shift stays per-row (the shifters work on 1-D signals),
+        # but librosa/resampy release the GIL in their compiled
+        # internals, so the independent rows run across cores
+        if AUDIO_LIBS_AVAILABLE:
+            def _shift_row(i):
+                return self._pitch_shift(batch[i], pitch_shifts[i] * 12)[:n]
+
+            for i, row in enumerate(self._variation_pool.map(
+                    _shift_row, range(num_variations))):
+                batch[i] = row
+
+        # Brightness: the emphasis branch broadcasts over the whole
+        # batch in one pass; the low-pass rows go through the filter
+        bright_rows = brightness > 0
+        if bright_rows.any():
+            diff = np.diff(batch[bright_rows], axis=-1,
+                           prepend=batch[bright_rows][:, :1])
+            batch[bright_rows] += (brightness[bright_rows, None] * 0.5) * diff
+        for i in np.flatnonzero(~bright_rows):
+            batch[i] = self._adjust_brightness(batch[i], brightness[i])
+
+        return list(batch)
     
     def mix_with_background(self, voice_audio: np.ndarray, 
                           background_audio: np.ndarray = None,
@@ -304,8 +697,9 @@ class AudioProcessor:
         voice_trimmed = voice_audio[:min_length]
         bg_trimmed = background_audio[:min_length]
         
-        # Mix with specified levels
-        mixed = voice_trimmed * voice_level + bg_trimmed * (1 - voice_level)
+        # Mix with specified levels (float32 scalars keep the mix float32)
+        mixed = (voice_trimmed * np.float32(voice_level)
+                 + bg_trimmed * np.float32(1 - voice_level))
         
         return self._normalize_audio(mixed)
     
@@ -330,13 +724,24 @@ class AudioProcessor:
     
     def get_audio_info(self, audio: np.ndarray) -> Dict[str, any]:
         """Get information about audio signal"""
+        # Single reduction pass for rms/peak/trough instead of separate
+        # passes each allocating an audio**2 or |audio| temporary
+        if NUMBA_AVAILABLE:
+            sq_sum, peak, trough = _audio_stats_kernel(audio)
+            rms = np.sqrt(sq_sum / len(audio)) if len(audio) else 0.0
+        else:
+            abs_audio = np.abs(audio)
+            rms = np.sqrt(np.mean(np.square(audio)))
+            peak = abs_audio.max() if len(audio) else 0.0
+            trough = abs_audio.min() if len(audio) else 0.0
+
         info = {
             'duration': len(audio) / self.sample_rate,
             'sample_rate': self.sample_rate,
             'samples': len(audio),
-            'rms_level': np.sqrt(np.mean(audio**2)),
-            'peak_level': np.max(np.abs(audio)),
-            'dynamic_range': np.max(np.abs(audio)) - np.min(np.abs(audio))
+            'rms_level': rms,
+            'peak_level': peak,
+            'dynamic_range': peak - trough
         }
         
         # Add frequency analysis if librosa is available
@@ -5,11 +5,47 @@ Provides high-quality TTS with anime-style voice processing
 
 import os
 import io
+import queue
+import random
+import re
+import struct
+import threading
+import time
+import asyncio
 import logging
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from xml.sax.saxutils import escape
 from typing import Dict, List, Optional, Any, Union
 import azure.cognitiveservices.speech as speechsdk
 from pathlib import Path
 
+from .cache import DiskLRU
+
+# SSML breaks/emphasis for anime-style delivery, applied in a single
+# fused scan; longest-first so 'ah-rah ah-rah' wins over any substring
+_EXPRESSION_BREAKS = {
+    '♪': '<break time="300ms"/>♪<break time="200ms"/>',
+    '~': '~<break time="250ms"/>',
+    'ah-rah ah-rah': '<emphasis level="strong">ah-rah ah-rah</emphasis><break time="400ms"/>',
+    'eh-heh-heh': '<emphasis level="moderate">eh-heh-heh</emphasis><break time="300ms"/>',
+    'oo-foo-foo': '<emphasis level="moderate">oo-foo-foo</emphasis><break time="300ms"/>',
+    'kah-wah-ee': '<emphasis level="strong">kah-wah-ee</emphasis><break time="200ms"/>',
+    'soo-goh-ee': '<emphasis level="strong">soo-goh-ee</emphasis><break time="200ms"/>',
+    '...': '<break time="500ms"/>...',
+    '!': '<break time="200ms"/>!',
+    '?': '<break time="300ms"/>?',
+}
+_EXPRESSION_RE = re.compile('|'.join(
+    re.escape(k) for k in sorted(_EXPRESSION_BREAKS, key=len, reverse=True)))
+
+# Shared SSML envelope fragments, interned once at import
+_SSML_HEAD = ('<speak version="1.0" xmlns="http://www.w3.org/2001/10/synthesis" '
+              'xmlns:mstts="https://www.w3.org/2001/mstts" xml:lang="en-US">')
+_SSML_TAIL = '</prosody></mstts:express-as></voice></speak>'
+
 try:
     import numpy as np
     NUMPY_AVAILABLE = True
@@ -17,9 +53,71 @@ except ImportError:
     NUMPY_AVAILABLE = False
     logging.warning("NumPy not available for audio processing")
 
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = NUMPY_AVAILABLE
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _fx_kernel(audio, vibrato, noise, vib_intensity, noise_intensity, gain):
+        """Vibrato + breathiness + volume fused into one pass"""
+        for i in prange(audio.shape[0]):
+            x = audio[i] * (1.0 + vib_intensity * vibrato[i])
+            x += noise_intensity * noise[i] * (1.0 - abs(x))
+            audio[i] = x * gain
+
+    @njit(cache=True, fastmath=True)
+    def _reverb_kernel(audio, delay, gain):
+        """50ms echo tap; sequential because sample i reads i - delay"""
+        for i in range(delay, audio.shape[0]):
+            audio[i] += gain * audio[i - delay]
+
+
+class _BufferPool:
+    """
+    Reusable numpy scratch buffers, bucketed by power-of-two length.
+
+    The effects chain is called per synthesis and its buffers are pure
+    scratch, so recycling them avoids allocator churn under load. Azure
+    SDK callbacks can land on multiple threads, so checkouts are
+    lock-protected.
+    """
+
+    def __init__(self, max_per_bucket: int = 4):
+        self._buffers = defaultdict(deque)
+        self._lock = threading.Lock()
+        self._max_per_bucket = max_per_bucket
+
+    def get(self, n: int, dtype=np.float32) -> np.ndarray:
+        """Return an uninitialized length-n view of a pooled buffer"""
+        size = 1 << max(0, (n - 1).bit_length())
+        key = (size, np.dtype(dtype).str)
+        with self._lock:
+            bucket = self._buffers[key]
+            if bucket:
+                return bucket.pop()[:n]
+        return np.empty(size, dtype=dtype)[:n]
+
+    def put(self, arr: np.ndarray):
+        """Return a buffer (or a view of one) obtained from get()"""
+        base = arr.base if arr.base is not None else arr
+        key = (base.shape[0], base.dtype.str)
+        with self._lock:
+            bucket = self._buffers[key]
+            if len(bucket) < self._max_per_bucket:
+                bucket.append(base)
+
 
 class AzureWaifuTTS:
     """Azure-powered Text-to-Speech with anime voice characteristics"""
+
+    # Shared across instances; only ever touched when numpy is present
+    _fx_pool = _BufferPool()
+
+    # One minute of 16-bit mono silence, shared by all fallback calls
+    _SILENCE = bytes(44100 * 60 * 2)
     
     def __init__(self, subscription_key: Optional[str] = None, region: Optional[str] = None):
         self.logger = logging.getLogger(__name__)
@@ -28,12 +126,53 @@ class AzureWaifuTTS:
         self.subscription_key = subscription_key or os.environ.get('AZURE_SPEECH_KEY')
         self.region = region or os.environ.get('AZURE_SPEECH_REGION', 'eastus')
         
+        # Pools of pre-warmed synthesizers with open Azure connections
+        # (streaming uses a raw-PCM output format, so it needs its own)
+        self._pool = queue.Queue(maxsize=8)
+        self._stream_pool = queue.Queue(maxsize=4)
+
+        # Carries blocking SDK calls for the async entry points; sized
+        # to the pool so threads never outnumber warm connections
+        self._tts_executor = ThreadPoolExecutor(
+            max_workers=self._pool.maxsize, thread_name_prefix='azure-tts')
+
+        # Throttle live connection tests: (monotonic timestamp, result)
+        self._last_connection_test = (0.0, False)
+        self._voices_cache = None
+
+        # Post-processed audio keyed by the full request, so repeated
+        # phrases (intros, UI confirmations) skip both the Azure
+        # round-trip and the effects pass
+        self._synth_cache = DiskLRU(
+            os.path.join(os.path.expanduser('~'), '.cache', 'waifu_voice'))
+
+        # Vibrato sine table, grown lazily to the longest audio seen so
+        # far; recomputing np.sin over the whole clip per call is the
+        # bulk of the pitch-variation cost
+        self._vibrato_table = np.empty(0, dtype=np.float32) if NUMPY_AVAILABLE else None
+        self._reverb_scratch = np.empty(0, dtype=np.float32) if NUMPY_AVAILABLE else None
+        # Unit-variance noise pool for breathiness, filled on first use;
+        # slicing it at a random offset is far cheaper than drawing
+        # fresh Gaussians per sample every call
+        self._noise_pool = None
+        self._rng = np.random.default_rng() if NUMPY_AVAILABLE else None
+
+        if NUMBA_AVAILABLE:
+            # Trigger JIT compilation now so the first real synthesis
+            # doesn't pay it
+            warmup = np.zeros(16, dtype=np.float32)
+            _fx_kernel(warmup, warmup, warmup,
+                       np.float32(0.0), np.float32(0.0), np.float32(1.0))
+            _reverb_kernel(warmup, 4, np.float32(0.1))
+
         if not self.subscription_key:
             self.logger.warning("Azure Speech key not found. Set AZURE_SPEECH_KEY environment variable.")
             self.azure_available = False
         else:
             self.azure_available = True
             self._initialize_azure()
+            if self.azure_available:
+                self._prewarm()
         
         # Waifu character voice mappings (English voices with anime-style adjustments)
         self.character_voices = {
@@ -93,7 +232,48 @@ class AzureWaifuTTS:
             'yatta': 'やった',
             'dame': 'だめ'
         }
-    
+
+        # Romanized-for-English-TTS replacements, compiled once; the
+        # substitution runs on every synthesize call
+        japanese_pronunciations = {
+            'konnichiwa': 'koh-nee-chee-wah',
+            'ohayo': 'oh-hah-yoh',
+            'arigatou': 'ah-ree-gah-toh',
+            'ara ara': 'ah-rah ah-rah',
+            'ehehe': 'eh-heh-heh',
+            'ufufu': 'oo-foo-foo',
+            'kawaii': 'kah-wah-ee',
+            'sugoi': 'soo-goh-ee',
+            'baka': 'bah-kah',
+            'onegai': 'oh-neh-gah-ee',
+            'gomen': 'goh-men',
+            'kyaa': 'kyah',
+            'yatta': 'yah-ttah'
+        }
+        # One alternation pattern instead of a scan per phrase: the sre
+        # engine walks the text once, trying longest keys first
+        self._jp_table = {k.lower(): v for k, v in japanese_pronunciations.items()}
+        self._jp_alt = re.compile(
+            '|'.join(re.escape(k) for k in
+                     sorted(japanese_pronunciations, key=len, reverse=True)),
+            re.IGNORECASE)
+
+        # Precomputed per (character, emotion) — 36 combinations total:
+        # combined pitch/rate strings and the SSML envelope around the
+        # text slot. Only the text varies per request.
+        self._ssml_templates = {}
+        self._pitch_rate_cache = {}
+        for char_name, char_config in self.character_voices.items():
+            for emo_name, emotion_config in self.emotion_styles.items():
+                self._pitch_rate_cache[(char_name, emo_name)] = (
+                    self._combine_percentages(char_config.get('pitch', '0%'),
+                                              emotion_config.get('pitch_mod', '0%')),
+                    self._combine_percentages(char_config.get('rate', '0%'),
+                                              emotion_config.get('rate_mod', '0%')),
+                )
+                self._ssml_templates[(char_name, emo_name)] = \
+                    self._build_ssml_template(char_config, emotion_config)
+
     def _initialize_azure(self):
         """Initialize Azure Speech configuration"""
         try:
@@ -106,98 +286,463 @@ class AzureWaifuTTS:
             self.speech_config.set_speech_synthesis_output_format(
                 speechsdk.SpeechSynthesisOutputFormat.Riff44100Hz16BitMonoPcm
             )
-            
+
+            # Separate config for streaming: raw PCM so we can prepend our own
+            # WAV header before the total length is known
+            self.stream_config = speechsdk.SpeechConfig(
+                subscription=self.subscription_key,
+                region=self.region
+            )
+            self.stream_config.set_speech_synthesis_output_format(
+                speechsdk.SpeechSynthesisOutputFormat.Raw44100Hz16BitMonoPcm
+            )
+
             self.logger.info(f"Azure Speech initialized for region: {self.region}")
             
         except Exception as e:
             self.logger.error(f"Failed to initialize Azure Speech: {e}")
             self.azure_available = False
     
-    def synthesize(self, text: str, character: str = 'sakura', 
-                  emotion: str = 'cheerful', **kwargs) -> bytes:
+    def _new_pooled_synthesizer(self, config=None):
+        """Create a synthesizer and pre-open its Azure WebSocket connection"""
+        synthesizer = speechsdk.SpeechSynthesizer(
+            speech_config=config or self.speech_config,
+            audio_config=None
+        )
+        try:
+            connection = speechsdk.Connection.from_speech_synthesizer(synthesizer)
+            connection.open(True)
+        except Exception as e:
+            self.logger.debug(f"Could not pre-open Azure connection: {e}")
+
+        # Jittered expiry so pooled connections don't all reconnect at once
+        expires_at = time.monotonic() + random.uniform(540, 660)
+        return synthesizer, expires_at
+
+    def _prewarm(self, num_prewarm: int = 3):
+        """Pre-warm the synthesizer pool to amortize handshake cost"""
+        try:
+            for _ in range(num_prewarm):
+                self._pool.put_nowait(self._new_pooled_synthesizer())
+            self.logger.info(f"Pre-warmed {num_prewarm} Azure synthesizer connections")
+            threading.Thread(target=self._refresh_pool_loop, daemon=True,
+                             name='azure-pool-refresh').start()
+        except Exception as e:
+            self.logger.warning(f"Synthesizer pre-warm failed: {e}")
+
+    def _refresh_pool_loop(self, interval: float = 60.0):
+        """
+        Replace soon-to-expire pooled synthesizers off the request path.
+
+        The checkout path still handles expiry as a safety net, but
+        reconnecting there puts the handshake on a caller's latency;
+        this loop rotates one entry per tick so warm connections are
+        always available and never all reconnect at once.
+        """
+        while True:
+            time.sleep(interval)
+            try:
+                synthesizer, expires_at = self._pool.get_nowait()
+            except queue.Empty:
+                continue
+            if time.monotonic() >= expires_at - interval:
+                try:
+                    synthesizer, expires_at = self._new_pooled_synthesizer()
+                except Exception as e:
+                    self.logger.debug(f"Pool refresh failed: {e}")
+                    continue
+            try:
+                self._pool.put_nowait((synthesizer, expires_at))
+            except queue.Full:
+                pass
+
+    @contextmanager
+    def _synthesizer_checkout(self, pool=None, config=None):
+        """Check out a pooled synthesizer, returning it on success"""
+        if pool is None:
+            pool = self._pool
+        try:
+            synthesizer, expires_at = pool.get_nowait()
+            if time.monotonic() >= expires_at:
+                synthesizer, expires_at = self._new_pooled_synthesizer(config)
+        except queue.Empty:
+            synthesizer, expires_at = self._new_pooled_synthesizer(config)
+
+        try:
+            yield synthesizer
+        except Exception:
+            # Connection state is suspect; discard and spawn a replacement
+            try:
+                pool.put_nowait(self._new_pooled_synthesizer(config))
+            except queue.Full:
+                pass
+            raise
+        else:
+            try:
+                pool.put_nowait((synthesizer, expires_at))
+            except queue.Full:
+                pass
+
+    def synthesize(self, text: str, character: str = 'sakura',
+                  emotion: str = 'cheerful', no_cache: bool = False, **kwargs) -> bytes:
         """
         Synthesize speech using Azure TTS with waifu characteristics
-        
+
+        Results are cached (memory + disk) by the full request, so a
+        repeated phrase returns without touching Azure or the effects
+        chain. Fallback audio is never cached.
+
         Args:
             text: Text to synthesize
             character: Character name (sakura, yuki, rei, miku)
             emotion: Emotion style
+            no_cache: Bypass the audio cache (debugging)
             **kwargs: Additional parameters
-            
+
         Returns:
             Audio data as bytes
         """
         if not self.azure_available:
             return self._fallback_synthesis(text)
-        
+
+        if no_cache:
+            audio = self._synthesize_azure(text, character, emotion, **kwargs)
+        else:
+            key = (text, character, emotion, tuple(sorted(kwargs.items())))
+            audio = self._synth_cache.get_or_compute(
+                key, lambda: self._synthesize_azure(text, character, emotion, **kwargs))
+
+        return audio if audio is not None else self._fallback_synthesis(text)
+
+    def _synthesize_azure(self, text: str, character: str,
+                          emotion: str, **kwargs) -> Optional[bytes]:
+        """One uncached Azure round-trip; returns None on failure"""
         try:
-            # Get character configuration
-            char_config = self.character_voices.get(character, self.character_voices['sakura'])
-            emotion_config = self.emotion_styles.get(emotion, self.emotion_styles['neutral'])
-            
-            # Process text for Japanese expressions
-            processed_text = self._process_japanese_text(text)
-            
             # Create SSML with waifu voice styling
-            ssml = self._create_waifu_ssml(
-                processed_text, 
-                char_config, 
-                emotion_config,
-                **kwargs
-            )
-            
+            ssml = self._ssml_for(text, character, emotion, **kwargs)
+
             self.logger.info(f"Synthesizing with Azure TTS: {character} ({emotion})")
-            
-            # Synthesize with Azure
-            synthesizer = speechsdk.SpeechSynthesizer(speech_config=self.speech_config)
-            result = synthesizer.speak_ssml_async(ssml).get()
-            
+
+            # Synthesize with Azure using a pooled, pre-warmed connection
+            with self._synthesizer_checkout() as synthesizer:
+                result = synthesizer.speak_ssml_async(ssml).get()
+
             if result.reason == speechsdk.ResultReason.SynthesizingAudioCompleted:
                 audio_data = result.audio_data
-                
+
                 # Apply post-processing for anime effects
-                processed_audio = self._apply_anime_effects(audio_data, character, emotion)
-                return processed_audio
-                
-            else:
-                self.logger.error(f"Azure TTS failed: {result.reason}")
-                return self._fallback_synthesis(text)
-                
+                return self._apply_anime_effects(audio_data, character, emotion)
+
+            self.logger.error(f"Azure TTS failed: {result.reason}")
+            return None
+
         except Exception as e:
             self.logger.error(f"Azure synthesis failed: {e}")
-            return self._fallback_synthesis(text)
+            return None
     
+    def synthesize_batch(self, items: List[Dict[str, Any]]) -> List[bytes]:
+        """
+        Synthesize several texts in a single Azure round-trip
+
+        Packs all items into one SSML document with <bookmark> markers
+        between them, then slices the returned PCM at the bookmark audio
+        offsets — one connection handshake instead of one per item.
+
+        Args:
+            items: List of dicts with 'text' and optional 'character'/'emotion'
+
+        Returns:
+            List of WAV audio bytes, one per item (input order)
+        """
+        if not items:
+            return []
+
+        if not self.azure_available:
+            return [self._fallback_synthesis(item.get('text', '')) for item in items]
+
+        try:
+            ssml_parts = [_SSML_HEAD]
+
+            for i, item in enumerate(items):
+                character = item.get('character', 'sakura')
+                if character not in self.character_voices:
+                    character = 'sakura'
+                emotion = item.get('emotion', 'cheerful')
+                if emotion not in self.emotion_styles:
+                    emotion = 'neutral'
+
+                char_config = self.character_voices[character]
+                emotion_config = self.emotion_styles[emotion]
+                pitch, rate = self._pitch_rate_cache[(character, emotion)]
+
+                processed_text = self._process_japanese_text(item.get('text', ''))
+
+                ssml_parts.append(
+                    f'<voice name="{char_config["voice"]}"><bookmark mark="{i}"/>'
+                    f'<mstts:express-as style="{emotion_config["style"]}" styledegree="1.5">'
+                    f'<prosody pitch="{pitch}" rate="{rate}" volume="+15%">'
+                    f'{self._add_expression_breaks(escape(processed_text))}'
+                    f'</prosody></mstts:express-as></voice>'
+                )
+
+            ssml_parts.append('</speak>')
+            ssml = ''.join(ssml_parts)
+
+            self.logger.info(f"Batch synthesizing {len(items)} items with Azure TTS")
+
+            # Capture bookmark audio offsets (100-ns ticks) during synthesis
+            bookmark_offsets = {}
+
+            def _on_bookmark(evt):
+                bookmark_offsets[int(evt.text)] = evt.audio_offset
+
+            with self._synthesizer_checkout() as synthesizer:
+                synthesizer.bookmark_reached.connect(_on_bookmark)
+                try:
+                    result = synthesizer.speak_ssml_async(ssml).get()
+                finally:
+                    synthesizer.bookmark_reached.disconnect_all()
+
+            if result.reason != speechsdk.ResultReason.SynthesizingAudioCompleted:
+                self.logger.error(f"Azure batch TTS failed: {result.reason}")
+                return [self.synthesize(item.get('text', ''),
+                                        item.get('character', 'sakura'),
+                                        item.get('emotion', 'cheerful'))
+                        for item in items]
+
+            audio_data = result.audio_data
+            pcm = audio_data[44:] if audio_data[:4] == b'RIFF' else audio_data
+
+            # Convert 100-ns ticks to byte offsets (16-bit mono samples)
+            sample_rate = 44100
+            boundaries = []
+            for i in range(len(items)):
+                ticks = bookmark_offsets.get(i, 0)
+                offset = ticks * sample_rate * 2 // 10_000_000
+                boundaries.append(offset & ~1)  # Align to sample boundary
+            boundaries.append(len(pcm))
+
+            outputs = []
+            for i, item in enumerate(items):
+                segment = pcm[boundaries[i]:boundaries[i + 1]]
+                segment = self._apply_anime_effects(
+                    segment,
+                    item.get('character', 'sakura'),
+                    item.get('emotion', 'cheerful')
+                )
+                outputs.append(self._pcm_to_wav(segment, sample_rate))
+
+            return outputs
+
+        except Exception as e:
+            self.logger.error(f"Azure batch synthesis failed: {e}")
+            return [self._fallback_synthesis(item.get('text', '')) for item in items]
+
+    async def synthesize_many(self, items: List[Dict[str, Any]]) -> List[bytes]:
+        """
+        Synthesize several texts concurrently over the warm connection pool
+
+        Each item is its own Azure request running on the TTS executor,
+        so up to pool-size network round-trips overlap instead of
+        queueing behind each other; SSML builds and post-processing run
+        in the worker threads too. Prefer synthesize_batch when one
+        round-trip for everything beats overlap (many tiny items).
+
+        Args:
+            items: List of dicts with 'text' and optional 'character'/'emotion'
+
+        Returns:
+            List of audio bytes, one per item (input order)
+        """
+        if not items:
+            return []
+
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(self._pool.maxsize)
+
+        async def _synth_one(item):
+            async with semaphore:
+                return await loop.run_in_executor(
+                    self._tts_executor,
+                    partial(self.synthesize,
+                            item.get('text', ''),
+                            item.get('character', 'sakura'),
+                            item.get('emotion', 'cheerful')))
+
+        return list(await asyncio.gather(*(_synth_one(item) for item in items)))
+
+    def _pcm_to_wav(self, pcm: bytes, sample_rate: int = 44100) -> bytes:
+        """Wrap raw 16-bit mono PCM in a WAV container"""
+        header = bytearray(self._streaming_wav_header(sample_rate))
+        header[4:8] = (len(pcm) + 36).to_bytes(4, 'little')
+        header[-4:] = len(pcm).to_bytes(4, 'little')
+        return bytes(header) + pcm
+
+    async def synthesize_async(self, text: str, character: str = 'sakura',
+                               emotion: str = 'cheerful', session=None, **kwargs) -> bytes:
+        """
+        Asynchronously synthesize speech via Azure's REST TTS endpoint
+
+        Unlike synthesize(), this never blocks the event loop, so async
+        servers (Quart/FastAPI) and clients can await it directly.
+
+        Args:
+            text: Text to synthesize
+            character: Character name (sakura, yuki, rei, miku)
+            emotion: Emotion style
+            session: Optional shared aiohttp.ClientSession to reuse
+            **kwargs: Additional parameters
+
+        Returns:
+            Audio data as bytes
+        """
+        if not self.azure_available:
+            return self._fallback_synthesis(text)
+
+        try:
+            import aiohttp
+        except ImportError:
+            self.logger.warning("aiohttp not available, using blocking synthesis")
+            return self.synthesize(text, character, emotion, **kwargs)
+
+        try:
+            ssml = self._ssml_for(text, character, emotion, **kwargs)
+
+            url = f"https://{self.region}.tts.speech.microsoft.com/cognitiveservices/v1"
+            headers = {
+                'Ocp-Apim-Subscription-Key': self.subscription_key,
+                'Content-Type': 'application/ssml+xml',
+                'X-Microsoft-OutputFormat': 'riff-44100hz-16bit-mono-pcm',
+                'User-Agent': 'waifu-voice-synthesis'
+            }
+
+            self.logger.info(f"Synthesizing with Azure REST TTS: {character} ({emotion})")
+
+            owns_session = session is None
+            if owns_session:
+                session = aiohttp.ClientSession()
+
+            try:
+                async with session.post(url, data=ssml.encode('utf-8'), headers=headers) as resp:
+                    if resp.status != 200:
+                        self.logger.error(f"Azure REST TTS failed: HTTP {resp.status}")
+                        return self._fallback_synthesis(text)
+                    audio_data = await resp.read()
+            finally:
+                if owns_session:
+                    await session.close()
+
+            return self._apply_anime_effects(audio_data, character, emotion)
+
+        except Exception as e:
+            self.logger.error(f"Azure async synthesis failed: {e}")
+            return self._fallback_synthesis(text)
+
+    def synthesize_stream(self, text: str, character: str = 'sakura',
+                          emotion: str = 'cheerful', chunk_size: int = 16384, **kwargs):
+        """
+        Stream synthesized speech as audio chunks arrive from Azure
+
+        Args:
+            text: Text to synthesize
+            character: Character name (sakura, yuki, rei, miku)
+            emotion: Emotion style
+            chunk_size: Size of PCM chunks to yield (bytes)
+            **kwargs: Additional parameters
+
+        Yields:
+            WAV header first, then raw PCM chunks as they arrive
+        """
+        if not self.azure_available:
+            yield self._fallback_synthesis(text)
+            return
+
+        try:
+            # Create SSML with waifu voice styling
+            ssml = self._ssml_for(text, character, emotion, **kwargs)
+
+            self.logger.info(f"Streaming with Azure TTS: {character} ({emotion})")
+
+            # Start synthesis without waiting for the full result, on a
+            # pooled pre-warmed connection so first-chunk latency doesn't
+            # include the WebSocket handshake
+            with self._synthesizer_checkout(self._stream_pool,
+                                            self.stream_config) as synthesizer:
+                result = synthesizer.start_speaking_ssml_async(ssml).get()
+                audio_stream = speechsdk.AudioDataStream(result)
+
+                # Emit a WAV header up front so clients can start decoding
+                # before the total audio length is known
+                yield self._streaming_wav_header()
+
+                audio_buffer = bytes(chunk_size)
+                filled_size = audio_stream.read_data(audio_buffer)
+                while filled_size > 0:
+                    yield audio_buffer[:filled_size]
+                    filled_size = audio_stream.read_data(audio_buffer)
+
+        except Exception as e:
+            self.logger.error(f"Azure streaming synthesis failed: {e}")
+            yield self._fallback_synthesis(text)
+
+    def _streaming_wav_header(self, sample_rate: int = 44100) -> bytes:
+        """Build a WAV header with unknown data length for chunked streaming"""
+        byte_rate = sample_rate * 2  # 16-bit mono
+        header = bytearray()
+        header += b'RIFF'
+        header += (0xFFFFFFFF).to_bytes(4, 'little')  # File size unknown
+        header += b'WAVE'
+        header += b'fmt '
+        header += (16).to_bytes(4, 'little')          # PCM header size
+        header += (1).to_bytes(2, 'little')           # Audio format (PCM)
+        header += (1).to_bytes(2, 'little')           # Channels (mono)
+        header += sample_rate.to_bytes(4, 'little')
+        header += byte_rate.to_bytes(4, 'little')
+        header += (2).to_bytes(2, 'little')           # Block align
+        header += (16).to_bytes(2, 'little')          # Bits per sample
+        header += b'data'
+        header += (0xFFFFFFFF).to_bytes(4, 'little')  # Data size unknown
+
+        return bytes(header)
+
     def _process_japanese_text(self, text: str) -> str:
         """Process text to handle Japanese expressions in English context"""
-        processed = text
-        
-        # Keep Japanese expressions as romanized for English TTS
-        japanese_pronunciations = {
-            'konnichiwa': 'koh-nee-chee-wah',
-            'ohayo': 'oh-hah-yoh',
-            'arigatou': 'ah-ree-gah-toh',
-            'ara ara': 'ah-rah ah-rah',
-            'ehehe': 'eh-heh-heh',
-            'ufufu': 'oo-foo-foo',
-            'kawaii': 'kah-wah-ee',
-            'sugoi': 'soo-goh-ee',
-            'baka': 'bah-kah',
-            'onegai': 'oh-neh-gah-ee',
-            'gomen': 'goh-men',
-            'kyaa': 'kyah',
-            'yatta': 'yah-ttah'
-        }
-        
         # Replace with pronunciation-friendly versions for English TTS
-        for original, pronunciation in japanese_pronunciations.items():
-            if original.lower() in processed.lower():
-                import re
-                pattern = re.compile(re.escape(original), re.IGNORECASE)
-                processed = pattern.sub(pronunciation, processed)
-        
-        return processed
+        return self._jp_alt.sub(
+            lambda m: self._jp_table[m.group(0).lower()], text)
     
-    def _create_waifu_ssml(self, text: str, char_config: Dict, 
+    def _build_ssml_template(self, char_config: Dict, emotion_config: Dict) -> tuple:
+        """Precompute the SSML prefix/suffix around the text slot"""
+        pitch = self._combine_percentages(
+            char_config.get('pitch', '0%'), emotion_config.get('pitch_mod', '0%'))
+        rate = self._combine_percentages(
+            char_config.get('rate', '0%'), emotion_config.get('rate_mod', '0%'))
+
+        prefix = (
+            _SSML_HEAD +
+            f'<voice name="{char_config["voice"]}">'
+            f'<mstts:express-as style="{emotion_config["style"]}" styledegree="1.5">'
+            f'<prosody pitch="{pitch}" rate="{rate}" volume="+15%">'
+        )
+
+        return prefix, _SSML_TAIL
+
+    def _ssml_for(self, text: str, character: str, emotion: str, **kwargs) -> str:
+        """Build request SSML, splicing into a precompiled envelope when possible"""
+        processed_text = self._process_japanese_text(text)
+
+        if not kwargs:
+            char_name = character if character in self.character_voices else 'sakura'
+            emo_name = emotion if emotion in self.emotion_styles else 'neutral'
+            prefix, suffix = self._ssml_templates[(char_name, emo_name)]
+            return prefix + self._add_expression_breaks(escape(processed_text)) + suffix
+
+        # Pitch/rate overrides change the envelope, so build it from scratch
+        char_config = self.character_voices.get(character, self.character_voices['sakura'])
+        emotion_config = self.emotion_styles.get(emotion, self.emotion_styles['neutral'])
+        return self._create_waifu_ssml(processed_text, char_config, emotion_config, **kwargs)
+
+    def _create_waifu_ssml(self, text: str, char_config: Dict,
                           emotion_config: Dict, **kwargs) -> str:
         """Create SSML with waifu voice characteristics"""
         
@@ -212,42 +757,22 @@ class AzureWaifuTTS:
         base_rate = char_config.get('rate', '0%')
         emotion_rate = emotion_config.get('rate_mod', '0%')
         final_rate = kwargs.get('rate', self._combine_percentages(base_rate, emotion_rate))
-        
-        # Create SSML
-        ssml = f'''
-        <speak version="1.0" xmlns="http://www.w3.org/2001/10/synthesis" 
-               xmlns:mstts="https://www.w3.org/2001/mstts" xml:lang="en-US">
-            <voice name="{voice_name}">
-                <mstts:express-as style="{base_style}" styledegree="1.5">
-                    <prosody pitch="{final_pitch}" rate="{final_rate}" volume="+15%">
-                        {self._add_expression_breaks(text)}
-                    </prosody>
-                </mstts:express-as>
-            </voice>
-        </speak>
-        '''
-        
-        return ssml.strip()
+
+        # Same fragment layout as the precompiled envelopes, built from
+        # the interned head/tail constants
+        return ''.join((
+            _SSML_HEAD,
+            '<voice name="', voice_name, '">',
+            '<mstts:express-as style="', base_style, '" styledegree="1.5">',
+            '<prosody pitch="', final_pitch, '" rate="', final_rate,
+            '" volume="+15%">',
+            self._add_expression_breaks(text),
+            _SSML_TAIL,
+        ))
     
     def _add_expression_breaks(self, text: str) -> str:
         """Add natural breaks and emphasis to text for anime-like speech in English"""
-        # Add pauses and emphasis for anime expressions
-        text = text.replace('♪', '<break time="300ms"/>♪<break time="200ms"/>')
-        text = text.replace('~', '~<break time="250ms"/>')
-        
-        # Emphasize common anime expressions
-        text = text.replace('ah-rah ah-rah', '<emphasis level="strong">ah-rah ah-rah</emphasis><break time="400ms"/>')
-        text = text.replace('eh-heh-heh', '<emphasis level="moderate">eh-heh-heh</emphasis><break time="300ms"/>')
-        text = text.replace('oo-foo-foo', '<emphasis level="moderate">oo-foo-foo</emphasis><break time="300ms"/>')
-        text = text.replace('kah-wah-ee', '<emphasis level="strong">kah-wah-ee</emphasis><break time="200ms"/>')
-        text = text.replace('soo-goh-ee', '<emphasis level="strong">soo-goh-ee</emphasis><break time="200ms"/>')
-        
-        # Add natural pauses
-        text = text.replace('!', '<break time="200ms"/>!')
-        text = text.replace('?', '<break time="300ms"/>?')
-        text = text.replace('...', '<break time="500ms"/>...')
-        
-        return text
+        return _EXPRESSION_RE.sub(lambda m: _EXPRESSION_BREAKS[m.group(0)], text)
     
     def _combine_percentages(self, base: str, modifier: str) -> str:
         """Combine percentage values (e.g., '+10%' + '+5%' = '+15%')"""
@@ -264,107 +789,178 @@ class AzureWaifuTTS:
         try:
             if not NUMPY_AVAILABLE:
                 return audio_data
-            
-            # Convert bytes to numpy array for processing
-            audio_array = np.frombuffer(audio_data, dtype=np.int16).astype(np.float32) / 32768.0
-            
-            # Apply character-specific effects
-            if character == 'miku':
-                # Add slight pitch variation for energetic character
-                audio_array = self._add_pitch_variation(audio_array, 0.02)
-            elif character == 'yuki':
-                # Add breathiness for shy character
-                audio_array = self._add_breathiness(audio_array, 0.15)
-            elif character == 'rei':
-                # Add slight reverb for mysterious character
-                audio_array = self._add_simple_reverb(audio_array, 0.1)
-            
-            # Apply emotion-specific effects
-            if emotion in ['giggly', 'excited']:
-                audio_array = self._add_pitch_variation(audio_array, 0.03)
-            elif emotion == 'shy':
-                audio_array *= 0.8  # Reduce volume slightly
-            
-            # Convert back to bytes
-            audio_int16 = (audio_array * 32767).astype(np.int16)
-            return audio_int16.tobytes()
-            
+
+            # Common case (e.g. sakura + neutral): nothing below would
+            # fire, so skip the int16 -> float32 -> int16 round-trip
+            if (character not in ('miku', 'yuki', 'rei')
+                    and emotion not in ('giggly', 'excited', 'shy')):
+                return audio_data
+
+            # Decode into a pooled scratch buffer instead of allocating
+            # a fresh float32 array per call
+            int16_view = np.frombuffer(audio_data, dtype=np.int16)
+            audio_array = pooled = self._fx_pool.get(int16_view.shape[0])
+            try:
+                np.multiply(int16_view, np.float32(1.0 / 32768.0), out=audio_array)
+
+                if NUMBA_AVAILABLE:
+                    # One fused pass: the effect branches become kernel
+                    # parameters (zero intensity disables an effect)
+                    vib = np.float32(
+                        (0.02 if character == 'miku' else 0.0)
+                        + (0.03 if emotion in ('giggly', 'excited') else 0.0))
+                    breath = np.float32(0.01 * 0.15 if character == 'yuki' else 0.0)
+                    gain = np.float32(0.8 if emotion == 'shy' else 1.0)
+
+                    n = audio_array.shape[0]
+                    vibrato = self._vibrato_slice(n)
+                    # Any length-n float32 array works when breath is 0
+                    noise = self._noise_slice(n) if breath else vibrato
+                    _fx_kernel(audio_array, vibrato, noise, vib, breath, gain)
+                    if character == 'rei':
+                        _reverb_kernel(audio_array, int(0.05 * 44100),
+                                       np.float32(0.1))
+
+                    audio_array *= np.float32(32767.0)
+                    return audio_array.astype(np.int16).tobytes()
+
+                # Apply character-specific effects
+                if character == 'miku':
+                    # Add slight pitch variation for energetic character
+                    audio_array = self._add_pitch_variation(audio_array, 0.02)
+                elif character == 'yuki':
+                    # Add breathiness for shy character
+                    audio_array = self._add_breathiness(audio_array, 0.15)
+                elif character == 'rei':
+                    # Add slight reverb for mysterious character
+                    audio_array = self._add_simple_reverb(audio_array, 0.1)
+
+                # Apply emotion-specific effects
+                if emotion in ['giggly', 'excited']:
+                    audio_array = self._add_pitch_variation(audio_array, 0.03)
+                elif emotion == 'shy':
+                    audio_array *= 0.8  # Reduce volume slightly
+
+                # Convert back to bytes (scale in place; the array is ours)
+                audio_array *= np.float32(32767.0)
+                return audio_array.astype(np.int16).tobytes()
+            finally:
+                self._fx_pool.put(pooled)
+
         except Exception as e:
             self.logger.warning(f"Audio effects failed: {e}")
             return audio_data
     
+    def _vibrato_slice(self, n: int) -> np.ndarray:
+        """Cached vibrato sine table, grown to the longest clip seen"""
+        if self._vibrato_table.size < n:
+            size = 1 << (n - 1).bit_length()
+            self._vibrato_table = np.sin(
+                np.arange(size, dtype=np.float32) * np.float32(0.01),
+                dtype=np.float32)
+        return self._vibrato_table[:n]
+
+    def _noise_slice(self, n: int) -> np.ndarray:
+        """Random-offset view into the pre-generated noise pool"""
+        if self._noise_pool is None or self._noise_pool.size <= n:
+            size = max(1 << 22, 1 << (n + 1).bit_length())
+            self._noise_pool = self._rng.standard_normal(size, dtype=np.float32)
+        offset = self._rng.integers(0, self._noise_pool.size - n)
+        return self._noise_pool[offset:offset + n]
+
     def _add_pitch_variation(self, audio: np.ndarray, intensity: float) -> np.ndarray:
         """Add subtle pitch variation for more expressive speech"""
-        # Simple pitch variation using vibrato effect
-        variation = np.sin(np.arange(len(audio)) * 0.01) * intensity
-        return audio * (1 + variation)
+        # Simple pitch variation using vibrato effect, applied in place
+        np.multiply(audio, 1.0 + intensity * self._vibrato_slice(audio.shape[0]),
+                    out=audio)
+        return audio
     
     def _add_breathiness(self, audio: np.ndarray, intensity: float) -> np.ndarray:
         """Add breathiness effect"""
-        noise = np.random.normal(0, 0.01 * intensity, len(audio))
-        return audio + noise * (1 - np.abs(audio))  # More noise in quiet parts
+        n = audio.shape[0]
+        noise = self._noise_slice(n)
+
+        # More noise in quiet parts; built in pooled scratch so the
+        # whole effect is one extra buffer and an in-place add
+        scratch = self._fx_pool.get(n)
+        try:
+            np.abs(audio, out=scratch)
+            np.subtract(np.float32(1.0), scratch, out=scratch)
+            scratch *= noise
+            scratch *= np.float32(0.01 * intensity)
+            audio += scratch
+        finally:
+            self._fx_pool.put(scratch)
+        return audio
     
     def _add_simple_reverb(self, audio: np.ndarray, intensity: float) -> np.ndarray:
         """Add simple reverb effect"""
         delay_samples = int(0.05 * 44100)  # 50ms delay
-        if len(audio) > delay_samples:
-            delayed = np.zeros_like(audio)
-            delayed[delay_samples:] = audio[:-delay_samples]
-            return audio + delayed * intensity
+        n = audio.shape[0]
+        if n > delay_samples:
+            # audio[d:] += intensity * audio[:-d], staged through a
+            # persistent scratch buffer: the scratch holds the dry tap
+            # so the overlapping in-place add stays feedback-free, and
+            # nothing is allocated per call
+            tail = n - delay_samples
+            if self._reverb_scratch.size < tail:
+                self._reverb_scratch = np.empty(tail, dtype=np.float32)
+            scratch = self._reverb_scratch[:tail]
+            np.multiply(audio[:-delay_samples], np.float32(intensity), out=scratch)
+            np.add(audio[delay_samples:], scratch, out=audio[delay_samples:])
         return audio
     
     def _fallback_synthesis(self, text: str) -> bytes:
         """Fallback synthesis when Azure is not available"""
         self.logger.warning("Using fallback synthesis")
         
-        # Create a simple WAV header with silence
-        duration = len(text) * 0.08  # Rough estimate
+        # Silence sized by a rough reading-speed estimate
+        duration = len(text) * 0.08
         sample_rate = 44100
-        samples = int(sample_rate * duration)
-        
-        # WAV header for 44.1kHz, 16-bit, mono
-        header = bytearray([
-            0x52, 0x49, 0x46, 0x46,  # 'RIFF'
-            0x00, 0x00, 0x00, 0x00,  # File size (placeholder)
-            0x57, 0x41, 0x56, 0x45,  # 'WAVE'
-            0x66, 0x6D, 0x74, 0x20,  # 'fmt '
-            0x10, 0x00, 0x00, 0x00,  # PCM header size
-            0x01, 0x00,              # Audio format (PCM)
-            0x01, 0x00,              # Channels (mono)
-            0x44, 0xAC, 0x00, 0x00,  # Sample rate (44100)
-            0x88, 0x58, 0x01, 0x00,  # Byte rate
-            0x02, 0x00,              # Block align
-            0x10, 0x00,              # Bits per sample
-            0x64, 0x61, 0x74, 0x61,  # 'data'
-            0x00, 0x00, 0x00, 0x00   # Data size (placeholder)
-        ])
-        
-        # Add silence data
-        silence_data = bytes(samples * 2)  # 16-bit = 2 bytes per sample
-        
-        # Update sizes in header
-        file_size = len(header) + len(silence_data) - 8
-        data_size = len(silence_data)
-        
-        header[4:8] = file_size.to_bytes(4, 'little')
-        header[-4:] = data_size.to_bytes(4, 'little')
-        
-        return bytes(header) + silence_data
+        data_size = int(sample_rate * duration) * 2  # 16-bit mono
+
+        # 44-byte WAV header in one struct.pack call
+        header = struct.pack(
+            '<4sI4s4sIHHIIHH4sI',
+            b'RIFF', data_size + 36, b'WAVE', b'fmt ', 16, 1, 1,
+            sample_rate, sample_rate * 2, 2, 16, b'data', data_size)
+
+        if data_size <= len(self._SILENCE):
+            return b''.join((header, memoryview(self._SILENCE)[:data_size]))
+        return header + bytes(data_size)
     
     def get_available_voices(self) -> Dict[str, Any]:
         """Get available character voices and their configurations"""
-        return {
-            'characters': list(self.character_voices.keys()),
-            'emotions': list(self.emotion_styles.keys()),
-            'azure_available': self.azure_available,
-            'japanese_expressions': list(self.japanese_expressions.keys())
-        }
-    
-    def test_connection(self) -> bool:
-        """Test Azure Speech service connection"""
+        # The catalog is fixed after init, so build it once
+        if self._voices_cache is None:
+            self._voices_cache = {
+                'characters': list(self.character_voices.keys()),
+                'emotions': list(self.emotion_styles.keys()),
+                'azure_available': self.azure_available,
+                'japanese_expressions': list(self.japanese_expressions.keys())
+            }
+        return self._voices_cache
+
+    def test_connection(self, force: bool = False, cache_ttl: float = 30.0) -> bool:
+        """
+        Test Azure Speech service connection
+
+        Results are cached for cache_ttl seconds so health probes don't
+        burn Azure quota; pass force=True to bypass the cache.
+        """
         if not self.azure_available:
             return False
-            
+
+        tested_at, last_result = self._last_connection_test
+        if not force and time.monotonic() - tested_at < cache_ttl:
+            return last_result
+
+        result = self._test_connection_live()
+        self._last_connection_test = (time.monotonic(), result)
+        return result
+
+    def _test_connection_live(self) -> bool:
+        """Perform a real Azure synthesis round-trip"""
         try:
             test_ssml = '''
             <speak version="1.0" xmlns="http://www.w3.org/2001/10/synthesis" xml:lang="ja-JP">
@@ -376,8 +972,8 @@ class AzureWaifuTTS:
             </speak>
             '''
             
-            synthesizer = speechsdk.SpeechSynthesizer(speech_config=self.speech_config)
-            result = synthesizer.speak_ssml_async(test_ssml).get()
+            with self._synthesizer_checkout() as synthesizer:
+                result = synthesizer.speak_ssml_async(test_ssml).get()
             
             return result.reason == speechsdk.ResultReason.SynthesizingAudioCompleted
             
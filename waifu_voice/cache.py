@@ -0,0 +1,147 @@
+"""
+Two-tier LRU cache for synthesized audio
+
+Keeps hot entries in an in-process OrderedDict and everything else as
+files on disk, so repeat synthesis requests skip the network entirely.
+Keys are arbitrary JSON-serializable tuples hashed with blake2b, which
+is faster than md5 on the short keys we use.
+"""
+
+import base64
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from collections import OrderedDict
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class DiskLRU:
+    """
+    In-memory LRU backed by a directory of cache files.
+
+    Lookups probe memory first (no hashing, no syscalls), then disk,
+    and only call the compute function on a full miss. Only successful
+    results (non-None) are cached.
+    """
+
+    def __init__(self, cache_dir: str, memory_size: int = 512, suffix: str = '.wav'):
+        self.cache_dir = cache_dir
+        self.suffix = suffix
+        self._memory = OrderedDict()
+        self._memory_size = memory_size
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _digest(self, key: tuple) -> str:
+        """Stable hex digest for a JSON-serializable key tuple."""
+        payload = json.dumps(key, sort_keys=True, ensure_ascii=False).encode('utf-8')
+        return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.cache_dir, digest + self.suffix)
+
+    def get(self, key: tuple) -> Optional[bytes]:
+        """Return cached bytes for key, or None on a full miss."""
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return self._memory[key]
+
+        path = self._path(self._digest(key))
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                data = f.read()
+            self._store_memory(key, data)
+            return data
+
+        return None
+
+    def get_or_compute(self, key: tuple, fn: Callable[[], Optional[bytes]]) -> Optional[bytes]:
+        """
+        Return cached bytes for key, computing and caching on a miss.
+
+        Args:
+            key: JSON-serializable tuple identifying the entry
+            fn: Zero-argument callable producing the bytes (or None on failure)
+
+        Returns:
+            The cached or freshly computed bytes, or None if fn failed
+        """
+        data = self.get(key)
+        if data is not None:
+            return data
+
+        data = fn()
+        if data:
+            self._store_memory(key, data)
+            self._store_disk(self._path(self._digest(key)), data)
+        return data
+
+    def get_or_compute_b64(self, key: tuple, fn: Callable[[], Optional[bytes]]) -> Optional[str]:
+        """
+        Like get_or_compute, but returns the base64 encoding of the bytes.
+
+        The encoded form is cached in a .b64 sidecar file (and under a
+        tagged memory key), so callers that ship audio inside JSON pay
+        the ~33%-larger encode once instead of on every request.
+        """
+        b64_key = key + ('__b64__',)
+        if b64_key in self._memory:
+            self._memory.move_to_end(b64_key)
+            return self._memory[b64_key]
+
+        digest = self._digest(key)
+        b64_path = os.path.join(self.cache_dir, digest + '.b64')
+        if os.path.exists(b64_path):
+            with open(b64_path, 'r') as f:
+                encoded = f.read()
+            self._store_memory(b64_key, encoded)
+            return encoded
+
+        data = self.get_or_compute(key, fn)
+        if data is None:
+            return None
+
+        encoded = base64.b64encode(data).decode('ascii')
+        self._store_memory(b64_key, encoded)
+        self._store_disk(b64_path, encoded.encode('ascii'))
+        return encoded
+
+    def put(self, key: tuple, data: bytes):
+        """Insert precomputed bytes (e.g. pre-synthesized audio) for key."""
+        self._store_memory(key, data)
+        self._store_disk(self._path(self._digest(key)), data)
+
+    def clear(self):
+        """Drop every memory entry and cache file."""
+        self._memory.clear()
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(self.suffix) or name.endswith('.b64'):
+                try:
+                    os.unlink(os.path.join(self.cache_dir, name))
+                except OSError:
+                    pass
+
+    def __len__(self) -> int:
+        """Number of entries in the memory tier."""
+        return len(self._memory)
+
+    def _store_memory(self, key: tuple, data: bytes):
+        self._memory[key] = data
+        self._memory.move_to_end(key)
+        if len(self._memory) > self._memory_size:
+            self._memory.popitem(last=False)
+
+    def _store_disk(self, path: str, data: bytes):
+        """Atomic write so concurrent readers never see a partial file."""
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir)
+            try:
+                os.write(fd, data)
+            finally:
+                os.close(fd)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning("Failed to cache to disk: %s", e)
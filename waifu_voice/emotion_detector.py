@@ -3,12 +3,38 @@ Emotion Detection Module
 Analyzes text for emotional context to inform voice synthesis
 """
 
+import os
 import re
 import json
 from typing import Dict, List, Tuple, Optional
 from pathlib import Path
 import numpy as np
-from textblob import TextBlob
+
+try:
+    from textblob import TextBlob
+    TEXTBLOB_AVAILABLE = True
+except ImportError:
+    TEXTBLOB_AVAILABLE = False
+
+# Tiny polarity lexicon for the sentiment fallback. TextBlob's first
+# call loads corpora and runs a full parse for one float; a set lookup
+# per token gives the same coarse positive/negative/neutral split.
+_POS_WORDS = frozenset({
+    'good', 'great', 'awesome', 'amazing', 'wonderful', 'happy', 'love',
+    'like', 'nice', 'best', 'fun', 'cool', 'sweet', 'cute', 'beautiful',
+    'excited', 'glad', 'perfect', 'thanks', 'thank', 'yay', 'wow',
+})
+_NEG_WORDS = frozenset({
+    'bad', 'terrible', 'awful', 'horrible', 'sad', 'hate', 'angry',
+    'upset', 'sorry', 'cry', 'hurt', 'pain', 'worst', 'annoying',
+    'disappointed', 'lonely', 'scared', 'afraid', 'tired', 'sick',
+})
+
+# Compiled once at import: these run on every analyze call
+_SENTENCE_SPLIT_RE = re.compile(r'[.!?]+')
+_JAPANESE_RE = re.compile(r'[ひらがなカタカナ漢字]')
+_EMOTICON_RE = re.compile(
+    r'[(\[<]?[>:;=8xX][\-o\*\']?[\)\]\>DdPp\(\(\)\[\]\{\}<>oO0\|\\\/]')
 
 
 class EmotionDetector:
@@ -17,6 +43,18 @@ class EmotionDetector:
     def __init__(self, config_path: Optional[str] = None):
         self.emotion_patterns = self._load_emotion_patterns()
         self.japanese_expressions = self._load_japanese_expressions()
+        # Split each bucket into plain literals (matched with str.count,
+        # no regex engine at all) and true regexes, compiled once;
+        # detect_emotion runs per utterance and most patterns are
+        # literal words
+        special = set('\\.^$*+?{}[]()|')
+        self._emotion_literals = {}
+        self._emotion_regexes = {}
+        for emotion, patterns in self.emotion_patterns.items():
+            self._emotion_literals[emotion] = [
+                p for p in patterns if not special & set(p)]
+            self._emotion_regexes[emotion] = [
+                re.compile(p) for p in patterns if special & set(p)]
         self.emotion_weights = {
             'cheerful': {'pitch': 1.2, 'speed': 1.1, 'energy': 1.3},
             'giggly': {'pitch': 1.3, 'speed': 0.9, 'energy': 1.4}, 
@@ -26,6 +64,13 @@ class EmotionDetector:
             'sad': {'pitch': 0.8, 'speed': 0.6, 'energy': 0.6},
             'neutral': {'pitch': 1.0, 'speed': 1.0, 'energy': 1.0}
         }
+        # Same weights as a (num_emotions, 3) matrix so blending is one
+        # matmul instead of nested Python dict loops
+        self._emo_index = {name: i for i, name in enumerate(self.emotion_weights)}
+        self._emo_matrix = np.array(
+            [[w['pitch'], w['speed'], w['energy']]
+             for w in self.emotion_weights.values()],
+            dtype=np.float32)
     
     def _load_emotion_patterns(self) -> Dict[str, List[str]]:
         """Load emotion detection patterns"""
@@ -86,22 +131,33 @@ class EmotionDetector:
         text_lower = text.lower()
         detected_emotions = {}
         
-        # Pattern-based emotion detection
-        for emotion, patterns in self.emotion_patterns.items():
-            score = 0
+        # Pattern-based emotion detection: cheap substring counts first,
+        # regex scans only for the patterns that need them
+        for emotion in self.emotion_patterns:
+            score = 0.0
             matches = []
-            
-            for pattern in patterns:
-                pattern_matches = re.findall(pattern, text_lower)
+
+            for literal in self._emotion_literals[emotion]:
+                count = text_lower.count(literal)
+                if count:
+                    score += count
+                    matches.extend([literal] * count)
+
+            for pattern in self._emotion_regexes[emotion]:
+                pattern_matches = pattern.findall(text_lower)
                 if pattern_matches:
                     score += len(pattern_matches) * 1.0
                     matches.extend(pattern_matches)
-            
+
             if score > 0:
                 detected_emotions[emotion] = {
                     'score': score,
                     'matches': matches
                 }
+                # A score this high is already a confident winner;
+                # buckets are ordered by priority, so stop scanning
+                if score > 3.0:
+                    break
         
         # Japanese expression detection
         japanese_emotions = self._detect_japanese_expressions(text_lower)
@@ -110,28 +166,58 @@ class EmotionDetector:
         
         # Sentiment analysis fallback
         if not detected_emotions:
-            sentiment = TextBlob(text).sentiment
-            if sentiment.polarity > 0.3:
-                detected_emotions['cheerful'] = {'score': sentiment.polarity, 'matches': []}
-            elif sentiment.polarity < -0.3:
-                detected_emotions['sad'] = {'score': abs(sentiment.polarity), 'matches': []}
+            if TEXTBLOB_AVAILABLE and os.environ.get('WAIFU_USE_TEXTBLOB') == '1':
+                polarity = TextBlob(text).sentiment.polarity
+            else:
+                polarity = self._simple_polarity(text_lower)
+            if polarity > 0.3:
+                detected_emotions['cheerful'] = {'score': polarity, 'matches': []}
+            elif polarity < -0.3:
+                detected_emotions['sad'] = {'score': abs(polarity), 'matches': []}
             else:
                 detected_emotions['neutral'] = {'score': 1.0, 'matches': []}
         
-        # Select primary emotion
-        primary_emotion = max(detected_emotions.keys(), 
-                            key=lambda x: detected_emotions[x]['score'])
-        
+        # Select primary emotion and tally the total in one pass
+        primary_emotion, best_score, total_score = None, -1.0, 0.0
+        for emotion_name, emotion_data in detected_emotions.items():
+            score = emotion_data['score']
+            total_score += score
+            if score > best_score:
+                primary_emotion, best_score = emotion_name, score
+
         # Generate voice parameters
-        voice_params = self._generate_voice_parameters(primary_emotion, detected_emotions)
-        
+        voice_params = self._generate_voice_parameters(
+            primary_emotion, detected_emotions, total_score)
+
         return {
             'primary_emotion': primary_emotion,
             'all_emotions': detected_emotions,
             'voice_parameters': voice_params,
-            'confidence': detected_emotions[primary_emotion]['score']
+            'confidence': best_score
         }
     
+    def detect_emotion_batch(self, texts: List[str]) -> List[Dict[str, any]]:
+        """
+        Detect emotions for a list of texts in one call.
+
+        Streaming callers analyze every chunk of a request together,
+        paying the method dispatch once per batch instead of per chunk.
+        """
+        detect = self.detect_emotion
+        return [detect(text) for text in texts]
+
+    def _simple_polarity(self, text_lower: str) -> float:
+        """Lexicon-based polarity in [-1, 1], the TextBlob stand-in"""
+        pos = neg = 0
+        for token in text_lower.split():
+            token = token.strip('.,!?~')
+            if token in _POS_WORDS:
+                pos += 1
+            elif token in _NEG_WORDS:
+                neg += 1
+        total = pos + neg
+        return (pos - neg) / total if total else 0.0
+
     def _detect_japanese_expressions(self, text: str) -> Dict[str, any]:
         """Detect Japanese expressions and their emotions"""
         japanese_emotions = {}
@@ -149,27 +235,32 @@ class EmotionDetector:
         
         return japanese_emotions
     
-    def _generate_voice_parameters(self, primary_emotion: str, 
-                                 all_emotions: Dict) -> Dict[str, float]:
+    def _generate_voice_parameters(self, primary_emotion: str,
+                                 all_emotions: Dict,
+                                 total_score: Optional[float] = None) -> Dict[str, float]:
         """Generate voice synthesis parameters based on detected emotions"""
-        base_params = self.emotion_weights.get(primary_emotion, 
+        base_params = self.emotion_weights.get(primary_emotion,
                                              self.emotion_weights['neutral'])
-        
+
         # Blend multiple emotions if present
         if len(all_emotions) > 1:
-            total_score = sum(emotion['score'] for emotion in all_emotions.values())
-            blended_params = {'pitch': 0, 'speed': 0, 'energy': 0}
-            
+            if total_score is None:
+                total_score = sum(emotion['score'] for emotion in all_emotions.values())
+
+            # Scatter scores into a weight vector (unknown emotions fall
+            # back to the neutral row, as the dict lookup used to) and
+            # blend with a single vector-matrix product
+            neutral_row = self._emo_index['neutral']
+            weights = np.zeros(len(self._emo_index), dtype=np.float32)
             for emotion_name, emotion_data in all_emotions.items():
-                weight = emotion_data['score'] / total_score
-                emotion_params = self.emotion_weights.get(emotion_name, 
-                                                        self.emotion_weights['neutral'])
-                
-                for param in blended_params:
-                    blended_params[param] += emotion_params[param] * weight
-            
-            return blended_params
-        
+                row = self._emo_index.get(emotion_name, neutral_row)
+                weights[row] += emotion_data['score']
+            weights /= np.float32(total_score)
+
+            pitch, speed, energy = weights @ self._emo_matrix
+            return {'pitch': float(pitch), 'speed': float(speed),
+                    'energy': float(energy)}
+
         return base_params.copy()
     
     def get_pronunciation_guide(self, text: str) -> List[Tuple[str, str]]:
@@ -184,15 +275,16 @@ class EmotionDetector:
     
     def analyze_speech_patterns(self, text: str) -> Dict[str, any]:
         """Analyze speech patterns for voice synthesis"""
+        words = text.split()
         analysis = {
-            'sentence_count': len(re.split(r'[.!?]+', text)),
+            'sentence_count': len(_SENTENCE_SPLIT_RE.split(text)),
             'exclamation_count': text.count('!'),
             'question_count': text.count('?'),
             'ellipsis_count': text.count('...'),
             'tilde_count': text.count('~'),
-            'has_japanese': bool(re.search(r'[ひらがなカタカナ漢字]', text)),
-            'average_word_length': len(text.split()) / max(1, len(text.split())),
-            'emoticon_count': len(re.findall(r'[(\[<]?[>:;=8xX][\-o\*\']?[\)\]\>DdPp\(\(\)\[\]\{\}<>oO0\|\\\/]', text))
+            'has_japanese': bool(_JAPANESE_RE.search(text)),
+            'average_word_length': sum(map(len, words)) / len(words) if words else 0.0,
+            'emoticon_count': len(_EMOTICON_RE.findall(text))
         }
         
         # Speech rhythm indicators
@@ -3,9 +3,11 @@ Japanese Text Processor
 Handles Japanese text processing, romanization, and pronunciation
 """
 
+import functools
 import re
 import unicodedata
-from typing import Dict, List, Tuple, Optional
+from types import MappingProxyType
+from typing import Dict, List, Tuple, Optional, Union
 import logging
 
 try:
@@ -15,157 +17,351 @@ except ImportError:
     JACONV_AVAILABLE = False
     logging.warning("jaconv not available, limited Japanese processing")
 
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+# Hiragana, katakana, CJK ideographs, half-width katakana — one
+# character class the regex engine tests in its C scan loop
+_JP_RE = re.compile('[\u3040-\u309f\u30a0-\u30ff\u4e00-\u9faf\uff65-\uff9f]')
+
+# Per-character membership bitmap over the BMP for the same ranges:
+# one memory load instead of four range comparisons, for callers that
+# classify characters in a tight loop
+_JP_BITMAP = bytearray(0x10000)
+for _start, _end in ((0x3040, 0x309f), (0x30a0, 0x30ff),
+                     (0x4e00, 0x9faf), (0xff65, 0xff9f)):
+    _JP_BITMAP[_start:_end + 1] = b'\x01' * (_end - _start + 1)
+del _start, _end
+
+
+def is_jp_char(char: str) -> bool:
+    """O(1) check whether a single character is Japanese"""
+    cp = ord(char)
+    return cp < 0x10000 and _JP_BITMAP[cp] != 0
+
+
+# Katakana to hiragana table, built once at import. NFKC has already
+# canonicalized half-width katakana by the time this runs, so the
+# dakuten-aware kana map is all that is needed.
+_KATA2HIRA = str.maketrans(
+    'アイウエオカキクケコガギグゲゴサシスセソザジズゼゾタチツテトダヂヅデド'
+    'ナニヌネノハヒフヘホバビブベボパピプペポマミムメモヤユヨラリルレロワヲン'
+    'ァィゥェォッャュョー',
+    'あいうえおかきくけこがぎぐげごさしすせそざじずぜぞたちつてとだぢづでど'
+    'なにぬねのはひふへほばびぶべぼぱぴぷぺぽまみむめもやゆよらりるれろわをん'
+    'ぁぃぅぇぉっゃゅょー'
+)
+
+# Processors are created per request in the web-worker pattern, so
+# every table below is built once at import, frozen, and shared by all
+# instances; __init__ only binds references.
+
+# Common Japanese expressions and their romanizations
+_EXPRESSION_DICT = MappingProxyType({
+    'こんにちは': 'konnichiwa',
+    'おはよう': 'ohayou',
+    'ありがとう': 'arigatou',
+    'すみません': 'sumimasen',
+    'あらあら': 'ara ara',
+    'えへへ': 'ehehe',
+    'うふふ': 'ufufu',
+    'ばか': 'baka',
+    'かわいい': 'kawaii',
+    'すごい': 'sugoi',
+    'おねがい': 'onegai',
+    'ごめん': 'gomen',
+    'はい': 'hai',
+    'いいえ': 'iie',
+    'だめ': 'dame',
+    'やった': 'yatta',
+    'きゃー': 'kyaa',
+    'えー': 'ee',
+    'うん': 'un',
+    'ううん': 'uun',
+    'そうですね': 'sou desu ne',
+    'なるほど': 'naruhodo',
+    'おいしい': 'oishii',
+    'たのしい': 'tanoshii',
+    'きれい': 'kirei',
+    'すてき': 'suteki',
+    'だいすき': 'daisuki',
+    'がんばって': 'ganbatte'
+})
+
+# One automaton (or one longest-first alternation as fallback) finds
+# every expression in a single pass over the text instead of one full
+# scan per dictionary entry
+if AHOCORASICK_AVAILABLE:
+    _EXPR_AC = ahocorasick.Automaton()
+    for _jp, _romaji in _EXPRESSION_DICT.items():
+        _EXPR_AC.add_word(_jp, (_jp, _romaji))
+    _EXPR_AC.make_automaton()
+    _EXPR_RE = None
+    del _jp, _romaji
+else:
+    _EXPR_AC = None
+    _EXPR_RE = re.compile('|'.join(
+        re.escape(k) for k in
+        sorted(_EXPRESSION_DICT, key=len, reverse=True)))
+
+# Romanization mapping for individual characters
+_HIRAGANA_TO_ROMAJI = MappingProxyType({
+    'あ': 'a', 'い': 'i', 'う': 'u', 'え': 'e', 'お': 'o',
+    'か': 'ka', 'き': 'ki', 'く': 'ku', 'け': 'ke', 'こ': 'ko',
+    'が': 'ga', 'ぎ': 'gi', 'ぐ': 'gu', 'げ': 'ge', 'ご': 'go',
+    'さ': 'sa', 'し': 'shi', 'す': 'su', 'せ': 'se', 'そ': 'so',
+    'ざ': 'za', 'じ': 'ji', 'ず': 'zu', 'ぜ': 'ze', 'ぞ': 'zo',
+    'た': 'ta', 'ち': 'chi', 'つ': 'tsu', 'て': 'te', 'と': 'to',
+    'だ': 'da', 'ぢ': 'ji', 'づ': 'zu', 'で': 'de', 'ど': 'do',
+    'な': 'na', 'に': 'ni', 'ぬ': 'nu', 'ね': 'ne', 'の': 'no',
+    'は': 'ha', 'ひ': 'hi', 'ふ': 'fu', 'へ': 'he', 'ほ': 'ho',
+    'ば': 'ba', 'び': 'bi', 'ぶ': 'bu', 'べ': 'be', 'ぼ': 'bo',
+    'ぱ': 'pa', 'ぴ': 'pi', 'ぷ': 'pu', 'ぺ': 'pe', 'ぽ': 'po',
+    'ま': 'ma', 'み': 'mi', 'む': 'mu', 'め': 'me', 'も': 'mo',
+    'や': 'ya', 'ゆ': 'yu', 'よ': 'yo',
+    'ら': 'ra', 'り': 'ri', 'る': 'ru', 'れ': 're', 'ろ': 'ro',
+    'わ': 'wa', 'ゐ': 'wi', 'ゑ': 'we', 'を': 'wo', 'ん': 'n',
+    'ー': '-', '〜': '~', '！': '!', '？': '?', '。': '.', '、': ','
+})
+
+# Common Japanese particles and their pronunciation
+_PARTICLES = MappingProxyType({
+    'は': 'wa',  # topic marker
+    'を': 'o',   # object marker
+    'へ': 'e'    # direction marker
+})
+
+# Merged code-point table for str.translate: particles override the
+# default readings, everything else falls through unchanged
+_ROMAJI_TABLE = MappingProxyType({
+    ord(k): v
+    for k, v in {**_HIRAGANA_TO_ROMAJI, **_PARTICLES}.items()})
+
+# Accent patterns for common words; keys are kept lowercase so lookups
+# never need a per-word lower() copy
+_ACCENT_PATTERNS = MappingProxyType({
+    'konnichiwa': [0, 3, 0, 0, 0],  # pitch accent pattern
+    'arigatou': [0, 0, 3, 0, 0],
+    'ohayou': [0, 3, 0, 0],
+    'kawaii': [0, 3, 0, 0],
+    'sugoi': [0, 3, 0]
+})
+
+# Fallback high-low pattern by word length, memoized; lengths repeat
+# constantly across utterances
+_fallback_accent = functools.lru_cache(maxsize=64)(
+    lambda n: [0] + [3] + [0] * (n - 2) if n >= 2 else [0] * n)
+
+# One phonetic table with (X-SAMPA, IPA) pairs per syllable: the two
+# notations share nearly all their keys, so keeping one dict halves
+# the table memory and means one lookup structure for both helpers.
+# Syllables without an X-SAMPA entry pass through unchanged, matching
+# the old separate-table behaviour.
+_PHON_TABLE = {
+    'a': ('a', 'a'), 'i': ('i', 'i'), 'u': ('M', 'ɯ'),
+    'e': ('e', 'e'), 'o': ('o', 'o'),
+    'ka': ('ka', 'ka'), 'ki': ('ki', 'ki'), 'ku': ('kM', 'kɯ'),
+    'ke': ('ke', 'ke'), 'ko': ('ko', 'ko'),
+    'ga': ('ga', 'ɡa'), 'gi': ('gi', 'ɡi'), 'gu': ('gu', 'ɡɯ'),
+    'ge': ('ge', 'ɡe'), 'go': ('go', 'ɡo'),
+    'sa': ('sa', 'sa'), 'shi': ('Si', 'ʃi'), 'su': ('sM', 'sɯ'),
+    'se': ('se', 'se'), 'so': ('so', 'so'),
+    'ta': ('ta', 'ta'), 'chi': ('tSi', 'tʃi'), 'tsu': ('tsM', 'tsɯ'),
+    'te': ('te', 'te'), 'to': ('to', 'to'),
+    'na': ('na', 'na'), 'ni': ('ni', 'ni'), 'nu': ('nM', 'nɯ'),
+    'ne': ('ne', 'ne'), 'no': ('no', 'no'),
+    'ha': ('ha', 'ha'), 'hi': ('Ci', 'çi'), 'fu': ('FM', 'ɸɯ'),
+    'he': ('he', 'he'), 'ho': ('ho', 'ho'),
+    'ma': ('ma', 'ma'), 'mi': ('mi', 'mi'), 'mu': ('mM', 'mɯ'),
+    'me': ('me', 'me'), 'mo': ('mo', 'mo'),
+    'ya': ('ja', 'ja'), 'yu': ('jM', 'jɯ'), 'yo': ('jo', 'jo'),
+    'ra': ('ra', 'ɾa'), 'ri': ('ri', 'ɾi'), 'ru': ('rM', 'ɾɯ'),
+    're': ('re', 'ɾe'), 'ro': ('ro', 'ɾo'),
+    'wa': ('wa', 'wa'), 'wo': ('wo', 'wo'), 'n': ('N', 'n')
+}
+
+_MEANINGS = {
+    'こんにちは': 'hello',
+    'おはよう': 'good morning',
+    'ありがとう': 'thank you',
+    'あらあら': 'oh my',
+    'えへへ': 'giggle',
+    'かわいい': 'cute',
+    'すごい': 'amazing'
+}
+
+
+@functools.lru_cache(maxsize=1024)
+def _sampa_for(romaji: str) -> str:
+    """X-SAMPA for a romaji string; memoized, inputs repeat heavily"""
+    # Simple conversion - in real implementation would be more sophisticated
+    # join over a list: one pass, one allocation, no generator frames
+    return ' '.join([_PHON_TABLE[s][0] if s in _PHON_TABLE else s
+                     for s in romaji.split()])
+
+
+# Phoneme markup per expression, prefilled so generate_ssml never
+# converts romaji at request time; grows as new expressions are met
+_PHONEME_MARKUP = {
+    jp: (f'<phoneme alphabet="x-sampa" '
+         f'ph="{_sampa_for(romaji)}">{jp}</phoneme>')
+    for jp, romaji in _EXPRESSION_DICT.items()
+}
+
+# Longest-first so multi-character syllables ('shi', 'chi', 'tsu')
+# win over their single-character prefixes
+_PHON_RE = re.compile('|'.join(
+    sorted(map(re.escape, _PHON_TABLE), key=len, reverse=True)))
+
+
+@functools.lru_cache(maxsize=1024)
+def _ipa_for(romaji: str) -> str:
+    """IPA for a romaji string; memoized, inputs repeat heavily"""
+    return _PHON_RE.sub(lambda m: _PHON_TABLE[m.group(0)][1], romaji)
+
+
+# add_pronunciation_marks patterns, compiled once
+_PARTICLE_RE = re.compile(r'(wa|ga|o|ni|de|to|kara)\s')
+_EMPH_RE = re.compile(r'(ara ara|ehehe|kawaii|sugoi)')
+_BREAK_RE = re.compile(r'([.!?])\s*')
+
+# Runs of Japanese, including iteration/repetition marks and the long
+# vowel bar, for segment extraction
+_JP_SEG_RE = re.compile(
+    '[\u3040-\u309f\u30a0-\u30ff\u4e00-\u9faf\uff65-\uff9f\u3005\u3006\u3024\u30f6\u30fc]+')
+
 
 class JapaneseTextProcessor:
     """Processes Japanese text for voice synthesis"""
     
     def __init__(self):
         self.logger = logging.getLogger(__name__)
-        
-        # Common Japanese expressions and their romanizations
-        self.expression_dict = {
-            'こんにちは': 'konnichiwa',
-            'おはよう': 'ohayou',
-            'ありがとう': 'arigatou',
-            'すみません': 'sumimasen',
-            'あらあら': 'ara ara',
-            'えへへ': 'ehehe',
-            'うふふ': 'ufufu',
-            'ばか': 'baka',
-            'かわいい': 'kawaii',
-            'すごい': 'sugoi',
-            'おねがい': 'onegai',
-            'ごめん': 'gomen',
-            'はい': 'hai',
-            'いいえ': 'iie',
-            'だめ': 'dame',
-            'やった': 'yatta',
-            'きゃー': 'kyaa',
-            'えー': 'ee',
-            'うん': 'un',
-            'ううん': 'uun',
-            'そうですね': 'sou desu ne',
-            'なるほど': 'naruhodo',
-            'おいしい': 'oishii',
-            'たのしい': 'tanoshii',
-            'きれい': 'kirei',
-            'すてき': 'suteki',
-            'だいすき': 'daisuki',
-            'がんばって': 'ganbatte'
-        }
-        
-        # Romanization mapping for individual characters
-        self.hiragana_to_romaji = {
-            'あ': 'a', 'い': 'i', 'う': 'u', 'え': 'e', 'お': 'o',
-            'か': 'ka', 'き': 'ki', 'く': 'ku', 'け': 'ke', 'こ': 'ko',
-            'が': 'ga', 'ぎ': 'gi', 'ぐ': 'gu', 'げ': 'ge', 'ご': 'go',
-            'さ': 'sa', 'し': 'shi', 'す': 'su', 'せ': 'se', 'そ': 'so',
-            'ざ': 'za', 'じ': 'ji', 'ず': 'zu', 'ぜ': 'ze', 'ぞ': 'zo',
-            'た': 'ta', 'ち': 'chi', 'つ': 'tsu', 'て': 'te', 'と': 'to',
-            'だ': 'da', 'ぢ': 'ji', 'づ': 'zu', 'で': 'de', 'ど': 'do',
-            'な': 'na', 'に': 'ni', 'ぬ': 'nu', 'ね': 'ne', 'の': 'no',
-            'は': 'ha', 'ひ': 'hi', 'ふ': 'fu', 'へ': 'he', 'ほ': 'ho',
-            'ば': 'ba', 'び': 'bi', 'ぶ': 'bu', 'べ': 'be', 'ぼ': 'bo',
-            'ぱ': 'pa', 'ぴ': 'pi', 'ぷ': 'pu', 'ぺ': 'pe', 'ぽ': 'po',
-            'ま': 'ma', 'み': 'mi', 'む': 'mu', 'め': 'me', 'も': 'mo',
-            'や': 'ya', 'ゆ': 'yu', 'よ': 'yo',
-            'ら': 'ra', 'り': 'ri', 'る': 'ru', 'れ': 're', 'ろ': 'ro',
-            'わ': 'wa', 'ゐ': 'wi', 'ゑ': 'we', 'を': 'wo', 'ん': 'n',
-            'ー': '-', '〜': '~', '！': '!', '？': '?', '。': '.', '、': ','
-        }
-        
-        # Katakana to hiragana mapping for processing
-        self.katakana_to_hiragana = str.maketrans(
-            'アイウエオカキクケコガギグゲゴサシスセソザジズゼゾタチツテトダヂヅデド'
-            'ナニヌネノハヒフヘホバビブベボパピプペポマミムメモヤユヨラリルレロワヲン'
-            'ァィゥェォッャュョー',
-            'あいうえおかきくけこがぎぐげごさしすせそざじずぜぞたちつてとだぢづでど'
-            'なにぬねのはひふへほばびぶべぼぱぴぷぺぽまみむめもやゆよらりるれろわをん'
-            'ぁぃぅぇぉっゃゅょー'
-        )
-        
-        # Common Japanese particles and their pronunciation
-        self.particles = {
-            'は': 'wa',  # topic marker
-            'を': 'o',   # object marker
-            'へ': 'e'    # direction marker
-        }
-        
-        # Accent patterns for common words
-        self.accent_patterns = {
-            'konnichiwa': [0, 3, 0, 0, 0],  # pitch accent pattern
-            'arigatou': [0, 0, 3, 0, 0],
-            'ohayou': [0, 3, 0, 0],
-            'kawaii': [0, 3, 0, 0],
-            'sugoi': [0, 3, 0]
-        }
-    
+
+        # All tables live at module level and are shared read-only by
+        # every instance; construction is just reference binding
+        self.expression_dict = _EXPRESSION_DICT
+        self._expr_ac = _EXPR_AC
+        self._expr_re = _EXPR_RE
+        self.hiragana_to_romaji = _HIRAGANA_TO_ROMAJI
+        self.katakana_to_hiragana = _KATA2HIRA
+        self.particles = _PARTICLES
+        self._phoneme_cache = _PHONEME_MARKUP
+        self._romaji_table = _ROMAJI_TABLE
+        self.accent_patterns = _ACCENT_PATTERNS
+        self._fallback_accent = _fallback_accent
+
+    @staticmethod
+    def _nfkc(text: str) -> str:
+        """
+        NFKC-normalize text, skipping the rewrite when already normal.
+
+        Half-width katakana, decomposed dakuten, and full-width ASCII
+        all miss the kana and romaji tables unless canonicalized first;
+        the is_normalized quick check makes the common already-normal
+        case a single C call with no allocation.
+        """
+        if unicodedata.is_normalized('NFKC', text):
+            return text
+        return unicodedata.normalize('NFKC', text)
+
     def contains_japanese(self, text: str) -> bool:
         """Check if text contains Japanese characters"""
-        japanese_ranges = [
-            (0x3040, 0x309F),  # Hiragana
-            (0x30A0, 0x30FF),  # Katakana
-            (0x4E00, 0x9FAF),  # CJK Unified Ideographs
-            (0xFF65, 0xFF9F),  # Half-width Katakana
-        ]
-        
-        for char in text:
-            code = ord(char)
-            for start, end in japanese_ranges:
-                if start <= code <= end:
-                    return True
-        return False
-    
+        return _JP_RE.search(self._nfkc(text)) is not None
+
     def extract_japanese_text(self, text: str) -> List[str]:
         """Extract Japanese text segments from mixed text"""
-        japanese_pattern = r'[ひらがなカタカナ漢字々〆〤ヶ]+'
-        matches = re.findall(japanese_pattern, text)
-        return matches
+        return _JP_SEG_RE.findall(self._nfkc(text))
     
-    def romanize_text(self, text: str) -> str:
-        """Convert Japanese text to romanized form"""
-        if not self.contains_japanese(text):
-            return text
-        
-        # First check for complete expressions
-        for japanese, romaji in self.expression_dict.items():
-            if japanese in text:
-                text = text.replace(japanese, romaji)
-        
-        # Convert katakana to hiragana for processing
-        if JACONV_AVAILABLE:
-            text = jaconv.kata2hira(text)
+    def _iter_expression_spans(self, text: str):
+        """Yield (start, end, japanese, romaji) matches, leftmost-longest"""
+        if self._expr_ac is not None:
+            for end, (japanese, romaji) in self._expr_ac.iter_long(text):
+                yield end - len(japanese) + 1, end + 1, japanese, romaji
         else:
-            text = text.translate(self.katakana_to_hiragana)
-        
-        # Romanize remaining characters
-        result = ""
-        i = 0
-        while i < len(text):
-            char = text[i]
-            
-            # Handle particles specially
-            if char in self.particles:
-                result += self.particles[char]
-            elif char in self.hiragana_to_romaji:
-                result += self.hiragana_to_romaji[char]
-            else:
-                result += char
-            i += 1
-        
-        return result
+            for match in self._expr_re.finditer(text):
+                japanese = match.group(0)
+                yield (match.start(), match.end(), japanese,
+                       self.expression_dict[japanese])
+
+    def romanize_text(self, text: str,
+                      is_japanese: Optional[bool] = None) -> str:
+        """
+        Convert Japanese text to romanized form.
+
+        Callers that have already checked for Japanese content can pass
+        is_japanese to skip the redundant scan.
+        """
+        # Dominant case in mixed English UIs: pure ASCII cannot contain
+        # Japanese and is NFKC-invariant, so return it untouched.
+        # isascii() is an O(1) flag check on compact strings.
+        if text.isascii():
+            return text
+        text = self._nfkc(text)
+        if is_japanese is None:
+            is_japanese = _JP_RE.search(text) is not None
+        if not is_japanese:
+            return text
+        romanized, _matched = self._romanize_and_match(text)
+        return romanized
+
+    def romanize_batch(self, texts: List[str]) -> List[str]:
+        """
+        Romanize many strings at once for bulk preprocessing.
+
+        Joins the batch on NUL separators so the expression pass and
+        the two translate passes each run once over the whole corpus
+        instead of once per string; for thousands of short utterances
+        the per-call overhead is what dominates. NUL never appears in
+        the expression dictionary or the translate tables, so matches
+        cannot cross string boundaries.
+        """
+        if not texts:
+            return []
+        joined = self._nfkc('\x00'.join(texts))
+        romanized, _matched = self._romanize_and_match(joined)
+        return romanized.split('\x00')
+
+    def _romanize_and_match(self, text: str) -> Tuple[str, Dict[str, str]]:
+        """
+        Romanize NFKC-normalized text in one expression pass, also
+        returning the matched expressions in first-match order so
+        callers needing both do not scan the text twice.
+        """
+        # Replace complete expressions in one pass, rebuilding the
+        # string from slices instead of one .replace per entry
+        parts = []
+        prev = 0
+        matched = {}
+        for start, end, japanese, romaji in self._iter_expression_spans(text):
+            matched.setdefault(japanese, romaji)
+            parts.append(text[prev:start])
+            parts.append(romaji)
+            prev = end
+        if parts:
+            parts.append(text[prev:])
+            text = ''.join(parts)
+
+        # Convert katakana to hiragana: one C-level translate pass,
+        # jaconv's Python path does the same work slower
+        text = text.translate(_KATA2HIRA)
+
+        # Romanize remaining characters in one C-level translate pass
+        return text.translate(self._romaji_table), matched
     
     def add_pronunciation_marks(self, text: str) -> str:
         """Add pronunciation marks for better TTS"""
         # Add pauses after particles
-        text = re.sub(r'(wa|ga|o|ni|de|to|kara)\s', r'\1, ', text)
-        
+        text = _PARTICLE_RE.sub(r'\1, ', text)
+
         # Add emphasis markers
-        text = re.sub(r'(ara ara|ehehe|kawaii|sugoi)', r'<emphasis>\1</emphasis>', text)
-        
+        text = _EMPH_RE.sub(r'<emphasis>\1</emphasis>', text)
+
         # Add breathing pauses
-        text = re.sub(r'([.!?])\s*', r'\1<break time="0.5s"/>', text)
-        
+        text = _BREAK_RE.sub(r'\1<break time="0.5s"/>', text)
+
         return text
     
     def generate_ssml(self, text: str, voice_params: Dict) -> str:
@@ -195,13 +391,24 @@ class JapaneseTextProcessor:
         # Process text for pronunciation
         processed_text = self.add_pronunciation_marks(text)
         
-        # Handle Japanese expressions specially
-        for expression, romaji in self.expression_dict.items():
-            if expression in processed_text:
-                # Add phoneme information
-                phoneme_markup = f'<phoneme alphabet="x-sampa" ph="{self._get_sampa(romaji)}">{expression}</phoneme>'
-                processed_text = processed_text.replace(expression, phoneme_markup)
-        
+        # Handle Japanese expressions in one scan, splicing cached
+        # phoneme markup at each match instead of a .replace per entry
+        parts = []
+        prev = 0
+        for start, end, expression, romaji in \
+                self._iter_expression_spans(processed_text):
+            markup = self._phoneme_cache.get(expression)
+            if markup is None:
+                markup = (f'<phoneme alphabet="x-sampa" '
+                          f'ph="{self._get_sampa(romaji)}">{expression}</phoneme>')
+                self._phoneme_cache[expression] = markup
+            parts.append(processed_text[prev:start])
+            parts.append(markup)
+            prev = end
+        if parts:
+            parts.append(processed_text[prev:])
+            processed_text = ''.join(parts)
+
         ssml += processed_text
         
         # Close tags
@@ -215,115 +422,103 @@ class JapaneseTextProcessor:
     
     def _get_sampa(self, romaji: str) -> str:
         """Convert romaji to X-SAMPA phonemes (simplified)"""
-        sampa_mapping = {
-            'a': 'a', 'i': 'i', 'u': 'M', 'e': 'e', 'o': 'o',
-            'ka': 'ka', 'ki': 'ki', 'ku': 'kM', 'ke': 'ke', 'ko': 'ko',
-            'sa': 'sa', 'shi': 'Si', 'su': 'sM', 'se': 'se', 'so': 'so',
-            'ta': 'ta', 'chi': 'tSi', 'tsu': 'tsM', 'te': 'te', 'to': 'to',
-            'na': 'na', 'ni': 'ni', 'nu': 'nM', 'ne': 'ne', 'no': 'no',
-            'ha': 'ha', 'hi': 'Ci', 'fu': 'FM', 'he': 'he', 'ho': 'ho',
-            'ma': 'ma', 'mi': 'mi', 'mu': 'mM', 'me': 'me', 'mo': 'mo',
-            'ya': 'ja', 'yu': 'jM', 'yo': 'jo',
-            'ra': 'ra', 'ri': 'ri', 'ru': 'rM', 're': 're', 'ro': 'ro',
-            'wa': 'wa', 'wo': 'wo', 'n': 'N'
-        }
-        
-        # Simple conversion - in real implementation would be more sophisticated
-        result = ""
-        for syllable in romaji.split():
-            if syllable in sampa_mapping:
-                result += sampa_mapping[syllable] + " "
-            else:
-                result += syllable + " "
-        
-        return result.strip()
+        return _sampa_for(romaji)
     
-    def analyze_accent_pattern(self, text: str) -> List[int]:
+    def analyze_accent_pattern(self, text: Union[str, List[str]]) -> List[int]:
         """Analyze pitch accent patterns for Japanese text"""
-        words = text.split()
+        # Accept a presplit token list so callers that already split
+        # the text do not split it again
+        words = text.split() if isinstance(text, str) else text
         accent_pattern = []
-        
+        extend = accent_pattern.extend
+        patterns = self.accent_patterns
+        fallback = self._fallback_accent
         for word in words:
-            word_lower = word.lower()
-            if word_lower in self.accent_patterns:
-                accent_pattern.extend(self.accent_patterns[word_lower])
-            else:
-                # Default pattern: high-low for most words
-                pattern = [0] + [3] + [0] * (len(word) - 2)
-                accent_pattern.extend(pattern)
-        
+            # Keys are lowercase; only lowercase on a first-lookup
+            # miss so mixed-case words like "Kawaii" still match.
+            # Default is high-low
+            extend(patterns.get(word)
+                   or patterns.get(word.lower())
+                   or fallback(len(word)))
         return accent_pattern
     
     def preprocess_for_tts(self, text: str, target_language: str = 'ja') -> Dict[str, any]:
         """Preprocess text for TTS synthesis"""
+        # Pure-ASCII input skips normalization and every Japanese pass
+        if text.isascii():
+            return {
+                'original_text': text,
+                'contains_japanese': False,
+                'romanized_text': text,
+                'pronunciation_guide': [],
+                'accent_pattern': [0] * len(text.split()),
+                'ssml_ready': False
+            }
+        text = self._nfkc(text)
+        # Text is already normalized: check once and thread the result
+        # through instead of re-scanning in every helper
+        is_japanese = _JP_RE.search(text) is not None
         result = {
             'original_text': text,
-            'contains_japanese': self.contains_japanese(text),
+            'contains_japanese': is_japanese,
             'romanized_text': '',
             'pronunciation_guide': [],
             'accent_pattern': [],
             'ssml_ready': False
         }
-        
-        if result['contains_japanese']:
-            result['romanized_text'] = self.romanize_text(text)
-            result['pronunciation_guide'] = self._get_pronunciation_guide(text)
-            result['accent_pattern'] = self.analyze_accent_pattern(result['romanized_text'])
+
+        if is_japanese:
+            # One expression pass yields both the romanization and the
+            # matches the pronunciation guide needs
+            romanized, matched = self._romanize_and_match(text)
+            result['romanized_text'] = romanized
+            result['pronunciation_guide'] = [{
+                'japanese': japanese,
+                'romaji': romaji,
+                'ipa': self._romaji_to_ipa(romaji),
+                'meaning': self._get_meaning(japanese)
+            } for japanese, romaji in matched.items()]
+            result['accent_pattern'] = self.analyze_accent_pattern(
+                romanized.split())
         else:
             result['romanized_text'] = text
             result['accent_pattern'] = [0] * len(text.split())
         
         return result
     
+    def preprocess_for_tts_batch(
+            self, texts: List[str],
+            target_language: str = 'ja') -> List[Dict[str, any]]:
+        """
+        Preprocess a list of texts in one call.
+
+        Streaming callers run every chunk of a request through the
+        frontend together; each text still takes the ASCII fast path
+        when it can.
+        """
+        preprocess = self.preprocess_for_tts
+        return [preprocess(text, target_language) for text in texts]
+
     def _get_pronunciation_guide(self, text: str) -> List[Dict[str, str]]:
         """Get detailed pronunciation guide for Japanese text"""
-        guide = []
-        
-        for expression, romaji in self.expression_dict.items():
-            if expression in text:
-                guide.append({
-                    'japanese': expression,
-                    'romaji': romaji,
-                    'ipa': self._romaji_to_ipa(romaji),
-                    'meaning': self._get_meaning(expression)
-                })
-        
-        return guide
+        # One pass over the text instead of one substring scan per
+        # dictionary entry; de-duplicated, first match first
+        matched = {}
+        for _start, _end, japanese, romaji in \
+                self._iter_expression_spans(text):
+            matched.setdefault(japanese, romaji)
+
+        return [{
+            'japanese': japanese,
+            'romaji': romaji,
+            'ipa': self._romaji_to_ipa(romaji),
+            'meaning': self._get_meaning(japanese)
+        } for japanese, romaji in matched.items()]
     
     def _romaji_to_ipa(self, romaji: str) -> str:
         """Convert romaji to IPA notation (simplified)"""
-        ipa_mapping = {
-            'a': 'a', 'i': 'i', 'u': 'ɯ', 'e': 'e', 'o': 'o',
-            'ka': 'ka', 'ki': 'ki', 'ku': 'kɯ', 'ke': 'ke', 'ko': 'ko',
-            'ga': 'ɡa', 'gi': 'ɡi', 'gu': 'ɡɯ', 'ge': 'ɡe', 'go': 'ɡo',
-            'sa': 'sa', 'shi': 'ʃi', 'su': 'sɯ', 'se': 'se', 'so': 'so',
-            'ta': 'ta', 'chi': 'tʃi', 'tsu': 'tsɯ', 'te': 'te', 'to': 'to',
-            'na': 'na', 'ni': 'ni', 'nu': 'nɯ', 'ne': 'ne', 'no': 'no',
-            'ha': 'ha', 'hi': 'çi', 'fu': 'ɸɯ', 'he': 'he', 'ho': 'ho',
-            'ma': 'ma', 'mi': 'mi', 'mu': 'mɯ', 'me': 'me', 'mo': 'mo',
-            'ya': 'ja', 'yu': 'jɯ', 'yo': 'jo',
-            'ra': 'ɾa', 'ri': 'ɾi', 'ru': 'ɾɯ', 're': 'ɾe', 'ro': 'ɾo',
-            'wa': 'wa', 'wo': 'wo', 'n': 'n'
-        }
-        
-        result = ""
-        for char in romaji:
-            if char in ipa_mapping:
-                result += ipa_mapping[char]
-            else:
-                result += char
-        
-        return result
-    
+        return _ipa_for(romaji)
+
     def _get_meaning(self, expression: str) -> str:
         """Get English meaning of Japanese expression"""
-        meanings = {
-            'こんにちは': 'hello',
-            'おはよう': 'good morning',
-            'ありがとう': 'thank you',
-            'あらあら': 'oh my',
-            'えへへ': 'giggle',
-            'かわいい': 'cute',
-            'すごい': 'amazing'
-        }
-        return meanings.get(expression, 'unknown')
+        return _MEANINGS.get(expression, 'unknown')
@@ -4,7 +4,10 @@ Clean implementation focused on high-quality anime voice synthesis
 """
 
 import os
+import re
 import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Optional, Any
 from pathlib import Path
 
@@ -14,26 +17,48 @@ try:
 except ImportError:
     pass
 
-from .azure_tts import AzureWaifuTTS
-
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Sentence boundaries for streaming, compiled once
+_SENT_RE = re.compile(r'[.!?]+')
+
+# Emotion keyword scan as one alternation, replacing five
+# any(word in text) passes. Groups are declared in the old elif
+# priority order; analyze_text ranks matches by it, since search()
+# alone would let an earlier position beat a higher-priority emotion
+_EMO_RE = re.compile(
+    r'(?P<cheerful>!|yay|amazing|wonderful|♪)|'
+    r'(?P<giggly>ehehe|hehe|funny|giggle)|'
+    r'(?P<teasing>ara ara|interesting|~)|'
+    r'(?P<shy>um|maybe|shy|embarrass)|'
+    r"(?P<excited>wow|excited|can't wait)", re.IGNORECASE)
+_EMO_PRIORITY = {name: rank for rank, name in enumerate(_EMO_RE.groupindex)}
+
 
 class WaifuVoiceSynthesizer:
     """Minimal waifu voice synthesizer using Azure Neural TTS"""
     
     def __init__(self):
         self.logger = logging.getLogger(__name__)
-        
-        # Initialize Azure TTS (the only component we need)
-        self.azure_tts = AzureWaifuTTS()
-        
-        if not self.azure_tts.azure_available:
-            self.logger.warning("Azure Speech Service not configured. Run scripts/setup_azure.py")
-        
+
+        # Azure TTS is created lazily: analyze_text-only callers never
+        # pay for the SDK import or the credential probe
+        self._azure_tts = None
+        self._voices = None
+
         self.logger.info("Minimal WaifuVoiceSynthesizer initialized with Azure Neural TTS")
+
+    @property
+    def azure_tts(self):
+        """Azure TTS client, constructed on first use"""
+        if self._azure_tts is None:
+            from .azure_tts import AzureWaifuTTS
+            self._azure_tts = AzureWaifuTTS()
+            if not self._azure_tts.azure_available:
+                self.logger.warning("Azure Speech Service not configured. Run scripts/setup_azure.py")
+        return self._azure_tts
     
     def synthesize(self, text: str, character: str = 'sakura', 
                   emotion: str = 'cheerful', **kwargs) -> bytes:
@@ -72,17 +97,26 @@ class WaifuVoiceSynthesizer:
         Simply splits text into chunks for Azure TTS
         """
         # Split text into sentences for streaming
-        import re
-        sentences = re.split(r'[.!?]+', text)
-        
-        for sentence in sentences:
-            sentence = sentence.strip()
-            if sentence:
-                yield self.synthesize(sentence, **kwargs)
+        sentences = [s.strip() for s in _SENT_RE.split(text) if s.strip()]
+
+        # Prefetch the next sentences while the caller consumes the
+        # current one, hiding the Azure round trip behind playback.
+        # Two workers is plenty and stays well under rate limits.
+        prefetch = 2
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            futures = deque()
+            for sentence in sentences:
+                futures.append(executor.submit(self.synthesize, sentence, **kwargs))
+                if len(futures) > prefetch:
+                    yield futures.popleft().result()
+            while futures:
+                yield futures.popleft().result()
     
     def get_available_voices(self) -> Dict[str, Any]:
-        """Get available character voices"""
-        return self.azure_tts.get_available_voices()
+        """Get available character voices (config-level constant, cached)"""
+        if self._voices is None:
+            self._voices = self.azure_tts.get_available_voices()
+        return self._voices
     
     def test_azure_connection(self) -> bool:
         """Test Azure Speech service connection"""
@@ -90,21 +124,19 @@ class WaifuVoiceSynthesizer:
     
     def analyze_text(self, text: str) -> Dict[str, Any]:
         """Simple text analysis for emotion detection"""
-        # Simple emotion detection based on text patterns
-        text_lower = text.lower()
-        
-        if any(word in text_lower for word in ['!', 'yay', 'amazing', 'wonderful', '♪']):
-            emotion = 'cheerful'
-        elif any(word in text_lower for word in ['ehehe', 'hehe', 'funny', 'giggle']):
-            emotion = 'giggly'  
-        elif any(word in text_lower for word in ['ara ara', 'interesting', '~']):
-            emotion = 'teasing'
-        elif any(word in text_lower for word in ['um', 'maybe', 'shy', 'embarrass']):
-            emotion = 'shy'
-        elif any(word in text_lower for word in ['wow', 'excited', 'can\'t wait']):
-            emotion = 'excited'
-        else:
-            emotion = 'neutral'
+        # Simple emotion detection based on text patterns: one scan of
+        # the precompiled alternation instead of up to 21 substring
+        # searches; IGNORECASE replaces the lower() copy. Keep the
+        # best-priority group across matches so the old elif ordering
+        # decides, not match position
+        emotion = 'neutral'
+        best_rank = len(_EMO_PRIORITY)
+        for m in _EMO_RE.finditer(text):
+            rank = _EMO_PRIORITY[m.lastgroup]
+            if rank < best_rank:
+                emotion, best_rank = m.lastgroup, rank
+                if rank == 0:
+                    break
         
         # Recommend character based on emotion
         character_map = {
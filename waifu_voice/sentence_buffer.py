@@ -0,0 +1,88 @@
+"""
+Sentence Buffer
+Splits long texts at sentence boundaries so synthesis can be pipelined
+"""
+
+import re
+from typing import List
+
+# Sentence boundary: terminal punctuation, whitespace, then a capital letter
+_SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+(?=[A-Z])')
+
+# Common abbreviations whose trailing period does not end a sentence
+_ABBREVIATIONS = ('dr.', 'mr.', 'mrs.', 'ms.', 'prof.', 'st.', 'vs.', 'etc.', 'e.g.', 'i.e.')
+
+# Dispatch the first chunk quickly, then larger chunks for throughput
+FIRST_CHUNK_MAX = 700
+CHUNK_MAX = 4000
+MIN_SENTENCE_LEN = 10
+
+
+def iter_sentences(text: str, min_len: int = MIN_SENTENCE_LEN) -> List[str]:
+    """
+    Split text into sentences, merging fragments that are too short
+    or end with a known abbreviation
+
+    Args:
+        text: Input text
+        min_len: Minimum sentence length; shorter pieces merge forward
+
+    Returns:
+        List of sentence strings
+    """
+    pieces = _SENTENCE_BOUNDARY.split(text.strip())
+    sentences = []
+    pending = ''
+
+    for piece in pieces:
+        piece = piece.strip()
+        if not piece:
+            continue
+
+        pending = f"{pending} {piece}" if pending else piece
+
+        # Keep accumulating if this looks like an abbreviation or is too short
+        if pending.lower().endswith(_ABBREVIATIONS) or len(pending) < min_len:
+            continue
+
+        sentences.append(pending)
+        pending = ''
+
+    if pending:
+        sentences.append(pending)
+
+    return sentences
+
+
+def chunk_text(text: str, first_chunk_max: int = FIRST_CHUNK_MAX,
+               chunk_max: int = CHUNK_MAX) -> List[str]:
+    """
+    Group sentences into synthesis chunks: a small first chunk for fast
+    time-to-first-audio, then larger chunks for throughput
+
+    Args:
+        text: Input text
+        first_chunk_max: Character budget for the first chunk
+        chunk_max: Character budget for subsequent chunks
+
+    Returns:
+        List of chunk strings (order preserved)
+    """
+    sentences = iter_sentences(text)
+    if not sentences:
+        return []
+
+    chunks = []
+    current = sentences[0]
+    budget = first_chunk_max
+
+    for sentence in sentences[1:]:
+        if len(current) + len(sentence) + 1 > budget:
+            chunks.append(current)
+            current = sentence
+            budget = chunk_max
+        else:
+            current = f"{current} {sentence}"
+
+    chunks.append(current)
+    return chunks
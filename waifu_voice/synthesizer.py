@@ -3,12 +3,19 @@ Main Voice Synthesizer
 Core synthesis engine that combines all components
 """
 
+import asyncio
+import hashlib
 import io
 import json
 import logging
+import os
+import re
+import struct
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional, Union, Any
 from pathlib import Path
 
+from .cache import DiskLRU
 from .emotion_detector import EmotionDetector
 from .voice_models import VoiceModelManager
 from .japanese_processor import JapaneseTextProcessor
@@ -22,10 +29,63 @@ except ImportError:
     NUMPY_AVAILABLE = False
     logging.warning("NumPy not available, limited functionality")
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+
+try:
+    from sentence_transformers import SentenceTransformer
+    SENTENCE_TRANSFORMERS_AVAILABLE = True
+except ImportError:
+    SENTENCE_TRANSFORMERS_AVAILABLE = False
+
+try:
+    import soundfile as sf
+    SOUNDFILE_AVAILABLE = True
+except ImportError:
+    SOUNDFILE_AVAILABLE = False
+
+# Normalization for the semantic cache: drop punctuation, lowercase,
+# collapse whitespace so trivial variants share an entry
+_SEMANTIC_NORM_RE = re.compile(r'[^\w\s]')
+
+# Sentence boundaries for streaming, compiled once; the capture keeps
+# the terminators on their sentences so chunks sound natural
+_SENTENCE_SPLIT_RE = re.compile(r'([.!?]+)')
+
+# Best character per detected emotion, built once
+_CHARACTER_RECOMMENDATIONS = {
+    'cheerful': 'sakura',
+    'giggly': 'miku',
+    'teasing': 'rei',
+    'shy': 'yuki',
+    'excited': 'miku',
+    'sad': 'yuki',
+    'neutral': 'sakura'
+}
+
 
 class WaifuVoiceSynthesizer:
     """Main voice synthesis engine for waifu characters"""
-    
+
+    # No per-instance __dict__: attribute access on the hot synthesis
+    # path becomes a fixed-offset load. Subclasses that add attributes
+    # must declare their own __slots__ (or include '__dict__').
+    __slots__ = (
+        'logger', 'emotion_detector', 'voice_models', 'japanese_processor',
+        'audio_processor', 'azure_tts', 'config', 'default_params',
+        'cache_enabled', 'max_cache_size', 'cache', 'semantic_cache',
+        'semantic_threshold', 'max_semantic_cache_size', '_embedding_model',
+        '_analysis_cache', '_silence_cache', '_voices_cache')
+
     def __init__(self, config_file: Optional[str] = None):
         self.logger = logging.getLogger(__name__)
         
@@ -52,10 +112,35 @@ class WaifuVoiceSynthesizer:
             'quality': 'high'
         }
         
-        # Synthesis cache for performance
-        self.cache = {}
+        # Synthesis cache for performance: in-memory LRU in front of a
+        # shared on-disk tier, so server workers reuse each other's
+        # popular lines instead of each caching them separately
         self.cache_enabled = True
         self.max_cache_size = 100
+        self.cache = DiskLRU(self.config['cache_dir'],
+                             memory_size=self.max_cache_size)
+
+        # Second-tier semantic cache: entries are (key, param_digest,
+        # audio bytes) where key is a unit-norm sentence embedding when
+        # sentence-transformers is installed, else the normalized text.
+        # Near-duplicate prompts then skip the Azure round trip.
+        self.semantic_cache = []
+        self.semantic_threshold = 0.97
+        self.max_semantic_cache_size = 100
+        self._embedding_model = None
+
+        # Frontend analyses keyed by text: the common UI flow calls
+        # analyze_text and then synthesize on the same string, which
+        # would otherwise run every scan twice
+        self._analysis_cache = {}
+
+        # Fallback silence, keyed by (sample_rate, 50 ms buckets); the
+        # error path can run in a tight loop and the bytes never change
+        self._silence_cache = {}
+
+        # get_available_voices result; the source dicts only change
+        # through set_character_config, which invalidates this
+        self._voices_cache: Optional[Dict] = None
         
         self.logger.info("WaifuVoiceSynthesizer initialized")
     
@@ -68,6 +153,9 @@ class WaifuVoiceSynthesizer:
             'n_fft': 1024,
             'enable_gpu': True,
             'cache_enabled': True,
+            'cache_codec': 'flac',  # 'flac' or 'wav' (uncompressed)
+            'cache_dir': os.path.join(
+                os.path.expanduser('~'), '.cache', 'waifu_voice', 'synth'),
             'default_character': 'sakura',
             'supported_languages': ['en', 'ja', 'mixed'],
             'quality_presets': {
@@ -79,22 +167,30 @@ class WaifuVoiceSynthesizer:
         
         if config_file and Path(config_file).exists():
             try:
-                with open(config_file, 'r', encoding='utf-8') as f:
-                    user_config = json.load(f)
+                # orjson parses straight from the raw bytes, skipping
+                # the text-mode decode and the pure-Python parse
+                if ORJSON_AVAILABLE:
+                    user_config = orjson.loads(Path(config_file).read_bytes())
+                else:
+                    with open(config_file, 'r', encoding='utf-8') as f:
+                        user_config = json.load(f)
                 default_config.update(user_config)
             except Exception as e:
                 self.logger.warning(f"Could not load config file {config_file}: {e}")
         
         return default_config
     
-    def synthesize(self, text: str, **kwargs) -> bytes:
+    def synthesize(self, text: str, _analyses: Optional[tuple] = None,
+                   **kwargs) -> bytes:
         """
         Main synthesis method
-        
+
         Args:
             text: Text to synthesize
+            _analyses: Optional precomputed (emotion, japanese) analyses
+                from a batched frontend pass; internal use
             **kwargs: Synthesis parameters (character, emotion, voice_style, etc.)
-            
+
         Returns:
             Audio data as bytes
         """
@@ -105,12 +201,23 @@ class WaifuVoiceSynthesizer:
             
             # Check cache first
             cache_key = self._generate_cache_key(text, params)
-            if self.cache_enabled and cache_key in self.cache:
-                self.logger.debug(f"Cache hit for text: {text[:50]}...")
-                return self.cache[cache_key]
-            
+            if self.cache_enabled:
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    self.logger.debug(f"Cache hit for text: {text[:50]}...")
+                    return self._decode_cache_entry(cached)
+
+            # On an exact miss, try the semantic tier
+            if self.cache_enabled:
+                param_digest = self._generate_cache_key('', params)
+                semantic_hit = self._semantic_lookup(text, param_digest)
+                if semantic_hit is not None:
+                    self.logger.debug(f"Semantic cache hit for text: {text[:50]}...")
+                    return self._decode_cache_entry(semantic_hit)
+
             # Process text and detect emotions
-            processed_text, synthesis_params = self._prepare_synthesis(text, params)
+            processed_text, synthesis_params = self._prepare_synthesis(
+                text, params, _analyses)
             
             # Generate audio
             audio_data = self._generate_audio(processed_text, synthesis_params)
@@ -121,9 +228,12 @@ class WaifuVoiceSynthesizer:
             # Convert to output format
             output_bytes = self._format_output(final_audio, params['output_format'])
             
-            # Cache result
+            # Cache result (FLAC-compressed where possible, so the
+            # fixed entry counts cover several times more audio)
             if self.cache_enabled:
-                self._update_cache(cache_key, output_bytes)
+                entry = self._encode_cache_entry(output_bytes)
+                self.cache.put(cache_key, entry)
+                self._semantic_store(text, param_digest, entry)
             
             self.logger.info(f"Successfully synthesized audio for text: {text[:50]}...")
             return output_bytes
@@ -133,6 +243,69 @@ class WaifuVoiceSynthesizer:
             # Return silence as fallback
             return self._generate_silence(1.0)
     
+    async def asynthesize(self, text: str, _analyses: Optional[tuple] = None,
+                          **kwargs) -> bytes:
+        """
+        Asynchronous synthesis for event-loop servers
+
+        The frontend (emotion detection, Japanese processing, cache
+        probes) is CPU-light and runs inline; only the Azure round-trip
+        is awaited, via the REST endpoint, so concurrent requests on one
+        worker overlap their network time instead of queueing.
+
+        Args:
+            text: Text to synthesize
+            _analyses: Optional precomputed (emotion, japanese) analyses
+                from a batched frontend pass; internal use
+            **kwargs: Synthesis parameters (character, emotion, voice_style, etc.)
+
+        Returns:
+            Audio data as bytes
+        """
+        try:
+            params = self.default_params.copy()
+            params.update(kwargs)
+
+            # Same two cache tiers as the sync path
+            cache_key = self._generate_cache_key(text, params)
+            if self.cache_enabled:
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    self.logger.debug(f"Cache hit for text: {text[:50]}...")
+                    return self._decode_cache_entry(cached)
+
+                param_digest = self._generate_cache_key('', params)
+                semantic_hit = self._semantic_lookup(text, param_digest)
+                if semantic_hit is not None:
+                    self.logger.debug(f"Semantic cache hit for text: {text[:50]}...")
+                    return self._decode_cache_entry(semantic_hit)
+
+            processed_text, synthesis_params = self._prepare_synthesis(
+                text, params, _analyses)
+
+            audio_data = await self.azure_tts.synthesize_async(
+                text=processed_text,
+                character=synthesis_params['character'],
+                emotion=synthesis_params['emotion'],
+                pitch=synthesis_params.get('character_pitch', 1.0),
+                rate=synthesis_params.get('character_speaking_rate', 1.0)
+            )
+
+            final_audio = self._apply_post_processing(audio_data, synthesis_params)
+            output_bytes = self._format_output(final_audio, params['output_format'])
+
+            if self.cache_enabled:
+                entry = self._encode_cache_entry(output_bytes)
+                self.cache.put(cache_key, entry)
+                self._semantic_store(text, param_digest, entry)
+
+            self.logger.info(f"Successfully synthesized audio for text: {text[:50]}...")
+            return output_bytes
+
+        except Exception as e:
+            self.logger.error(f"Async synthesis failed for text '{text}': {e}")
+            return self._generate_silence(1.0)
+
     def synthesize_streaming(self, text: str, **kwargs):
         """
         Stream synthesis for real-time applications
@@ -146,30 +319,137 @@ class WaifuVoiceSynthesizer:
         """
         try:
             # Split text into chunks for streaming
-            chunks = self._split_text_for_streaming(text)
-            
-            for chunk in chunks:
-                if chunk.strip():
-                    audio_chunk = self.synthesize(chunk, **kwargs)
-                    yield audio_chunk
-                    
+            chunks = [chunk for chunk in self._split_text_for_streaming(text)
+                      if chunk.strip()]
+
+            # Run the frontend over the whole request at once so each
+            # chunk's Azure call starts with its analyses in hand
+            if kwargs.get('emotion', self.default_params['emotion']) == 'auto':
+                emotions = self.emotion_detector.detect_emotion_batch(chunks)
+            else:
+                emotions = [None] * len(chunks)
+            japanese = self.japanese_processor.preprocess_for_tts_batch(chunks)
+
+            # Submit every chunk up front and yield results in order:
+            # later chunks synthesize while earlier ones play back.
+            # Three workers bounds concurrent Azure requests.
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                futures = [
+                    executor.submit(self.synthesize, chunk,
+                                    _analyses=(emotion, analysis), **kwargs)
+                    for chunk, emotion, analysis
+                    in zip(chunks, emotions, japanese)]
+                for future in futures:
+                    yield future.result()
+
         except Exception as e:
             self.logger.error(f"Streaming synthesis failed: {e}")
             yield self._generate_silence(0.5)
-    
-    def _prepare_synthesis(self, text: str, params: Dict[str, Any]) -> tuple:
+
+    async def asynthesize_streaming(self, text: str, **kwargs):
+        """
+        Async streaming synthesis for event-loop servers
+
+        Chunks are launched as tasks immediately — a semaphore bounds
+        how many Azure requests are in flight — and yielded in text
+        order so later chunks synthesize while earlier ones play back.
+
+        Args:
+            text: Text to synthesize
+            **kwargs: Synthesis parameters
+
+        Yields:
+            Audio chunks as bytes
+        """
+        try:
+            chunks = [chunk for chunk in self._split_text_for_streaming(text)
+                      if chunk.strip()]
+
+            # Batch the frontend up front, as in the sync path
+            if kwargs.get('emotion', self.default_params['emotion']) == 'auto':
+                emotions = self.emotion_detector.detect_emotion_batch(chunks)
+            else:
+                emotions = [None] * len(chunks)
+            japanese = self.japanese_processor.preprocess_for_tts_batch(chunks)
+
+            semaphore = asyncio.Semaphore(3)
+
+            async def _synth_chunk(chunk, analyses):
+                async with semaphore:
+                    return await self.asynthesize(chunk, _analyses=analyses,
+                                                  **kwargs)
+
+            tasks = [
+                asyncio.ensure_future(_synth_chunk(chunk, (emotion, analysis)))
+                for chunk, emotion, analysis
+                in zip(chunks, emotions, japanese)]
+            for task in tasks:
+                yield await task
+
+        except Exception as e:
+            self.logger.error(f"Async streaming synthesis failed: {e}")
+            yield self._generate_silence(0.5)
+
+    def synthesize_true_stream(self, text: str, **kwargs):
+        """
+        Stream audio bytes as Azure produces them
+
+        synthesize_streaming fakes streaming by splitting the text into
+        sentences and synthesizing each one fully; this forwards the
+        chunked Azure audio stream instead — a WAV header up front,
+        then raw PCM frames as they arrive — so time-to-first-audio is
+        roughly the server's time to first byte. Post-processing and
+        the caches are skipped: effects need the whole clip, and a
+        partial stream isn't a reusable cache entry.
+
+        Args:
+            text: Text to synthesize
+            **kwargs: Synthesis parameters
+
+        Yields:
+            A WAV header, then raw PCM chunks
+        """
+        try:
+            params = self.default_params.copy()
+            params.update(kwargs)
+
+            processed_text, synthesis_params = self._prepare_synthesis(
+                text, params)
+
+            yield from self.azure_tts.synthesize_stream(
+                processed_text,
+                character=synthesis_params['character'],
+                emotion=synthesis_params['emotion'],
+                pitch=synthesis_params.get('character_pitch', 1.0),
+                rate=synthesis_params.get('character_speaking_rate', 1.0)
+            )
+
+        except Exception as e:
+            self.logger.error(f"True streaming synthesis failed: {e}")
+            yield self._generate_silence(0.5)
+
+    def _prepare_synthesis(self, text: str, params: Dict[str, Any],
+                           analyses: Optional[tuple] = None) -> tuple:
         """Prepare text and parameters for synthesis"""
+        emotion_analysis, japanese_analysis = analyses or (None, None)
+
         # Detect emotions if auto mode
         if params['emotion'] == 'auto':
-            emotion_analysis = self.emotion_detector.detect_emotion(text)
+            if emotion_analysis is None:
+                if japanese_analysis is None:
+                    emotion_analysis, japanese_analysis, _ = \
+                        self._text_analysis(text)
+                else:
+                    emotion_analysis = self.emotion_detector.detect_emotion(text)
             detected_emotion = emotion_analysis['primary_emotion']
             emotion_params = emotion_analysis['voice_parameters']
         else:
             detected_emotion = params['emotion']
             emotion_params = {'pitch': 1.0, 'speed': 1.0, 'energy': 1.0}
-        
+
         # Process Japanese text
-        japanese_analysis = self.japanese_processor.preprocess_for_tts(text)
+        if japanese_analysis is None:
+            japanese_analysis = self.japanese_processor.preprocess_for_tts(text)
         
         # Get character-specific parameters
         character_params = self.voice_models.generate_voice_parameters(
@@ -178,7 +458,9 @@ class WaifuVoiceSynthesizer:
             params.get('voice_style')
         )
         
-        # Combine all parameters
+        # Combine all parameters in one literal: the prefixed emotion
+        # and character sets splat in as comprehensions instead of
+        # per-key assignment loops resizing the dict
         synthesis_params = {
             'text': text,
             'processed_text': japanese_analysis['romanized_text'],
@@ -189,18 +471,15 @@ class WaifuVoiceSynthesizer:
             'pronunciation_guide': japanese_analysis['pronunciation_guide'],
             'accent_pattern': japanese_analysis['accent_pattern'],
             'output_format': params['output_format'],
-            'quality': params['quality']
+            'quality': params['quality'],
+            **{f'emotion_{key}': value
+               for key, value in emotion_params.items()},
+            **{f'character_{key}': value
+               for key, value in character_params.items()}
         }
-        
-        # Merge parameter sets
-        for key, value in emotion_params.items():
-            synthesis_params[f'emotion_{key}'] = value
-        
-        for key, value in character_params.items():
-            synthesis_params[f'character_{key}'] = value
-        
+
         # Apply user overrides
-        for key in ['speed', 'pitch', 'energy']:
+        for key in ('speed', 'pitch', 'energy'):
             if key in params:
                 synthesis_params[key] = params[key]
         
@@ -263,96 +542,254 @@ class WaifuVoiceSynthesizer:
         """Format audio data for output"""
         if isinstance(audio_data, bytes):
             return audio_data
-        
+
         if NUMPY_AVAILABLE and hasattr(audio_data, 'dtype'):
+            # WAV needs no format dispatch: pack the header and convert
+            # the samples directly
+            if output_format == 'wav':
+                return self._encode_wav_fast(
+                    audio_data, self.config['sample_rate'])
             return self.audio_processor.process_audio(audio_data, output_format=output_format)
-        
+
         # Fallback
         return b''
+
+    @staticmethod
+    def _encode_wav_fast(samples: 'np.ndarray', sample_rate: int) -> bytes:
+        """Encode float32 samples as 16-bit mono WAV without dispatch"""
+        pcm = np.clip(samples * 32767.0, -32768, 32767).astype('<i2')
+        data_size = pcm.nbytes
+        header = struct.pack(
+            '<4sI4s4sIHHIIHH4sI',
+            b'RIFF', 36 + data_size, b'WAVE',
+            b'fmt ', 16, 1, 1, sample_rate, sample_rate * 2, 2, 16,
+            b'data', data_size)
+        return b''.join((header, pcm.tobytes()))
     
-    def _generate_cache_key(self, text: str, params: Dict[str, Any]) -> str:
-        """Generate cache key for synthesis parameters"""
-        key_params = {
-            'text': text,
-            'character': params.get('character'),
-            'emotion': params.get('emotion'),
-            'voice_style': params.get('voice_style'),
-            'speed': params.get('speed'),
-            'pitch': params.get('pitch'),
-            'energy': params.get('energy')
-        }
-        
-        return json.dumps(key_params, sort_keys=True)
-    
-    def _update_cache(self, key: str, data: bytes):
-        """Update synthesis cache"""
-        if len(self.cache) >= self.max_cache_size:
-            # Remove oldest entry
-            oldest_key = next(iter(self.cache))
-            del self.cache[oldest_key]
-        
-        self.cache[key] = data
+    def _encode_cache_entry(self, data: bytes) -> bytes:
+        """
+        Losslessly compress a WAV payload for cache storage.
+
+        FLAC roughly halves the bytes each cache entry holds, so the
+        fixed entry limits cover about twice the audio and disk-tier
+        reads move half the data. Non-WAV payloads and non-flac
+        cache_codec settings pass through unchanged.
+        """
+        if (not SOUNDFILE_AVAILABLE
+                or self.config.get('cache_codec') != 'flac'
+                or data[:4] != b'RIFF'):
+            return data
+        try:
+            # Keep the samples as int16 end to end: any float detour
+            # would rescale and re-truncate them, and the whole point
+            # is a byte-stable round trip
+            samples, sample_rate = sf.read(io.BytesIO(data), dtype='int16')
+            buffer = io.BytesIO()
+            sf.write(buffer, samples, sample_rate,
+                     format='FLAC', subtype='PCM_16')
+            return buffer.getvalue()
+        except Exception as e:
+            self.logger.warning(f"FLAC cache encode failed: {e}")
+            return data
+
+    def _decode_cache_entry(self, data: bytes) -> bytes:
+        """Expand a FLAC cache entry back to WAV; pass others through"""
+        if data[:4] != b'fLaC' or not SOUNDFILE_AVAILABLE:
+            return data
+        try:
+            samples, sample_rate = sf.read(io.BytesIO(data), dtype='int16')
+            pcm = samples.astype('<i2', copy=False).tobytes()
+            data_size = len(pcm)
+            header = struct.pack(
+                '<4sI4s4sIHHIIHH4sI',
+                b'RIFF', 36 + data_size, b'WAVE',
+                b'fmt ', 16, 1, 1, sample_rate, sample_rate * 2, 2, 16,
+                b'data', data_size)
+            return b''.join((header, pcm))
+        except Exception as e:
+            self.logger.warning(f"FLAC cache decode failed: {e}")
+            return data
+
+    def _generate_cache_key(self, text: str, params: Dict[str, Any]):
+        """Generate a fixed-size cache key for synthesis parameters"""
+        # Stream the relevant fields through a C-implemented hash
+        # instead of JSON-serializing them: the old keys were
+        # potentially multi-KB strings that were re-hashed and
+        # re-compared on every dict operation. NUL separators keep
+        # adjacent string fields from aliasing each other.
+        if XXHASH_AVAILABLE:
+            h = xxhash.xxh3_64()
+        else:
+            h = hashlib.blake2b(digest_size=16)
+        h.update(text.encode('utf-8'))
+        h.update(struct.pack(
+            '<ddd',
+            params.get('speed') or 1.0,
+            params.get('pitch') or 1.0,
+            params.get('energy') or 1.0))
+        h.update((params.get('character') or '').encode('utf-8'))
+        h.update(b'\0')
+        h.update((params.get('emotion') or '').encode('utf-8'))
+        h.update(b'\0')
+        h.update((params.get('voice_style') or '').encode('utf-8'))
+        # int / hex forms so the key stays JSON-serializable for the
+        # disk tier
+        return h.intdigest() if XXHASH_AVAILABLE else h.hexdigest()
     
+    @staticmethod
+    def _normalize_for_semantic(text: str) -> str:
+        """Normalize text so trivial variants compare equal"""
+        return ' '.join(_SEMANTIC_NORM_RE.sub(' ', text.lower()).split())
+
+    def _embed(self, normalized: str) -> 'np.ndarray':
+        """Unit-norm sentence embedding, model loaded on first use"""
+        if self._embedding_model is None:
+            self._embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
+        embedding = self._embedding_model.encode([normalized])[0]
+        embedding = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(embedding)
+        return embedding / norm if norm else embedding
+
+    def _semantic_lookup(self, text: str, param_digest) -> Optional[bytes]:
+        """Return cached audio for a near-duplicate prompt, if any"""
+        if not self.semantic_cache:
+            return None
+
+        normalized = self._normalize_for_semantic(text)
+        if SENTENCE_TRANSFORMERS_AVAILABLE and NUMPY_AVAILABLE:
+            # One stacked matmul scores every cached embedding at once
+            embedding = self._embed(normalized)
+            matrix = np.stack([key for key, _, _ in self.semantic_cache])
+            scores = matrix @ embedding
+            best = int(np.argmax(scores))
+            if scores[best] < self.semantic_threshold:
+                return None
+            if self.semantic_cache[best][1] != param_digest:
+                return None
+            entry = self.semantic_cache.pop(best)
+        else:
+            # Without an embedder, fall back to normalized-text equality
+            for index, (key, digest, _audio) in enumerate(self.semantic_cache):
+                if key == normalized and digest == param_digest:
+                    entry = self.semantic_cache.pop(index)
+                    break
+            else:
+                return None
+
+        # Same LRU policy as the exact tier: hits move to the back
+        self.semantic_cache.append(entry)
+        return entry[2]
+
+    def _semantic_store(self, text: str, param_digest, data: bytes):
+        """Add a synthesis result to the semantic tier"""
+        normalized = self._normalize_for_semantic(text)
+        if SENTENCE_TRANSFORMERS_AVAILABLE and NUMPY_AVAILABLE:
+            key = self._embed(normalized)
+        else:
+            key = normalized
+        if len(self.semantic_cache) >= self.max_semantic_cache_size:
+            self.semantic_cache.pop(0)
+        self.semantic_cache.append((key, param_digest, data))
+
     def _split_text_for_streaming(self, text: str) -> List[str]:
         """Split text into chunks suitable for streaming"""
-        # Simple sentence-based splitting
-        import re
-        
-        sentences = re.split(r'[.!?]+', text)
+        # Simple sentence-based splitting; the capturing split yields
+        # [sentence, terminator, sentence, terminator, ..., tail]
+        parts = _SENTENCE_SPLIT_RE.split(text)
+        sentences = []
+        for i in range(0, len(parts) - 1, 2):
+            sentence = (parts[i] + parts[i + 1]).strip()
+            if sentence:
+                sentences.append(sentence)
+        if len(parts) % 2:
+            tail = parts[-1].strip()
+            if tail:
+                sentences.append(tail)
+
+        # Pack sentences into chunks, joining once per chunk instead
+        # of concatenating strings sentence by sentence
         chunks = []
-        
-        current_chunk = ""
+        current = []
+        current_len = 0
         for sentence in sentences:
-            sentence = sentence.strip()
-            if not sentence:
-                continue
-                
-            if len(current_chunk) + len(sentence) > 100:  # Chunk size limit
-                if current_chunk:
-                    chunks.append(current_chunk)
-                    current_chunk = sentence
-                else:
-                    chunks.append(sentence)
+            if current and current_len + len(sentence) > 100:  # Chunk size limit
+                chunks.append(' '.join(current))
+                current = [sentence]
+                current_len = len(sentence)
             else:
-                current_chunk += " " + sentence if current_chunk else sentence
-        
-        if current_chunk:
-            chunks.append(current_chunk)
-        
+                current_len += len(sentence) + (1 if current else 0)
+                current.append(sentence)
+
+        if current:
+            chunks.append(' '.join(current))
+
         return chunks
     
     def _generate_silence(self, duration: float) -> bytes:
         """Generate silence of specified duration"""
         if NUMPY_AVAILABLE:
-            import numpy as np
-            
             sample_rate = self.config['sample_rate']
+
+            # Quantize to 50 ms buckets so repeated fallbacks reuse the
+            # same encoded bytes instead of re-allocating and re-encoding
+            key = (sample_rate, int(duration * 20))
+            cached = self._silence_cache.get(key)
+            if cached is not None:
+                return cached
+
             samples = int(sample_rate * duration)
             silence = np.zeros(samples, dtype=np.float32)
-            
-            return self.audio_processor.process_audio(silence, output_format='wav')
+            encoded = self.audio_processor.process_audio(
+                silence, output_format='wav')
+
+            if len(self._silence_cache) >= 16:
+                self._silence_cache.pop(next(iter(self._silence_cache)))
+            self._silence_cache[key] = encoded
+            return encoded
         else:
             # Return minimal WAV file
             return b'RIFF$\x00\x00\x00WAVEfmt \x10\x00\x00\x00\x01\x00\x01\x00\x44\xac\x00\x00\x88X\x01\x00\x02\x00\x10\x00data\x00\x00\x00\x00'
     
     def get_available_voices(self) -> Dict[str, List[str]]:
         """Get list of available voices and characters"""
-        return {
-            'characters': self.voice_models.list_characters(),
-            'voice_styles': self.voice_models.list_voice_styles(),
-            'emotions': list(self.emotion_detector.emotion_weights.keys())
-        }
-    
+        if self._voices_cache is None:
+            self._voices_cache = {
+                'characters': self.voice_models.list_characters(),
+                'voice_styles': self.voice_models.list_voice_styles(),
+                'emotions': list(self.emotion_detector.emotion_weights.keys())
+            }
+        return self._voices_cache
+
     def set_character_config(self, character: str, config: Dict[str, Any]) -> bool:
         """Set custom configuration for a character"""
+        self._voices_cache = None
         return self.voice_models.create_character_voice(character, config)
     
+    def _text_analysis(self, text: str) -> tuple:
+        """
+        All three frontend analyses for a text, memoized by the string.
+
+        The analyses are pure functions of the text and the detectors'
+        static tables, so analyze_text and _prepare_synthesis share one
+        entry and the analyze-then-synthesize flow scans the text once.
+        """
+        cached = self._analysis_cache.get(text)
+        if cached is None:
+            cached = (
+                self.emotion_detector.detect_emotion(text),
+                self.japanese_processor.preprocess_for_tts(text),
+                self.emotion_detector.analyze_speech_patterns(text)
+            )
+            if len(self._analysis_cache) >= 256:
+                self._analysis_cache.pop(next(iter(self._analysis_cache)))
+            self._analysis_cache[text] = cached
+        return cached
+
     def analyze_text(self, text: str) -> Dict[str, Any]:
         """Analyze text for synthesis planning"""
-        emotion_analysis = self.emotion_detector.detect_emotion(text)
-        japanese_analysis = self.japanese_processor.preprocess_for_tts(text)
-        speech_patterns = self.emotion_detector.analyze_speech_patterns(text)
-        
+        emotion_analysis, japanese_analysis, speech_patterns = \
+            self._text_analysis(text)
+
         return {
             'emotions': emotion_analysis,
             'japanese_processing': japanese_analysis,
@@ -363,23 +800,13 @@ class WaifuVoiceSynthesizer:
     
     def _recommend_character(self, emotion_analysis: Dict[str, Any]) -> str:
         """Recommend best character for given emotional context"""
-        primary_emotion = emotion_analysis['primary_emotion']
-        
-        recommendations = {
-            'cheerful': 'sakura',
-            'giggly': 'miku',
-            'teasing': 'rei',
-            'shy': 'yuki',
-            'excited': 'miku',
-            'sad': 'yuki',
-            'neutral': 'sakura'
-        }
-        
-        return recommendations.get(primary_emotion, 'sakura')
+        return _CHARACTER_RECOMMENDATIONS.get(
+            emotion_analysis['primary_emotion'], 'sakura')
     
     def clear_cache(self):
         """Clear synthesis cache"""
         self.cache.clear()
+        self.semantic_cache.clear()
         self.logger.info("Synthesis cache cleared")
     
     def get_stats(self) -> Dict[str, Any]:
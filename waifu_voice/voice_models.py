@@ -3,26 +3,81 @@ Voice Model Management
 Handles different voice models and character voices
 """
 
+import asyncio
 import os
 import json
-import torch
-import torchaudio
+import re
 from typing import Dict, List, Optional, Any
 from pathlib import Path
 import logging
 
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = NUMPY_AVAILABLE
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _scan_text(codepoints):
+        """One pass over UTF-32 code points: length, punctuation, non-ASCII"""
+        has_punct = False
+        has_japanese = False
+        for i in range(codepoints.size):
+            c = codepoints[i]
+            if c == 33 or c == 63 or c == 46:
+                has_punct = True
+            if c > 127:
+                has_japanese = True
+        return codepoints.size, has_punct, has_japanese
+
+
+# Sentence punctuation for the non-numba text scan, compiled once
+_PUNCT_RE = re.compile(r'[!?.]')
+
+# Parameter modifiers per emotion, built once; the table is read-only
+_EMOTION_MODIFIERS = {
+    'cheerful': {'pitch': 1.1, 'speaking_rate': 1.05, 'energy': 1.2},
+    'giggly': {'pitch': 1.2, 'speaking_rate': 0.95, 'energy': 1.3},
+    'teasing': {'pitch': 0.95, 'speaking_rate': 0.9, 'energy': 1.1},
+    'shy': {'pitch': 1.05, 'speaking_rate': 0.8, 'energy': 0.8},
+    'excited': {'pitch': 1.3, 'speaking_rate': 1.2, 'energy': 1.4},
+    'sad': {'pitch': 0.85, 'speaking_rate': 0.7, 'energy': 0.6},
+    'neutral': {'pitch': 1.0, 'speaking_rate': 1.0, 'energy': 1.0},
+    'angry': {'pitch': 1.15, 'speaking_rate': 1.1, 'energy': 1.3},
+    'surprised': {'pitch': 1.25, 'speaking_rate': 1.15, 'energy': 1.35}
+}
+
 
 class VoiceModelManager:
     """Manages voice models for different waifu characters"""
-    
+
+    # No per-instance __dict__; subclasses that add attributes must
+    # declare their own __slots__ (or include '__dict__')
+    __slots__ = ('models_dir', 'loaded_models', 'model_configs',
+                 'character_configs', 'voice_styles', '_param_cache',
+                 '_device', 'logger')
+
     def __init__(self, models_dir: str = "models"):
         self.models_dir = Path(models_dir)
         self.models_dir.mkdir(exist_ok=True)
         
         self.loaded_models = {}
         self.model_configs = {}
-        self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
-        
+
+
         # Default character configurations
         self.character_configs = {
             'sakura': {
@@ -86,8 +141,34 @@ class VoiceModelManager:
             }
         }
         
+        # Compile the text-scan kernel before the first real call
+        if NUMBA_AVAILABLE:
+            _scan_text(np.zeros(1, dtype=np.uint32))
+
+        # Memo of fully merged parameter sets keyed by
+        # (character, emotion, voice_style); the combination space is
+        # tiny, so repeat calls skip the merge and multiplications
+        self._param_cache = {}
+
+        # Torch device, resolved lazily by the device property
+        self._device = None
+
         self.logger = logging.getLogger(__name__)
-        
+
+    @property
+    def device(self):
+        """Torch device, resolved on first model use.
+
+        Importing torch costs seconds and ~100 MB of RSS, so paths
+        that never load a model must not pay for it. (A plain property
+        over a slot, since cached_property needs a __dict__.)
+        """
+        if self._device is None:
+            import torch
+            self._device = torch.device(
+                'cuda' if torch.cuda.is_available() else 'cpu')
+        return self._device
+
     def load_model(self, model_name: str) -> bool:
         """Load a voice synthesis model"""
         try:
@@ -119,6 +200,24 @@ class VoiceModelManager:
             self.logger.error(f"Error loading model {model_name}: {e}")
             return False
     
+    async def load_models_batch(self, model_names: List[str]) -> Dict[str, bool]:
+        """
+        Load several voice models concurrently.
+
+        Each load is disk reads plus JSON parsing, so running them on
+        threads overlaps the I/O; startup that loads one model per
+        character no longer pays the latencies back to back.
+
+        Args:
+            model_names: Names of the models to load
+
+        Returns:
+            Mapping of model name to load success
+        """
+        results = await asyncio.gather(
+            *(asyncio.to_thread(self.load_model, name) for name in model_names))
+        return dict(zip(model_names, results))
+
     def _load_default_model(self, model_name: str) -> bool:
         """Load a default model configuration"""
         self.loaded_models[model_name] = {
@@ -173,64 +272,66 @@ class VoiceModelManager:
     def generate_voice_parameters(self, character: str, emotion: str = 'neutral',
                                 voice_style: Optional[str] = None) -> Dict[str, Any]:
         """Generate voice parameters for synthesis"""
-        character_config = self.get_character_config(character)
-        
-        # Use character's default style if not specified
-        if voice_style is None:
-            voice_style = character_config['voice_style']
-        
-        style_config = self.get_voice_style_config(voice_style)
-        
-        # Base parameters from character
-        parameters = {
-            'pitch': character_config['base_pitch'],
-            'speaking_rate': character_config['speaking_rate'],
-            'energy': character_config['energy'],
-            'accent': character_config['accent'],
-            'character_name': character
-        }
-        
-        # Apply voice style modifications
-        parameters.update({
-            'pitch_range': style_config['pitch_range'],
-            'formant_shift': style_config['formant_shift'],
-            'breathiness': style_config['breathiness'],
-            'vibrato': style_config['vibrato']
-        })
-        
-        # Apply emotion modifications
-        emotion_modifiers = self._get_emotion_modifiers(emotion)
-        for key, modifier in emotion_modifiers.items():
-            if key in parameters:
-                parameters[key] *= modifier
-        
-        return parameters
+        cache_key = (character, emotion, voice_style)
+        cached = self._param_cache.get(cache_key)
+        if cached is None:
+            character_config = self.get_character_config(character)
+
+            # Use character's default style if not specified
+            if voice_style is None:
+                voice_style = character_config['voice_style']
+
+            style_config = self.get_voice_style_config(voice_style)
+
+            # Base parameters from character
+            parameters = {
+                'pitch': character_config['base_pitch'],
+                'speaking_rate': character_config['speaking_rate'],
+                'energy': character_config['energy'],
+                'accent': character_config['accent'],
+                'character_name': character
+            }
+
+            # Apply voice style modifications
+            parameters.update({
+                'pitch_range': style_config['pitch_range'],
+                'formant_shift': style_config['formant_shift'],
+                'breathiness': style_config['breathiness'],
+                'vibrato': style_config['vibrato']
+            })
+
+            # Apply emotion modifications
+            emotion_modifiers = self._get_emotion_modifiers(emotion)
+            for key, modifier in emotion_modifiers.items():
+                if key in parameters:
+                    parameters[key] *= modifier
+
+            self._param_cache[cache_key] = cached = parameters
+
+        # Copy so callers can adjust their set without touching the memo
+        return dict(cached)
     
     def _get_emotion_modifiers(self, emotion: str) -> Dict[str, float]:
         """Get parameter modifiers for specific emotions"""
-        modifiers = {
-            'cheerful': {'pitch': 1.1, 'speaking_rate': 1.05, 'energy': 1.2},
-            'giggly': {'pitch': 1.2, 'speaking_rate': 0.95, 'energy': 1.3},
-            'teasing': {'pitch': 0.95, 'speaking_rate': 0.9, 'energy': 1.1},
-            'shy': {'pitch': 1.05, 'speaking_rate': 0.8, 'energy': 0.8},
-            'excited': {'pitch': 1.3, 'speaking_rate': 1.2, 'energy': 1.4},
-            'sad': {'pitch': 0.85, 'speaking_rate': 0.7, 'energy': 0.6},
-            'neutral': {'pitch': 1.0, 'speaking_rate': 1.0, 'energy': 1.0},
-            'angry': {'pitch': 1.15, 'speaking_rate': 1.1, 'energy': 1.3},
-            'surprised': {'pitch': 1.25, 'speaking_rate': 1.15, 'energy': 1.35}
-        }
-        
-        return modifiers.get(emotion, modifiers['neutral'])
+        return _EMOTION_MODIFIERS.get(emotion, _EMOTION_MODIFIERS['neutral'])
     
     def create_character_voice(self, name: str, config: Dict[str, Any]) -> bool:
         """Create a new character voice configuration"""
         try:
             self.character_configs[name] = config
-            
-            # Save configuration to file
+            # Merged parameters derived from the old config are stale
+            self._param_cache.clear()
+
+
+            # Save configuration to file (orjson serializes to UTF-8
+            # bytes directly, so no ensure_ascii or text-mode encode)
             config_file = self.models_dir / f"character_{name}.json"
-            with open(config_file, 'w', encoding='utf-8') as f:
-                json.dump(config, f, indent=2, ensure_ascii=False)
+            if ORJSON_AVAILABLE:
+                config_file.write_bytes(
+                    orjson.dumps(config, option=orjson.OPT_INDENT_2))
+            else:
+                with open(config_file, 'w', encoding='utf-8') as f:
+                    json.dump(config, f, indent=2, ensure_ascii=False)
             
             self.logger.info(f"Created character voice: {name}")
             return True
@@ -268,10 +369,17 @@ class VoiceModelManager:
         """Optimize synthesis parameters for a specific character and text"""
         character_config = self.get_character_config(character)
         
-        # Analyze text characteristics
-        text_length = len(text)
-        has_punctuation = any(p in text for p in '!?.')
-        has_japanese = any(ord(c) > 127 for c in text)
+        # Analyze text characteristics: one jitted pass over the code
+        # points replaces three separate Python-level scans
+        if NUMBA_AVAILABLE:
+            codepoints = np.frombuffer(
+                text.encode('utf-32-le'), dtype=np.uint32)
+            text_length, has_punctuation, has_japanese = \
+                _scan_text(codepoints)
+        else:
+            text_length = len(text)
+            has_punctuation = bool(_PUNCT_RE.search(text))
+            has_japanese = not text.isascii()
         
         # Adjust parameters based on text
         parameters = self.generate_voice_parameters(character)